@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import tracemalloc
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'servicenowpy'))
+
+from servicenowpy import Client, Stats
+
+
+class BenchConfig:
+    """Benchmark settings, read from SERVICENOWPY_BENCH_* environment variables."""
+
+    def __init__(self):
+        self.rows = int(os.environ.get('SERVICENOWPY_BENCH_ROWS', 10000))
+        self.width = int(os.environ.get('SERVICENOWPY_BENCH_WIDTH', 20))
+        self.page_size = int(os.environ.get('SERVICENOWPY_BENCH_PAGE_SIZE', 1000))
+        self.latency = float(os.environ.get('SERVICENOWPY_BENCH_LATENCY', 0.005))
+        self.workers = int(os.environ.get('SERVICENOWPY_BENCH_WORKERS', 4))
+
+
+@pytest.fixture(scope='session')
+def config():
+    return BenchConfig()
+
+
+@pytest.fixture(scope='session')
+def instance_url(config):
+    """Starts the stand-in instance in its own process and returns its URL."""
+
+    server = subprocess.Popen(
+        [
+            sys.executable, str(Path(__file__).with_name('server.py')),
+            '--port', '0',
+            '--rows', str(config.rows),
+            '--width', str(config.width),
+            '--page-size', str(config.page_size),
+            '--latency', str(config.latency),
+        ],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    port = server.stdout.readline().split()[1]
+    yield f'http://127.0.0.1:{port}'
+    server.terminate()
+    server.wait()
+
+
+@pytest.fixture
+def stats():
+    return Stats(window=100000)
+
+
+@pytest.fixture
+def client(instance_url, config, stats):
+    with Client(instance_url, 'user', 'pwd', pool_maxsize=max(10, config.workers), hooks=[stats]) as sn_client:
+        yield sn_client
+
+
+def report(benchmark, stats, table, method, records=None, func=None):
+    """
+    Adds latency percentiles, throughput and memory use to the benchmark results.
+
+    :param func: If given, it is called once more to measure its peak Python memory
+        (peak_python_bytes), which covers that call only and not the rest of the process.
+    """
+
+    summary = stats.get(table, method)
+    if summary:
+        benchmark.extra_info['latency'] = summary['latency']
+        benchmark.extra_info['decode'] = summary['decode']
+    if records:
+        benchmark.extra_info['records_per_second'] = records / benchmark.stats.stats.mean
+    if func is not None:
+        tracemalloc.start()
+        func()
+        benchmark.extra_info['peak_python_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
@@ -0,0 +1,169 @@
+"""
+Stand-in ServiceNow instance for the benchmarks.
+
+Serves synthetic records of any table through the Table and Batch APIs, with
+offset pagination, Link and X-Total-Count headers, and a configurable latency.
+It only depends on the standard library and runs in its own process, so it does
+not share the CPU or the memory of the client being measured.
+
+    python server.py --port 8000 --rows 100000 --width 20 --latency 0.01
+"""
+
+import argparse
+import base64
+import json
+import re
+import sys
+import time
+
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def make_record(n, width):
+    record = {
+        "sys_id": f'{n:032x}',
+        "number": f'INC{n:07d}',
+        "sys_updated_on": time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(1600000000 + n)),
+        "assigned_to": {
+            "link": f'https://instance/api/now/table/sys_user/{n % 500:032x}',
+            "value": f'{n % 500:032x}'
+        },
+    }
+    for k in range(len(record), width):
+        record[f'u_field_{k}'] = f'value {n} of field {k}'
+    return record
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, which would wait for delayed ACKs
+    disable_nagle_algorithm = True
+    table_path = re.compile(r'^/api/now/(?:v\d+/)?table/(\w+)(?:/(\w+))?$')
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def send_json(self, status, data=None, headers=None):
+        body = json.dumps(data).encode() if data is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def route(self, method):
+        time.sleep(self.config.latency)
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if method == 'POST' and url.path.endswith('/batch'):
+            return self.batch(self.read_body())
+
+        m = self.table_path.match(url.path)
+        if not m:
+            return self.send_json(400, {"error": {"message": "Invalid path", "detail": url.path}})
+        status, data, headers = self.table(method, m.group(1), m.group(2), query, self.read_body())
+        self.send_json(status, data, headers)
+
+    def table(self, method, table, sys_id, query, body):
+        if method == 'GET' and sys_id is None:
+            return self.get_page(table, query)
+
+        if method == 'POST':
+            return 201, {"result": {**(body or {}), "sys_id": f'{self.config.rows:032x}'}}, None
+
+        n = int(sys_id, 16)
+        if n >= self.config.rows:
+            return 404, {"error": {"message": "No Record found", "detail": sys_id}}, None
+        if method == 'GET':
+            return 200, {"result": self.record(n)}, None
+        if method in ('PATCH', 'PUT'):
+            return 200, {"result": {**self.record(n), **(body or {})}}, None
+        return 204, None, None
+
+    def get_page(self, table, query):
+        offset = int(query.get('sysparm_offset', 0))
+        limit = int(query.get('sysparm_limit', self.config.page_size))
+        rows = self.config.rows
+        records = [self.record(n) for n in range(offset, min(offset + limit, rows))]
+        if 'sysparm_fields' in query:
+            fields = query['sysparm_fields'].split(',')
+            records = [{f: r.get(f, '') for f in fields} for r in records]
+
+        base = f'http://{self.headers["Host"]}/api/now/table/{table}?sysparm_limit={limit}'
+        links = [f'<{base}&sysparm_offset=0>;rel="first"']
+        if offset + limit < rows:
+            links.append(f'<{base}&sysparm_offset={offset + limit}>;rel="next"')
+        links.append(f'<{base}&sysparm_offset={max(0, rows - limit)}>;rel="last"')
+        headers = {'X-Total-Count': str(rows), 'Link': ','.join(links)}
+        return 200, {"result": records}, headers
+
+    def batch(self, body):
+        serviced = []
+        for item in body["rest_requests"]:
+            m = self.table_path.match(urlsplit(item["url"]).path)
+            data = json.loads(base64.b64decode(item["body"])) if item.get("body") else None
+            status, result, _ = self.table(item["method"], m.group(1), m.group(2), {}, data)
+            serviced.append({
+                "id": item["id"],
+                "status_code": status,
+                "body": base64.b64encode(json.dumps(result).encode()).decode() if result else ""
+            })
+        self.send_json(200, {
+            "batch_request_id": body["batch_request_id"],
+            "serviced_requests": serviced,
+            "unserviced_requests": []
+        })
+
+    def record(self, n):
+        return self.server.make_record(n)
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.route('POST')
+
+    def do_PATCH(self):
+        self.route('PATCH')
+
+    def do_PUT(self):
+        self.route('PUT')
+
+    def do_DELETE(self):
+        self.route('DELETE')
+
+
+def serve(config):
+    server = ThreadingHTTPServer(('127.0.0.1', config.port), Handler)
+    server.daemon_threads = True
+    server.config = config
+    server.make_record = lru_cache(maxsize=config.rows)(lambda n: make_record(n, config.width))
+    print(f'ready {server.server_port}', flush=True)
+    server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--rows', type=int, default=10000, help='number of records of every table')
+    parser.add_argument('--width', type=int, default=20, help='number of fields of every record')
+    parser.add_argument('--page-size', type=int, default=10000, help='default sysparm_limit')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    serve(parse_args(sys.argv[1:]))
@@ -0,0 +1,94 @@
+"""
+Benchmarks of the Table methods against the stand-in instance of server.py.
+
+    pytest benchmarks --benchmark-only
+
+The number of records, fields per record, page size, latency and workers are
+set with the SERVICENOWPY_BENCH_* environment variables (see conftest.py).
+"""
+
+from collections import deque
+
+from conftest import report
+
+
+def consume(iterable):
+    deque(iterable, maxlen=0)
+
+
+def test_get(benchmark, client, config, stats):
+    inc_table = client.table('incident')
+    result = benchmark(inc_table.get, sysparm_limit=config.page_size)
+    assert len(result) == config.rows
+    report(benchmark, stats, 'incident', 'GET', config.rows, lambda: inc_table.get(sysparm_limit=config.page_size))
+
+
+def test_get_parallel(benchmark, client, config, stats):
+    inc_table = client.table('incident')
+    result = benchmark(inc_table.get, workers=config.workers, page_size=config.page_size)
+    assert len(result) == config.rows
+    report(
+        benchmark, stats, 'incident', 'GET', config.rows,
+        lambda: inc_table.get(workers=config.workers, page_size=config.page_size)
+    )
+
+
+def test_get_compact(benchmark, client, config, stats):
+    inc_table = client.table('incident')
+    result = benchmark(inc_table.get, record_type='compact', sysparm_limit=config.page_size)
+    assert len(result) == config.rows
+    report(
+        benchmark, stats, 'incident', 'GET', config.rows,
+        lambda: inc_table.get(record_type='compact', sysparm_limit=config.page_size)
+    )
+
+
+def test_iter_records(benchmark, client, config, stats):
+    inc_table = client.table('incident')
+    benchmark(lambda: consume(inc_table.iter_records(page_size=config.page_size)))
+    report(
+        benchmark, stats, 'incident', 'GET', config.rows,
+        lambda: consume(inc_table.iter_records(page_size=config.page_size))
+    )
+
+
+def test_iter_records_stream(benchmark, client, config, stats):
+    inc_table = client.table('incident')
+    benchmark(lambda: consume(inc_table.iter_records(page_size=config.page_size, stream=True)))
+    report(
+        benchmark, stats, 'incident', 'GET', config.rows,
+        lambda: consume(inc_table.iter_records(page_size=config.page_size, stream=True))
+    )
+
+
+def test_get_record(benchmark, client, stats):
+    inc_table = client.table('incident')
+    result = benchmark(inc_table.get_record, f'{1:032x}')
+    assert result['number'] == 'INC0000001'
+    report(benchmark, stats, 'incident', 'GET')
+
+
+def test_post(benchmark, client, stats):
+    inc_table = client.table('incident')
+    benchmark(inc_table.post, {"short_description": "Benchmark"})
+    report(benchmark, stats, 'incident', 'POST')
+
+
+def test_patch(benchmark, client, stats):
+    inc_table = client.table('incident')
+    benchmark(inc_table.patch, f'{1:032x}', {"state": "2"})
+    report(benchmark, stats, 'incident', 'PATCH')
+
+
+def test_delete(benchmark, client, stats):
+    inc_table = client.table('incident')
+    benchmark(inc_table.delete, f'{1:032x}')
+    report(benchmark, stats, 'incident', 'DELETE')
+
+
+def test_bulk_patch(benchmark, client, config, stats):
+    inc_table = client.table('incident')
+    updates = {f'{n:032x}': {"state": "2"} for n in range(1000)}
+    results = benchmark(inc_table.bulk_patch, updates, workers=config.workers)
+    assert not [r for r in results if not isinstance(r, dict)]
+    report(benchmark, stats, 'batch', 'POST', len(updates))
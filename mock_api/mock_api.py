@@ -1,118 +1,521 @@
+"""
+Mock ServiceNow instance.
+
+Serves synthetic records of any table through the Table, Aggregate, Batch and
+Import Set APIs, with encoded queries, Link and X-Total-Count pagination, rate
+limiting and injectable latency and errors. Responses of 1 KB or more are gzip
+compressed for the clients that accept it, and gzip request bodies are read.
+The data is read-only: writes are answered like the instance would, but not
+stored, so every run sees the same records.
+
+It is configured with environment variables, and at runtime through
+GET and PUT /mock/config:
+
+    MOCK_API_ROWS               Number of synthetic records of every table (100).
+    MOCK_API_TABLES             Rows of specific tables, and extra tables, as "sys_user=500,u_custom=10".
+    MOCK_API_WIDTH              Minimum number of fields of every record (0).
+    MOCK_API_PAGE_SIZE          Default sysparm_limit (10000).
+    MOCK_API_LATENCY            Seconds added to every response, or a "min-max" range (0).
+    MOCK_API_ERROR_RATE         Fraction of requests answered with status 500 or 503 (0).
+    MOCK_API_RATE_LIMIT         Requests per second before answering 429, 0 for no limit (0).
+    MOCK_API_RATE_BURST         Requests allowed at once by the rate limit (MOCK_API_RATE_LIMIT).
+    MOCK_API_MAX_CONCURRENCY    Requests in flight before answering 429, 0 for no limit (0).
+    MOCK_API_SEED               Seed of the injected latency and errors.
+"""
+
+import asyncio
+import base64
+import gzip
 import json
-import re
+import math
+import os
+import random
+import threading
+import time
+import uuid
 
 import uvicorn
 
-from typing import Optional
+from urllib.parse import urlencode, urlsplit, parse_qsl
 
-from fastapi import FastAPI, Request, Response, status
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
 
+from query import NUMBER, QueryError, field_value
+from tables import Instance, TableNotFoundException, etag
+
+
+def parse_table_rows(value):
+    rows = {}
+    for item in value.split(','):
+        if item.strip():
+            table, _, count = item.partition('=')
+            rows[table.strip()] = int(count)
+    return rows
+
+
+def parse_latency(value):
+    low, _, high = str(value).partition('-')
+    return [float(low), float(high or low)]
+
+
+class Config:
+    def __init__(self, environ=os.environ):
+        self.rows = int(environ.get('MOCK_API_ROWS', 100))
+        self.table_rows = parse_table_rows(environ.get('MOCK_API_TABLES', ''))
+        self.width = int(environ.get('MOCK_API_WIDTH', 0))
+        self.page_size = int(environ.get('MOCK_API_PAGE_SIZE', 10000))
+        self.latency = parse_latency(environ.get('MOCK_API_LATENCY', '0'))
+        self.error_rate = float(environ.get('MOCK_API_ERROR_RATE', 0))
+        self.rate_limit = float(environ.get('MOCK_API_RATE_LIMIT', 0))
+        self.rate_burst = float(environ.get('MOCK_API_RATE_BURST', 0))
+        self.max_concurrency = int(environ.get('MOCK_API_MAX_CONCURRENCY', 0))
+        self.seed = environ.get('MOCK_API_SEED')
+
+    def to_dict(self):
+        return dict(vars(self))
 
-class TableNotFoundException(Exception):
-    def __init__(self, table: str):
-        self.table = table
+    def update(self, values):
+        for name, value in values.items():
+            if name not in vars(self):
+                raise ValueError(f'Invalid option {name}')
+            if name == 'latency' and not isinstance(value, list):
+                value = [value, value]
+            setattr(self, name, value)
 
 
-class Record(BaseModel):
-    short_description: Optional[str] = None
-    assignment_group: Optional[str] = None
+class Throttle:
+    """Token bucket rate limit and concurrency limit."""
 
+    def __init__(self, config):
+        self.config = config
+        self.tokens = config.rate_burst or config.rate_limit
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.lock = threading.Lock()
 
-with open('mock_data.json') as f:
-    data = json.load(f)
+    def acquire(self):
+        """Returns None if the request is admitted, or the seconds to wait before retrying."""
+
+        config = self.config
+        with self.lock:
+            if config.max_concurrency and self.in_flight >= config.max_concurrency:
+                return 1.0
+            if config.rate_limit:
+                now = time.monotonic()
+                burst = config.rate_burst or config.rate_limit
+                self.tokens = min(burst, self.tokens + (now - self.updated) * config.rate_limit)
+                self.updated = now
+                if self.tokens < 1:
+                    return (1 - self.tokens) / config.rate_limit
+                self.tokens -= 1
+            self.in_flight += 1
+            return None
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+config = Config()
+instance = Instance(config)
+throttle = Throttle(config)
+rng = random.Random(config.seed)
 
 app = FastAPI()
+# Like an instance, compresses the larger responses for the clients that accept it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 @app.exception_handler(TableNotFoundException)
 async def unicorn_exception_handler(request: Request, exc: TableNotFoundException):
-    return JSONResponse(
-        status_code=400,
-        content={
-            "error": {
-                "message": f"Invalid table {exc.table}",
-                "detail": None
-            },
-            "status": "failure"
-        }
-    )
+    return JSONResponse(status_code=400, content=error(f"Invalid table {exc.table}"))
+
+
+@app.exception_handler(QueryError)
+async def query_exception_handler(request: Request, exc: QueryError):
+    return JSONResponse(status_code=400, content=error(str(exc)))
+
+
+@app.middleware("http")
+async def instance_behaviour(request: Request, call_next):
+    if not request.url.path.startswith('/api/'):
+        return await call_next(request)
+
+    base_url = str(request.base_url).rstrip('/')
+    if base_url != instance.base_url:
+        instance.reset(base_url)
+
+    low, high = config.latency
+    if high:
+        await asyncio.sleep(rng.uniform(low, high))
+
+    wait = throttle.acquire()
+    if wait is not None:
+        return JSONResponse(
+            status_code=429,
+            content=error("Too many requests", "The rate limit of the instance was exceeded"),
+            headers={
+                "Retry-After": str(math.ceil(wait)),
+                "X-RateLimit-Limit": str(int(config.rate_limit)),
+                "X-RateLimit-Reset": str(int(time.time() + wait)),
+            }
+        )
+    try:
+        if config.error_rate and rng.random() < config.error_rate:
+            status = rng.choice((500, 503))
+            return JSONResponse(status_code=status, content=error("Injected error", f"Status {status}"))
+        return await call_next(request)
+    finally:
+        throttle.release()
+
+
+@app.get("/mock/config")
+def get_config():
+    return config.to_dict()
+
+
+@app.put("/mock/config")
+async def put_config(request: Request):
+    try:
+        config.update(json.loads(await request.body()))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content=error(str(e)))
+    throttle.tokens = config.rate_burst or config.rate_limit
+    instance.reset()
+    return config.to_dict()
 
 
 @app.get("/api/now/table/{table}")
-def get_all(
-    table: str,
-    response: Response,
-    number: Optional[str] = None,
-    sysparm_fields: Optional[str] = None    
-):
-    if not table == 'incident':
-        raise TableNotFoundException(table=table)
-
-    response.headers["X-Content-Type"] = "application/json;charset=UTF-8"
-    
-    if sysparm_fields:
-        fields = sysparm_fields.split(',')
-        result = []
-        for n in range(len(data)):
-            result.append({})
-            for field in fields:
-                result[n][field] = data[n][field]
-    else:
-        result = data
-
-    if number:
-        m = re.search(r'(INC[0-9]{7})', number)
-        if m:
-            for r in result:
-                r["number"] = number
-            return { "result": result }
-
-    return { "result": result }
-
-
-@app.get("/api/now/table/incident/{sys_id}")
-def get_by_id(sys_id, response: Response):
-    response.headers["Content-Type"] = "application/json;charset=UTF-8"
-    result = data[0]
-    result["sys_id"] = sys_id
-    return { "result": result }
-
-
-@app.patch("/api/now/table/incident/{sys_id}", status_code=200)
-def patch(sys_id, record: Record, response: Response):
-    result = data[0]
-    result["sys_id"] = sys_id
-    result["short_description"] = record.short_description
-    result["assignment_group"] = record.assignment_group
-    response.headers["Content-Type"] = "application/json;charset=UTF-8"
-    return { "result": result }
-
-
-@app.post("/api/now/table/incident", status_code=201)
-def post(record: Record, response: Response):
-    response.headers["Content-Type"] = "application/json;charset=UTF-8"
-    return { "result": {
-        "short_description": record.short_description,
-        "assignment_group": record.assignment_group
-    }}
-
-
-@app.put("/api/now/table/incident/{sys_id}", status_code=200)
-def put(sys_id, record: Record, response: Response):
-    response.headers["Content-Type"] = "application/json;charset=UTF-8"
-    return { "result": {
+@app.get("/api/now/{api_version}/table/{table}")
+def get_all(table: str, request: Request, api_version: str = None):
+    params = dict(request.query_params)
+    status, data, headers = table_api('GET', table, None, params, None, request_url(request))
+    headers["X-Content-Type"] = "application/json;charset=UTF-8"
+    return json_response(status, data, headers)
+
+
+@app.get("/api/now/table/{table}/{sys_id}")
+@app.get("/api/now/{api_version}/table/{table}/{sys_id}")
+def get_by_id(table: str, sys_id: str, request: Request, api_version: str = None):
+    status, data, headers = table_api('GET', table, sys_id, dict(request.query_params), None)
+    body = json.dumps(data).encode()
+    headers["ETag"] = etag(body)
+    if status == 200 and request.headers.get('If-None-Match') == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, status, headers, media_type="application/json;charset=UTF-8")
+
+
+@app.post("/api/now/table/{table}")
+@app.post("/api/now/{api_version}/table/{table}")
+async def post(table: str, request: Request, api_version: str = None):
+    return json_response(*table_api('POST', table, None, dict(request.query_params), await read_body(request)))
+
+
+@app.patch("/api/now/table/{table}/{sys_id}")
+@app.patch("/api/now/{api_version}/table/{table}/{sys_id}")
+async def patch(table: str, sys_id: str, request: Request, api_version: str = None):
+    return json_response(*table_api('PATCH', table, sys_id, dict(request.query_params), await read_body(request)))
+
+
+@app.put("/api/now/table/{table}/{sys_id}")
+@app.put("/api/now/{api_version}/table/{table}/{sys_id}")
+async def put(table: str, sys_id: str, request: Request, api_version: str = None):
+    return json_response(*table_api('PUT', table, sys_id, dict(request.query_params), await read_body(request)))
+
+
+@app.delete("/api/now/table/{table}/{sys_id}")
+@app.delete("/api/now/{api_version}/table/{table}/{sys_id}")
+def delete(table: str, sys_id: str, request: Request, api_version: str = None):
+    return json_response(*table_api('DELETE', table, sys_id, dict(request.query_params), None))
+
+
+@app.get("/api/now/stats/{table}")
+@app.get("/api/now/{api_version}/stats/{table}")
+def stats(table: str, request: Request, api_version: str = None):
+    return json_response(*aggregate_api(table, dict(request.query_params)))
+
+
+@app.post("/api/now/batch")
+@app.post("/api/now/{api_version}/batch")
+async def batch(request: Request, api_version: str = None):
+    body = await read_body(request)
+    serviced = []
+    for item in body.get("rest_requests", []):
+        start = time.monotonic()
+        url = urlsplit(item["url"])
+        parts = url.path.strip('/').split('/')
+        data = json.loads(base64.b64decode(item["body"])) if item.get("body") else None
+        params = dict(parse_qsl(url.query))
+        try:
+            table = parts[parts.index('table') + 1]
+            sys_id = parts[parts.index('table') + 2] if len(parts) > parts.index('table') + 2 else None
+            status, result, _ = table_api(item["method"], table, sys_id, params, data)
+        except ValueError:
+            status, result = 400, error("Invalid URL", item["url"])
+        except TableNotFoundException as e:
+            status, result = 400, error(f"Invalid table {e.table}")
+        serviced.append({
+            "id": item["id"],
+            "status_code": status,
+            "status_text": "OK" if status < 300 else "Error",
+            "headers": [{"name": "Content-Type", "value": "application/json;charset=UTF-8"}],
+            "body": base64.b64encode(json.dumps(result).encode()).decode() if result is not None else "",
+            "execution_time": int((time.monotonic() - start) * 1000),
+        })
+    return json_response(200, {
+        "batch_request_id": body.get("batch_request_id"),
+        "serviced_requests": serviced,
+        "unserviced_requests": []
+    })
+
+
+@app.post("/api/now/import/{staging_table}")
+@app.post("/api/now/{api_version}/import/{staging_table}")
+async def import_set(staging_table: str, request: Request, api_version: str = None):
+    target = import_target(staging_table)
+    record = await read_body(request) or {}
+    return json_response(201, {
+        "import_set": f"ISET{rng.randrange(10000000):07d}",
+        "staging_table": staging_table,
+        "result": [transform(staging_table, target, record)]
+    })
+
+
+@app.post("/api/now/import/{staging_table}/insertMultiple")
+@app.post("/api/now/{api_version}/import/{staging_table}/insertMultiple")
+async def import_set_multiple(staging_table: str, request: Request, api_version: str = None):
+    import_target(staging_table)
+    body = await read_body(request) or {}
+    if not isinstance(body.get("records"), list):
+        return json_response(400, error("Invalid request body", "Expected a records array"))
+    return json_response(201, {
+        "import_set_id": uuid.uuid4().hex,
+        "multi_import_set_id": uuid.uuid4().hex
+    })
+
+
+def table_api(method, table, sys_id, params, body, url=None):
+    """
+    Handles a Table API request.
+
+    :return: Status code, response body and response headers.
+    """
+
+    instance.check(table)
+    if method == 'GET' and sys_id is None:
+        return get_page(table, params, url)
+
+    if method == 'POST':
+        if not isinstance(body, dict):
+            return 400, error("Invalid request body", "Expected a JSON object"), {}
+        new_id = uuid.uuid4().hex
+        record = instance.record(table, 0) if instance.rows(table) else {}
+        record = {**{f: '' for f in record}, **body, "sys_id": new_id, "sys_class_name": table}
+        return 201, {"result": present(record, params)}, {"Location": f"{instance.base_url}/api/now/table/{table}/{new_id}"}
+
+    record = instance.get(table, sys_id)
+    if record is None:
+        return 404, error("No Record found", "Record doesn't exist or ACL restricts the record retrieval"), {}
+    if method == 'GET':
+        return 200, {"result": present(record, params)}, {}
+    if method in ('PATCH', 'PUT'):
+        if not isinstance(body, dict):
+            return 400, error("Invalid request body", "Expected a JSON object"), {}
+        record.update(body)
+        record["sys_id"] = sys_id
+        record["sys_mod_count"] = str(int(record.get("sys_mod_count") or 0) + 1)
+        return 200, {"result": present(record, params)}, {}
+    return 204, None, {}
+
+
+def get_page(table, params, url):
+    # Parameters other than sysparm_* filter the records by value
+    filters = tuple((k, v) for k, v in params.items() if not k.startswith('sysparm_'))
+    plan = instance.query(table, params.get('sysparm_query'), filters)
+    offset = int(params.get('sysparm_offset') or 0)
+    limit = int(params.get('sysparm_limit') or config.page_size)
+    records = [present(r, params) for r in plan.slice(offset, offset + limit)]
+
+    headers = {}
+    # Counting a filtered query scans all of it, so it is skipped when the count is not wanted
+    total = None if params.get('sysparm_no_count') == 'true' else len(plan)
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    if url and params.get('sysparm_suppress_pagination_header') != 'true':
+        headers["Link"] = pagination_links(url, params, offset, limit, len(records), total)
+    return 200, {"result": records}, headers
+
+
+def pagination_links(url, params, offset, limit, size, total):
+    def link(page_offset, rel):
+        query = urlencode({**params, "sysparm_limit": limit, "sysparm_offset": page_offset})
+        return f'<{url}?{query}>;rel="{rel}"'
+
+    links = [link(0, 'first')]
+    if offset > 0:
+        links.append(link(max(0, offset - limit), 'prev'))
+    if (offset + limit < total) if total is not None else size == limit:
+        links.append(link(offset + limit, 'next'))
+    if total is not None:
+        links.append(link(max(0, (total - 1) // limit * limit), 'last'))
+    return ','.join(links)
+
+
+def present(record, params):
+    """Applies the field list and the display value options to a record."""
+
+    fields = params.get('sysparm_fields')
+    if fields:
+        record = {f: walk(record, f) for f in fields.split(',') if f in record or '.' in f}
+
+    display = params.get('sysparm_display_value', 'false')
+    exclude_link = params.get('sysparm_exclude_reference_link') == 'true'
+    if display == 'false' and not exclude_link:
+        return record
+
+    presented = {}
+    for field, value in record.items():
+        if isinstance(value, dict):
+            shown = instance.display_value(value)
+            if display == 'all':
+                value = {"display_value": shown, "value": value["value"]}
+                if not exclude_link:
+                    value["link"] = record[field]["link"]
+            elif display == 'true':
+                value = shown if exclude_link else {"display_value": shown, "link": value["link"]}
+            else:
+                value = value["value"]
+        elif display == 'all':
+            value = {"display_value": value, "value": value}
+        presented[field] = value
+    return presented
+
+
+def walk(record, path):
+    """Returns the value of a field, following the references of dot-walked fields."""
+
+    first, _, rest = path.partition('.')
+    value = record.get(first)
+    if not rest:
+        return value
+    if not isinstance(value, dict):
+        return ''
+    target = instance.get(value['link'].rsplit('/', 2)[-2], value['value'])
+    return walk(target, rest) if target else ''
+
+
+def aggregate_api(table, params):
+    """
+    Handles an Aggregate API request.
+
+    :return: Status code, response body and response headers.
+    """
+
+    plan = instance.query(table, params.get('sysparm_query'))
+    functions = {
+        name: [f for f in params.get(f'sysparm_{name}_fields', '').split(',') if f]
+        for name in ('avg', 'min', 'max', 'sum')
+    }
+    count = params.get('sysparm_count') == 'true'
+    group_by = [f for f in params.get('sysparm_group_by', '').split(',') if f]
+
+    if not group_by and not any(functions.values()):
+        return 200, {"result": {"stats": {"count": str(len(plan))} if count else {}}}, {}
+
+    groups = {}
+    for record in plan:
+        groups.setdefault(tuple(field_value(record, f) for f in group_by), []).append(record)
+
+    results = []
+    for values, records in sorted(groups.items()):
+        result = {"stats": statistics(records, functions, count)}
+        if group_by:
+            result["groupby_fields"] = [{"field": f, "value": v} for f, v in zip(group_by, values)]
+        results.append(result)
+
+    if not group_by:
+        return 200, {"result": results[0] if results else {"stats": statistics([], functions, count)}}, {}
+    return 200, {"result": results}, {}
+
+
+def statistics(records, functions, count):
+    stats = {}
+    if count:
+        stats["count"] = str(len(records))
+    for name, fields in functions.items():
+        if not fields:
+            continue
+        stats[name] = {}
+        for field in fields:
+            values = [field_value(r, field) for r in records]
+            numbers = [float(v) for v in values if NUMBER.match(v)]
+            if name == 'avg':
+                stats[name][field] = f'{sum(numbers) / len(numbers):.4f}' if numbers else ''
+            elif name == 'sum':
+                stats[name][field] = format_number(sum(numbers))
+            elif numbers and len(numbers) == len(values):
+                stats[name][field] = format_number(min(numbers) if name == 'min' else max(numbers))
+            else:
+                values = [v for v in values if v]
+                stats[name][field] = (min(values) if name == 'min' else max(values)) if values else ''
+    return stats
+
+
+def import_target(staging_table):
+    """Returns the table that a staging table transforms into, named u_imp_<table>."""
+
+    if not staging_table.startswith('u_imp_') or staging_table[6:] not in instance.tables():
+        raise TableNotFoundException(staging_table)
+    return staging_table[6:]
+
+
+def transform(staging_table, target, record):
+    existing = instance.get(target, record.get('sys_id', ''))
+    sys_id = existing['sys_id'] if existing else uuid.uuid4().hex
+    sample = existing or (instance.record(target, 0) if instance.rows(target) else {})
+    display_name = 'number' if 'number' in sample else 'name'
+    return {
+        "transform_map": f"{staging_table} transform",
+        "table": target,
+        "display_name": display_name,
+        "display_value": record.get(display_name, (existing or {}).get(display_name, '')),
+        "record_link": f"{instance.base_url}/api/now/table/{target}/{sys_id}",
+        "status": "updated" if existing else "inserted",
         "sys_id": sys_id,
-        "short_description": record.short_description,
-        "assignment_group": record.assignment_group
-    }}
+    }
+
+
+async def read_body(request):
+    body = await request.body()
+    if not body:
+        return None
+    if request.headers.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def request_url(request):
+    return f'{instance.base_url}{request.url.path}'
+
+
+def json_response(status, data, headers=None):
+    if data is None:
+        return Response(status_code=status, headers=headers)
+    return Response(json.dumps(data), status, headers, media_type="application/json;charset=UTF-8")
+
+
+def error(message, detail=None):
+    return {"error": {"message": message, "detail": detail}, "status": "failure"}
 
 
-@app.delete("/api/now/table/incident/{sys_id}", status_code=204)
-def delete(sys_id):
-    return None
+def format_number(value):
+    return str(int(value)) if value == int(value) else str(value)
 
 
 if __name__ == '__main__':
-    uvicorn.run("mock_api:app", host="0.0.0.0", port=5000, log_level="info", reload=True)
\ No newline at end of file
+    uvicorn.run("mock_api:app", host="0.0.0.0", port=int(os.environ.get('MOCK_API_PORT', 5000)), log_level="info", reload=True)
@@ -0,0 +1,153 @@
+"""
+Encoded queries of the mock API.
+
+An encoded query is parsed into groups joined by ^NQ. Each group is a list of
+clauses joined by ^, and each clause is a list of conditions joined by ^OR.
+ORDERBY and ORDERBYDESC terms are collected apart, in order.
+"""
+
+import re
+
+OPERATORS = (
+    'ISNOTEMPTY', 'ISEMPTY', 'NOT LIKE', 'NOT IN', 'STARTSWITH', 'ENDSWITH',
+    'BETWEEN', 'ANYTHING', 'LIKE', 'IN', '!=', '>=', '<=', '=', '>', '<'
+)
+
+# Field names are lower case, so they never swallow the upper case operators
+CONDITION = re.compile(r'([a-z0-9_.]+)(' + '|'.join(re.escape(op) for op in OPERATORS) + r')(.*)', re.S)
+NUMBER = re.compile(r'-?\d+(\.\d+)?$')
+
+
+class QueryError(ValueError):
+    pass
+
+
+class Condition:
+    def __init__(self, field, operator, value):
+        self.field = field
+        self.operator = operator
+        self.value = value
+        if operator in ('IN', 'NOT IN'):
+            self.values = frozenset(value.split(','))
+        elif operator == 'BETWEEN':
+            self.values = tuple(value.split('@', 1)) if '@' in value else (value, value)
+
+    def __repr__(self):
+        return f'{self.field}{self.operator}{self.value}'
+
+    def match(self, record):
+        actual = field_value(record, self.field)
+        op = self.operator
+        if op == '=':
+            return actual == self.value
+        if op == '!=':
+            return actual != self.value
+        if op in ('>', '>=', '<', '<='):
+            if actual == '':
+                return False
+            return compare(actual, self.value, op)
+        if op == 'IN':
+            return actual in self.values
+        if op == 'NOT IN':
+            return actual not in self.values
+        if op == 'STARTSWITH':
+            return actual.startswith(self.value)
+        if op == 'ENDSWITH':
+            return actual.endswith(self.value)
+        if op == 'LIKE':
+            return self.value.lower() in actual.lower()
+        if op == 'NOT LIKE':
+            return self.value.lower() not in actual.lower()
+        if op == 'ISEMPTY':
+            return actual == ''
+        if op == 'ISNOTEMPTY':
+            return actual != ''
+        if op == 'BETWEEN':
+            return actual != '' and compare(actual, self.values[0], '>=') and compare(actual, self.values[1], '<=')
+        return True  # ANYTHING
+
+
+class Query:
+    """
+    Parsed encoded query.
+
+    :param groups: List of groups, each a list of clauses, each a list of Condition objects.
+    :param order_by: List of (field, descending) tuples.
+    """
+
+    def __init__(self, groups=None, order_by=None):
+        self.groups = groups or []
+        self.order_by = order_by or []
+
+    def match(self, record):
+        if not self.groups:
+            return True
+        return any(
+            all(any(c.match(record) for c in clause) for clause in group)
+            for group in self.groups
+        )
+
+    def and_conditions(self, conditions):
+        """Returns a new query with the conditions added to every group."""
+
+        clauses = [[c] for c in conditions]
+        groups = [group + clauses for group in self.groups] if self.groups else ([clauses] if clauses else [])
+        return Query(groups, self.order_by)
+
+
+def parse(encoded):
+    """
+    Parses an encoded query.
+
+    :param encoded: Encoded query, as sent in sysparm_query.
+    :rtype: Query
+    """
+
+    groups = []
+    order_by = []
+    for part in (encoded or '').split('^NQ'):
+        group = []
+        for term in part.split('^'):
+            if not term:
+                continue
+            if term.startswith('ORDERBYDESC'):
+                order_by.append((term[11:], True))
+            elif term.startswith('ORDERBY'):
+                order_by.append((term[7:], False))
+            elif term == 'EQ':
+                continue
+            elif term.startswith('OR') and group and CONDITION.fullmatch(term[2:]):
+                group[-1].append(condition(term[2:]))
+            else:
+                group.append([condition(term)])
+        if group:
+            groups.append(group)
+    return Query(groups, order_by)
+
+
+def condition(term):
+    m = CONDITION.fullmatch(term)
+    if not m:
+        raise QueryError(f'Invalid query term {term}')
+    return Condition(*m.groups())
+
+
+def field_value(record, field):
+    """Returns the value of a field as a string, with '' for missing fields."""
+
+    value = record.get(field)
+    if isinstance(value, dict):
+        value = value.get('value')
+    return '' if value is None else str(value)
+
+
+def compare(a, b, op):
+    if NUMBER.match(a) and NUMBER.match(b):
+        a, b = float(a), float(b)
+    if op == '>':
+        return a > b
+    if op == '>=':
+        return a >= b
+    if op == '<':
+        return a < b
+    return a <= b
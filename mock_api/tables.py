@@ -0,0 +1,521 @@
+"""
+Synthetic tables of the mock API.
+
+Records are generated on demand from their position n in the table, so a table
+of millions of records costs no memory until it is read. The sys_id, number,
+sys_created_on and sys_updated_on fields never decrease with n, which lets
+conditions and ORDERBY on them map to index ranges instead of table scans.
+Other conditions and orderings scan the candidate records once, and the result
+is cached for the following pages of the same query.
+
+The incident table also holds the static records of mock_data.json. The
+sys_db_object and sys_dictionary tables describe the other tables.
+"""
+
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
+import threading
+import time
+
+from functools import lru_cache
+from pathlib import Path
+
+from query import condition, field_value, parse
+
+# Record prefixes and kinds of the known tables
+TABLES = {
+    'task': ('TASK', 'task'),
+    'incident': ('INC', 'task'),
+    'problem': ('PRB', 'task'),
+    'change_request': ('CHG', 'task'),
+    'sc_request': ('REQ', 'task'),
+    'sc_req_item': ('RITM', 'task'),
+    'sc_task': ('SCTASK', 'task'),
+    'sys_user': (None, 'user'),
+    'sys_user_group': (None, 'group'),
+    'core_company': (None, 'company'),
+    'cmdb_ci': (None, 'ci'),
+    'sys_db_object': (None, 'meta'),
+    'sys_dictionary': (None, 'meta'),
+}
+
+# Tables whose records are generated from the configuration, not from their position
+METADATA_TABLES = ('sys_db_object', 'sys_dictionary')
+
+# Tables referenced by each kind of record
+REFERENCES = {
+    'task': {
+        'opened_by': 'sys_user', 'caller_id': 'sys_user', 'assigned_to': 'sys_user',
+        'assignment_group': 'sys_user_group', 'company': 'core_company', 'cmdb_ci': 'cmdb_ci'
+    },
+    'user': {'company': 'core_company'},
+    'group': {'manager': 'sys_user'},
+    'company': {},
+    'ci': {'company': 'core_company', 'assigned_to': 'sys_user'},
+    'custom': {},
+    'meta': {},
+}
+
+# Types of the generated fields that are not strings or references
+FIELD_TYPES = {
+    'sys_id': 'GUID', 'sys_class_name': 'sys_class_name', 'email': 'email',
+    'sys_created_on': 'glide_date_time', 'sys_updated_on': 'glide_date_time', 'opened_at': 'glide_date_time',
+    'sys_mod_count': 'integer', 'state': 'integer', 'priority': 'integer', 'impact': 'integer',
+    'urgency': 'integer', 'reassignment_count': 'integer', 'operational_status': 'integer',
+    'active': 'boolean',
+}
+
+# Fields whose values never decrease with the record position
+INDEXED_FIELDS = ('sys_id', 'number', 'sys_created_on', 'sys_updated_on')
+UNIQUE_FIELDS = ('sys_id', 'number')
+
+EPOCH = 1640995200  # 2022-01-01 00:00:00
+
+FIRST_NAMES = ('Abel', 'Beth', 'Carla', 'David', 'Fred', 'Joe', 'Maria', 'Rob', 'Sam', 'Tina')
+LAST_NAMES = ('Tuter', 'Anglin', 'Hewitt', 'Loo', 'Luddy', 'Employee', 'Boon', 'Woodard', 'Lopez', 'Ford')
+CATEGORIES = ('inquiry', 'software', 'hardware', 'network', 'database')
+
+with open(Path(__file__).with_name('mock_data.json')) as f:
+    STATIC_RECORDS = {'incident': json.load(f)}
+
+
+class TableNotFoundException(Exception):
+    def __init__(self, table: str):
+        self.table = table
+
+
+class Instance:
+    """
+    Records of every table, generated from a configuration.
+
+    :param config: Config object with the rows, table_rows and width options.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.base_url = 'http://localhost:5000'
+        self.record = lru_cache(maxsize=20000)(self._record)
+        self.plan = lru_cache(maxsize=64)(self._plan)
+        self.static = lru_cache(maxsize=None)(self._static)
+
+    def reset(self, base_url=None):
+        """Drops the cached records and query plans, after a configuration change."""
+
+        if base_url:
+            self.base_url = base_url
+        self.record.cache_clear()
+        self.plan.cache_clear()
+        self.static.cache_clear()
+
+    def tables(self):
+        return set(TABLES) | set(self.config.table_rows)
+
+    def rows(self, table):
+        return self.config.table_rows.get(table, 0 if table in METADATA_TABLES else self.config.rows)
+
+    def check(self, table):
+        if table not in self.tables():
+            raise TableNotFoundException(table)
+
+    def key(self, table, field):
+        """Returns the function that computes an indexed field from the record position."""
+
+        prefix = TABLES.get(table, (None,))[0]
+        if field == 'sys_id':
+            return sys_id
+        if field == 'number' and prefix:
+            return lambda n: f'{prefix}{n:07d}'
+        if field == 'sys_created_on':
+            return lambda n: timestamp(EPOCH + n // 2 * 60)
+        if field == 'sys_updated_on':
+            return lambda n: timestamp(EPOCH + n // 2 * 60 + 3600)
+        return None
+
+    def _record(self, table, n):
+        prefix, kind = TABLES.get(table, (None, 'custom'))
+        record = {}
+        if prefix:
+            record['number'] = f'{prefix}{n:07d}'
+        record.update({
+            'sys_id': sys_id(n),
+            'sys_class_name': table,
+            'sys_created_on': timestamp(EPOCH + n // 2 * 60),
+            'sys_created_by': 'admin',
+            'sys_updated_on': timestamp(EPOCH + n // 2 * 60 + 3600),
+            'sys_updated_by': 'admin',
+            'sys_mod_count': str(n % 5),
+        })
+        first, last = FIRST_NAMES[n % 10], LAST_NAMES[n // 10 % 10]
+        if kind == 'task':
+            record.update({
+                'active': 'true' if n % 3 else 'false',
+                'state': str(n % 7 + 1),
+                'priority': str(n % 5 + 1),
+                'impact': str(n % 3 + 1),
+                'urgency': str(n % 3 + 1),
+                'category': CATEGORIES[n % len(CATEGORIES)],
+                'short_description': f'Synthetic {table} {n}',
+                'description': f'Synthetic {table} {n}, generated by the mock API',
+                'opened_at': record['sys_created_on'],
+                'reassignment_count': str(n % 4),
+            })
+        elif kind == 'user':
+            record.update({
+                'user_name': f'{first}.{last}.{n}'.lower(),
+                'name': f'{first} {last}',
+                'first_name': first,
+                'last_name': last,
+                'email': f'{first}.{last}.{n}@example.com'.lower(),
+                'active': 'true',
+            })
+        elif kind == 'group':
+            record.update({'name': f'Group {n}', 'description': f'Synthetic group {n}', 'active': 'true'})
+        elif kind == 'company':
+            record.update({'name': f'Company {n}', 'city': 'San Diego', 'country': 'USA'})
+        elif kind == 'ci':
+            record.update({'name': f'CI {n}', 'operational_status': str(n % 6 + 1)})
+        else:
+            record['name'] = f'{table} {n}'
+
+        for field, target in REFERENCES[kind].items():
+            rows = self.rows(target)
+            record[field] = self.reference(target, sys_id(n * 7919 % rows)) if rows else ''
+
+        for k in range(len(record), self.config.width):
+            record[f'u_field_{k}'] = f'Value {k} of record {n}'
+        return record
+
+    def reference(self, table, value):
+        return {'link': f'{self.base_url}/api/now/table/{table}/{value}', 'value': value}
+
+    def get(self, table, record_id):
+        """Returns a copy of the record with the given sys_id, or None if there is none."""
+
+        for record in self.static(table):
+            if record['sys_id'] == record_id:
+                return json.loads(json.dumps(record))
+        if len(record_id) == 32:
+            try:
+                n = int(record_id, 16)
+            except ValueError:
+                return None
+            if n < self.rows(table) and sys_id(n) == record_id:
+                return dict(self.record(table, n))
+        return None
+
+    def display_value(self, reference):
+        """Returns the display value of a reference field."""
+
+        table = reference['link'].rsplit('/', 2)[-2]
+        record = self.get(table, reference['value'])
+        if record is None:
+            return ''
+        return record.get('number') or record.get('name') or record['sys_id']
+
+    def _static(self, table):
+        """Returns the records of a table that are not generated from their position."""
+
+        if table == 'sys_db_object':
+            return [self.table_object(t) for t in self.described_tables()]
+        if table == 'sys_dictionary':
+            return [entry for t in self.described_tables() for entry in self.dictionary(t)]
+        return STATIC_RECORDS.get(table, [])
+
+    def described_tables(self):
+        return sorted(self.tables() - set(METADATA_TABLES))
+
+    def super_class(self, table):
+        return 'task' if table != 'task' and TABLES.get(table, (None, None))[1] == 'task' else None
+
+    def table_object(self, table):
+        """Returns the sys_db_object record of a table."""
+
+        parent = self.super_class(table)
+        return {
+            'sys_id': metadata_id(table),
+            'sys_class_name': 'sys_db_object',
+            'name': table,
+            'label': table.replace('_', ' ').title(),
+            'super_class': self.reference('sys_db_object', metadata_id(parent)) if parent else '',
+        }
+
+    def dictionary(self, table):
+        """
+        Returns the sys_dictionary records of a table: the collection entry and
+        the fields of its records that its super class does not define. Fields
+        of the static records are strings, or references if they have a link.
+        """
+
+        _, kind = TABLES.get(table, (None, 'custom'))
+        parent = self.super_class(table)
+        inherited = set(self._record(parent, 0)) if parent else set()
+        entries = [{
+            'sys_id': metadata_id(f'{table}.'), 'sys_class_name': 'sys_dictionary', 'name': table,
+            'element': '', 'internal_type': self.reference('sys_glide_object', 'collection'), 'reference': '',
+        }]
+        references = dict(REFERENCES[kind])
+        fields = dict.fromkeys(self._record(table, 0))
+        for record in STATIC_RECORDS.get(table, ()):
+            for field, value in record.items():
+                fields.setdefault(field)
+                if isinstance(value, dict) and field not in references:
+                    references[field] = value['link'].rsplit('/', 2)[-2]
+        for field in fields:
+            if field in inherited:
+                continue
+            target = references.get(field)
+            internal_type = 'reference' if target else FIELD_TYPES.get(field, 'string')
+            entries.append({
+                'sys_id': metadata_id(f'{table}.{field}'),
+                'sys_class_name': 'sys_dictionary',
+                'name': table,
+                'element': field,
+                'internal_type': self.reference('sys_glide_object', internal_type),
+                'reference': self.reference('sys_db_object', target) if target else '',
+            })
+        return entries
+
+    def query(self, table, encoded='', filters=()):
+        """
+        Returns the plan of a query.
+
+        :param table: Table name.
+        :param encoded: Encoded query.
+        :param filters: Tuple of (field, value) pairs that records must equal.
+        :rtype: Plan
+        """
+
+        self.check(table)
+        return self.plan(table, encoded or '', tuple(filters))
+
+    def _plan(self, table, encoded, filters):
+        query = parse(encoded)
+        if filters:
+            query = query.and_conditions([condition(f'{f}={v}') for f, v in filters])
+        static = [r for r in self.static(table) if query.match(r)]
+        seq, exact = self.candidates(table, query)
+
+        order_by = [(f, desc) for f, desc in query.order_by if f]
+        key = sort_key(order_by) if order_by else None
+        if order_by:
+            fields = [f for f, _ in order_by]
+            descending = {desc for _, desc in order_by}
+            if fields[0] in UNIQUE_FIELDS or (all(f in INDEXED_FIELDS for f in fields) and len(descending) == 1):
+                if order_by[0][1]:
+                    seq = seq[::-1]
+            else:
+                seq = [n for n in seq if exact or query.match(self.record(table, n))]
+                seq.sort(key=lambda n: key(self.record(table, n)))
+                exact = True
+            static.sort(key=key)
+
+        if not exact:
+            # Filters as the pages are read, so the first pages do not wait for a full scan
+            seq = Filtered(seq, lambda n: query.match(self.record(table, n)))
+        if key is None:
+            positions = [0] * len(static)
+        elif isinstance(seq, Filtered) and static:
+            positions = None
+        else:
+            positions = [bisect.bisect_left(seq, key(r), key=lambda n: key(self.record(table, n))) for r in static]
+        return Plan(self, table, static, positions, seq, key)
+
+    def candidates(self, table, query):
+        """
+        Returns the positions of the synthetic records that may match a query,
+        and whether they all match it.
+
+        Conditions on indexed fields narrow the positions to a range, or to a
+        list of positions for IN. Queries with more than one group are narrowed
+        to a range that covers all their groups.
+        """
+
+        rows = self.rows(table)
+        if not query.groups:
+            return range(rows), True
+
+        covered = []
+        exact = len(query.groups) == 1
+        for group in query.groups:
+            seq = range(rows)
+            for clause in group:
+                narrowed = self.narrow(table, clause[0], rows) if len(clause) == 1 else None
+                if narrowed is None:
+                    exact = False
+                    continue
+                seq = intersect(seq, narrowed)
+            covered.append(seq)
+
+        if len(covered) == 1:
+            return covered[0], exact
+        ranges = [r if isinstance(r, range) else range(r[0], r[-1] + 1) if r else range(0) for r in covered]
+        ranges = [r for r in ranges if r]
+        if not ranges:
+            return range(0), False
+        return range(min(r.start for r in ranges), max(r.stop for r in ranges)), False
+
+    def narrow(self, table, condition, rows):
+        """Returns the positions matching a condition on an indexed field, or None."""
+
+        key = self.key(table, condition.field)
+        if key is None:
+            return None
+
+        def lower(value):
+            return bisect.bisect_left(range(rows), value, key=key)
+
+        def upper(value):
+            return bisect.bisect_right(range(rows), value, key=key)
+
+        op, value = condition.operator, condition.value
+        if op == '=':
+            return range(lower(value), upper(value))
+        if op == '>':
+            return range(upper(value), rows)
+        if op == '>=':
+            return range(lower(value), rows)
+        if op == '<':
+            return range(0, lower(value))
+        if op == '<=':
+            return range(0, upper(value))
+        if op == 'BETWEEN':
+            return range(lower(condition.values[0]), upper(condition.values[1]))
+        if op == 'STARTSWITH':
+            return range(lower(value), lower(value + '\uffff'))
+        if op == 'IN':
+            return sorted({n for v in condition.values for n in range(lower(v), upper(v))})
+        return None
+
+
+class Plan:
+    """
+    Records matching a query, in order: the static records that match it, the
+    positions where they go among the synthetic records, and the positions of
+    the synthetic records. Without positions, the static records are merged
+    into the synthetic ones by their sort key as they are read.
+    """
+
+    def __init__(self, instance, table, static, positions, seq, key=None):
+        self.instance = instance
+        self.table = table
+        self.static = static
+        self.positions = positions
+        self.seq = seq
+        self.key = key
+
+    def __len__(self):
+        return len(self.static) + len(self.seq)
+
+    def __iter__(self):
+        return iter(self.slice(0, len(self)))
+
+    def slice(self, start, stop):
+        """Returns copies of the records from start to stop."""
+
+        if self.positions is None:
+            synthetic = ((self.key(self.record(n)), n) for n in self.seq)
+            static = ((self.key(r), r) for r in self.static)
+            merged = heapq.merge(static, synthetic, key=lambda item: item[0])
+            return [self.copy(item) for _, item in itertools.islice(merged, start, stop)]
+
+        records = []
+        k = sum(1 for i, pos in enumerate(self.positions) if pos + i < start)
+        for p in range(start, stop):
+            if k < len(self.static) and self.positions[k] + k == p:
+                records.append(self.copy(self.static[k]))
+                k += 1
+                continue
+            try:
+                records.append(self.copy(self.seq[p - k]))
+            except IndexError:
+                break
+        return records
+
+    def record(self, n):
+        return self.instance.record(self.table, n)
+
+    def copy(self, item):
+        """Returns a copy of a static record, or of the synthetic record at position item."""
+
+        if isinstance(item, dict):
+            return json.loads(json.dumps(item))
+        return dict(self.record(item))
+
+
+class Filtered:
+    """Positions of the records that match a query, filtered as they are read."""
+
+    def __init__(self, positions, match):
+        self.items = []
+        self.source = iter(positions)
+        self.match = match
+        self.lock = threading.Lock()
+
+    def __getitem__(self, i):
+        with self.lock:
+            while len(self.items) <= i:
+                n = next(self.source, None)
+                if n is None:
+                    raise IndexError(i)
+                if self.match(n):
+                    self.items.append(n)
+            return self.items[i]
+
+    def __len__(self):
+        with self.lock:
+            self.items.extend(n for n in self.source if self.match(n))
+            return len(self.items)
+
+
+class Descending:
+    """Sort key wrapper that reverses the order of its value."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def sort_key(order_by):
+    def key(record):
+        return tuple(
+            Descending(field_value(record, f)) if desc else field_value(record, f) for f, desc in order_by
+        )
+    return key
+
+
+def intersect(a, b):
+    """Returns the positions in both a and b, which are ranges or sorted lists."""
+
+    if isinstance(a, range) and isinstance(b, range):
+        return range(max(a.start, b.start), max(max(a.start, b.start), min(a.stop, b.stop)))
+    if isinstance(a, range):
+        a, b = b, a
+    elif not isinstance(b, range):
+        b = set(b)
+    return [n for n in a if n in b]
+
+
+def sys_id(n):
+    return f'{n:032x}'
+
+
+def metadata_id(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def timestamp(seconds):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(seconds))
+
+
+def etag(body):
+    return '"' + hashlib.md5(body).hexdigest() + '"'
@@ -17,4 +17,17 @@ Simple usage:
 """
 
 from servicenowpy.servicenow import Client, Table
-from servicenowpy.exceptions import StatusCodeError
\ No newline at end of file
+from servicenowpy.aio import AsyncClient, AsyncTable
+from servicenowpy.batch import Batch
+from servicenowpy.buffer import WriteBuffer
+from servicenowpy.cache import ResponseCache
+from servicenowpy.exceptions import StatusCodeError
+from servicenowpy.extraction import Extraction
+from servicenowpy.group import ClientGroup
+from servicenowpy.metrics import DecodeEvent, OpenTelemetryHook, RequestEvent, Stats
+from servicenowpy.mirror import TableMirror
+from servicenowpy.records import RecordSet, Row
+from servicenowpy.references import ReferenceResolver
+from servicenowpy.scheduler import RequestScheduler
+from servicenowpy.schema import SchemaCache, TableSchema
+from servicenowpy.transport import HTTPXTransport, MemoryTransport, RequestsTransport, Transport
\ No newline at end of file
@@ -0,0 +1,78 @@
+FUNCTIONS = ('sum', 'avg', 'min', 'max')
+
+
+def make_params(query=None, group_by=None, count=True, functions=None):
+    """
+    Returns the query parameters of an Aggregate API request.
+
+    :param query: Encoded query.
+    :param group_by: Field name, or list of field names, to group by.
+    :param count: If set to True, counts the records.
+    :param functions: Dict mapping 'sum', 'avg', 'min' and 'max' to a field name or list of field names.
+    :rtype: dict
+    """
+
+    params = {}
+    if query:
+        params['sysparm_query'] = query
+    if count:
+        params['sysparm_count'] = 'true'
+    if group_by:
+        params['sysparm_group_by'] = ','.join(field_list(group_by))
+    for name, fields in (functions or {}).items():
+        if name not in FUNCTIONS:
+            raise ValueError(f'Invalid function {name}. Expected one of {", ".join(FUNCTIONS)}')
+        if fields:
+            params[f'sysparm_{name}_fields'] = ','.join(field_list(fields))
+    return params
+
+
+def read_result(result, group_by=None):
+    """
+    Returns the compact form of an Aggregate API result: a dict with the count
+    and the 'sum', 'avg', 'min' and 'max' values by field. When grouped, returns
+    a dict of those keyed by the group value, or by a tuple of values if there
+    is more than one group_by field.
+
+    :param result: The 'result' of the decoded response body.
+    :param group_by: Field name, or list of field names, the result is grouped by.
+    :rtype: dict
+    """
+
+    if not group_by:
+        return read_stats(result.get('stats', {}))
+
+    fields = field_list(group_by)
+    groups = {}
+    for group in result:
+        values = {g['field']: g['value'] for g in group.get('groupby_fields', [])}
+        key = tuple(values.get(f, '') for f in fields)
+        groups[key[0] if len(key) == 1 else key] = read_stats(group.get('stats', {}))
+    return groups
+
+
+def read_stats(stats):
+    compact = {}
+    for name, value in stats.items():
+        if name == 'count':
+            compact['count'] = int(value)
+        elif isinstance(value, dict):
+            compact[name] = {field: number(v) for field, v in value.items()}
+    return compact
+
+
+def number(value):
+    """Returns a numeric string as an int or float, and any other value as is."""
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def field_list(fields):
+    return fields.split(',') if isinstance(fields, str) else list(fields)
@@ -0,0 +1,418 @@
+import asyncio
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .codec import get_codec
+from .exceptions import StatusCodeError
+from .servicenow import Client, Table
+
+
+class AsyncClient:
+    """
+    Represents a ServiceNow instance, for use with asyncio.
+
+    Requires the httpx library (pip install servicenowpy[async]). The client owns
+    a pool of keep-alive connections shared by every AsyncTable object it creates,
+    and a semaphore that caps the number of requests in flight. It can be used as
+    an async context manager, which closes the pool on exit.
+
+    :param instance_url: ServiceNow instance URL.
+    :param user: Instance user.
+    :param pwd: Instance password.
+    :param max_connections: Maximum number of connections open to the instance.
+    :param max_keepalive_connections: Maximum number of idle connections kept alive.
+    :param keepalive_expiry: Seconds an idle connection is kept alive.
+    :param max_concurrency: Maximum number of requests in flight. Defaults to max_connections.
+    :param timeout: Timeout in seconds for every request, either a float or a (connect, read) tuple.
+    :param codec: JSON codec of the request and response bodies: 'json', 'orjson', 'ujson', 'auto'
+        for the fastest one installed, or an object with dumps and loads methods.
+    :param http2: If set to True, multiplexes the requests over HTTP/2 connections
+        with the instances that support it. Requires h2 (pip install servicenowpy[http2]).
+    """
+
+    def __init__(
+        self,
+        instance_url: str,
+        user: str,
+        pwd: str,
+        max_connections=10,
+        max_keepalive_connections=10,
+        keepalive_expiry=5.0,
+        max_concurrency=None,
+        timeout=None,
+        codec=None,
+        http2=False
+    ):
+        if httpx is None:
+            raise ImportError("AsyncClient requires httpx. Install it with 'pip install servicenowpy[async]'.")
+
+        self.__instance_url = Client.make_api_url(self, instance_url)
+        self.__credentials = user, pwd
+        self.max_concurrency = max_concurrency or max_connections
+        self.codec = get_codec(codec)
+        self.__semaphore = None
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.session = httpx.AsyncClient(
+            http2=http2,
+            auth=self.__credentials,
+            headers={"Accept":"application/json"},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=timeout
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+
+    @property
+    def semaphore(self):
+        """Semaphore that caps the number of requests in flight."""
+
+        # Created on first use so it binds to the running event loop
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.__semaphore
+
+
+    def table(self, table):
+        """
+        Returns servicenowpy.AsyncTable object.
+
+        :param table: The table name.
+        :rtype: servicenowpy.AsyncTable
+        """
+
+        return AsyncTable(table, self.__instance_url, self.__credentials, self)
+
+
+    async def aclose(self):
+        """Closes all the pooled connections."""
+
+        await self.session.aclose()
+
+
+class AsyncTable:
+    """
+    Represents ServiceNow's Table API, for use with asyncio.
+
+    :param table: The table name.
+    :param instance_url: ServiceNow instance URL".
+    :param credentials: Tuple containing user and password, respectively.
+    :param client: The servicenowpy.AsyncClient whose connections are used. If omitted, the table creates its own.
+    """
+
+    def __init__(self, table, instance_url, credentials: tuple, client=None):
+        self.__instance_url = instance_url
+        self.__credentials = credentials
+        self.__client = client
+        # URL building and pagination links are shared with the synchronous Table
+        self.__table = Table(table, instance_url, credentials)
+
+    @property
+    def client(self):
+        """The servicenowpy.AsyncClient used to send the requests."""
+
+        if self.__client is None:
+            self.__client = AsyncClient(self.__instance_url, *self.__credentials)
+        return self.__client
+
+    async def get(
+        self,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        page_size=None,
+        **kwargs
+    ):
+        """
+        Sends a GET request to the instance table.
+
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param page_size: Number of records per page (sysparm_limit).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: list
+        """
+
+        result = []
+        async for page in self.iter_pages(api_version, headers, verbose, page_size, **kwargs):
+            result.extend(page)
+        return result
+
+    async def iter_pages(
+        self,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        page_size=None,
+        **kwargs
+    ):
+        """
+        Sends GET requests to the instance table, following the pagination links,
+        and yields the records of each page as soon as it is decoded.
+
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param page_size: Number of records per page (sysparm_limit).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: async generator
+        """
+
+        if page_size:
+            kwargs['sysparm_limit'] = page_size
+        url = self.make_url(api_version, **kwargs)
+        if verbose:
+            print(url)
+
+        while url:
+            response = await self._request('GET', url, headers)
+            url = self.__table.get_next_link(response)
+            page = self.client.codec.loads(response.content)['result']
+            del response
+            yield page
+
+    async def iter_records(
+        self,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        page_size=None,
+        **kwargs
+    ):
+        """
+        Sends GET requests to the instance table and yields one record at a time,
+        fetching the next page only when the current one is exhausted.
+
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param page_size: Number of records per page (sysparm_limit).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: async generator
+        """
+
+        async for page in self.iter_pages(api_version, headers, verbose, page_size, **kwargs):
+            for record in page:
+                yield record
+
+    async def get_record(
+        self,
+        sys_id: str,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Sends a GET request to the instance table. Returns only one record, with the given sys_id.
+
+        :param sys_id: Record unique ID.
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: All query parameters to the URL.
+        :rtype: dict
+        """
+
+        url = self.make_url(api_version, sys_id, **kwargs)
+        if verbose:
+            print(url)
+
+        response = await self._request('GET', url, headers)
+
+        return self.client.codec.loads(response.content)['result']
+
+    async def get_record_by_number(
+        self,
+        number: str,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Sends a GET request to the instance table. Adds 'number' to the query parameters.
+
+        :param number: Record number.
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: Other query parameters to the URL.
+        :rtype: list
+        """
+
+        url = self.make_url(api_version, **kwargs)
+        operator = '&' if kwargs else '?'
+        url += f'{operator}number={number}'
+        if verbose:
+            print(url)
+
+        response = await self._request('GET', url, headers)
+
+        return self.client.codec.loads(response.content)['result']
+
+    async def patch(
+        self,
+        sys_id: str,
+        data: dict,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Sends a PATCH request to the instance table.
+
+        :param sys_id: Record unique ID.
+        :param data: Fields and values to update in the record.
+        :param api_version: API version (if API versioning is enabled).
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: All query parameters to the URL.
+        :rtype: dict
+        """
+
+        url = self.make_url(api_version, sys_id=sys_id, **kwargs)
+        if verbose:
+            print(url)
+
+        req_body = self.client.codec.dumps(data)
+        response = await self._request('PATCH', url, headers, req_body)
+
+        return self.client.codec.loads(response.content)['result']
+
+    async def post(
+        self,
+        data: dict,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Sends a POST request to the instance table.
+
+        :param data: Fields and values to the new record.
+        :param api_version: API version (if API versioning is enabled).
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: All query parameters to the URL.
+        :rtype: dict
+        """
+
+        url = self.make_url(api_version, **kwargs)
+        if verbose:
+            print(url)
+
+        req_body = self.client.codec.dumps(data)
+        response = await self._request('POST', url, headers, req_body, 201)
+
+        return self.client.codec.loads(response.content)['result']
+
+    async def put(
+        self,
+        sys_id: str,
+        data: dict,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Sends a PUT request to the instance table.
+
+        :param sys_id: Record unique ID.
+        :param data: New values to the record.
+        :param api_version: API version (if API versioning is enabled).
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: All query parameters to the URL.
+        :rtype: dict
+        """
+
+        url = self.make_url(api_version, sys_id=sys_id, **kwargs)
+        if verbose:
+            print(url)
+
+        req_body = self.client.codec.dumps(data)
+        response = await self._request('PUT', url, headers, req_body)
+
+        return self.client.codec.loads(response.content)['result']
+
+    async def delete(
+        self,
+        sys_id: str,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Sends a DELETE request to the instance table.
+
+        :param sys_id: Record unique ID.
+        :param api_version: API version (if API versioning is enabled).
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: All query parameters to the URL.
+        """
+
+        url = self.make_url(api_version, sys_id=sys_id, **kwargs)
+        if verbose:
+            print(url)
+
+        response = await self._request('DELETE', url, headers, expected=204)
+        return response.content
+
+    async def _request(self, method, url, headers, data=None, expected=200):
+        """
+        Sends a request through the client connection pool and checks its status code.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param headers: Request headers.
+        :param data: Request body.
+        :param expected: Expected status code.
+        :rtype: httpx.Response
+        """
+
+        async with self.client.semaphore:
+            if data is not None:
+                headers = {"Content-Type": "application/json", **headers}
+            response = await self.client.session.request(method, url, headers=headers, content=data)
+        self.check_status_code(response, expected)
+        return response
+
+    def check_status_code(self, response, expected=200):
+        """
+        Checks if the given response status code is as expected.
+        Raises a StatusCodeError if it is not.
+
+        :param response: httpx.Response object.
+        :param expected: Expected status code.
+        """
+        if response.status_code != expected:
+            raise StatusCodeError.from_response(response, self.client.codec.loads)
+
+    def make_url(self, api_version=None, sys_id=None, **kwargs):
+        """
+        Returns a complete url to send in the request.
+
+        :rtype: str
+        """
+
+        return self.__table.make_url(api_version, sys_id, **kwargs)
@@ -0,0 +1,234 @@
+import base64
+import json
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from .exceptions import StatusCodeError
+
+# Headers sent with every operation inside a batch request
+ITEM_HEADERS = [
+    {"name": "Content-Type", "value": "application/json"},
+    {"name": "Accept", "value": "application/json"}
+]
+
+
+class Batch:
+    """
+    Collects Table API operations and sends them through ServiceNow's Batch API.
+
+    Operations are split into chunks of chunk_size, and up to workers chunks are
+    sent concurrently. The results keep the order in which the operations were
+    added. An operation that fails does not abort the others: its result is the
+    StatusCodeError it would have raised. A batch request that fails, on a
+    connection error or a timeout, fails only the operations of its chunk,
+    whose result is that exception.
+
+    Used as a context manager, the operations are sent on exit and the results
+    are left in the results attribute.
+
+    :param client: The servicenowpy.Client used to send the requests.
+    :param chunk_size: Maximum number of operations per batch request.
+    :param workers: Number of batch requests sent concurrently.
+    """
+
+    def __init__(self, client, chunk_size=100, workers=4):
+        self.__client = client
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.operations = []
+        self.results = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.send()
+
+    def __len__(self):
+        return len(self.operations)
+
+    def add(self, method, url, data=None, expected=200):
+        """
+        Adds an operation to the batch and returns its index in the results.
+
+        :param method: HTTP method.
+        :param url: Full Table API URL, as returned by Table.make_url.
+        :param data: Request body.
+        :param expected: Expected status code.
+        :rtype: int
+        """
+
+        parts = urlsplit(url)
+        path = f'{parts.path}?{parts.query}' if parts.query else parts.path
+        self.operations.append((method, path, data, expected))
+        return len(self.operations) - 1
+
+    def post(self, table, data: dict, api_version=None, **kwargs):
+        """
+        Adds a POST operation to the batch and returns its index in the results.
+
+        :param table: servicenowpy.Table object.
+        :param data: Fields and values to the new record.
+        :param api_version: API version (if API versioning is enabled).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: int
+        """
+
+        return self.add('POST', table.make_url(api_version, **kwargs), data, 201)
+
+    def patch(self, table, sys_id: str, data: dict, api_version=None, **kwargs):
+        """
+        Adds a PATCH operation to the batch and returns its index in the results.
+
+        :param table: servicenowpy.Table object.
+        :param sys_id: Record unique ID.
+        :param data: Fields and values to update in the record.
+        :param api_version: API version (if API versioning is enabled).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: int
+        """
+
+        return self.add('PATCH', table.make_url(api_version, sys_id=sys_id, **kwargs), data)
+
+    def put(self, table, sys_id: str, data: dict, api_version=None, **kwargs):
+        """
+        Adds a PUT operation to the batch and returns its index in the results.
+
+        :param table: servicenowpy.Table object.
+        :param sys_id: Record unique ID.
+        :param data: New values to the record.
+        :param api_version: API version (if API versioning is enabled).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: int
+        """
+
+        return self.add('PUT', table.make_url(api_version, sys_id=sys_id, **kwargs), data)
+
+    def delete(self, table, sys_id: str, api_version=None, **kwargs):
+        """
+        Adds a DELETE operation to the batch and returns its index in the results.
+
+        :param table: servicenowpy.Table object.
+        :param sys_id: Record unique ID.
+        :param api_version: API version (if API versioning is enabled).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: int
+        """
+
+        return self.add('DELETE', table.make_url(api_version, sys_id=sys_id, **kwargs), expected=204)
+
+    def send(self):
+        """
+        Sends all the operations and returns their results, in the order they were added.
+        Each result is the record (or the response content, for DELETE operations),
+        a StatusCodeError, or the requests.RequestException of a failed batch request.
+
+        :rtype: list
+        """
+
+        results = [None] * len(self.operations)
+        starts = range(0, len(self.operations), self.chunk_size)
+
+        def send_chunk(start):
+            chunk = self.operations[start:start + self.chunk_size]
+            try:
+                response = self.__client._send(
+                    'POST',
+                    f'{self.__client.api_url}v1/batch',
+                    {"Accept":"application/json", "Content-Type":"application/json"},
+                    self.__client.codec.dumps(self.make_body(chunk, start))
+                )
+                if response.status_code != 200:
+                    raise StatusCodeError.from_data(decode(response.content), response.status_code)
+                try:
+                    chunk_results = self.read_results(self.__client.codec.loads(response.content), chunk, start)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    # Not a Batch API response, such as a sign-on page sent by a proxy
+                    raise StatusCodeError('Invalid batch response', repr(e), response.status_code) from e
+            except (StatusCodeError, requests.RequestException) as e:
+                # A failed batch request fails only its own operations, the other chunks may have been applied
+                chunk_results = [e] * len(chunk)
+            results[start:start + len(chunk)] = chunk_results
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(send_chunk, starts))
+
+        self.operations = []
+        self.results = results
+        return results
+
+    def make_body(self, chunk, start=0):
+        """
+        Returns the Batch API request body for a chunk of operations.
+        Operation ids are their indexes in the batch.
+
+        :param chunk: List of operations.
+        :param start: Index of the first operation of the chunk.
+        :rtype: dict
+        """
+
+        rest_requests = []
+        for n, (method, path, data, _) in enumerate(chunk, start):
+            item = {"id": str(n), "method": method, "url": path, "headers": ITEM_HEADERS}
+            if data is not None:
+                item["body"] = base64.b64encode(self.__client.codec.dumps(data)).decode()
+            rest_requests.append(item)
+        return {"batch_request_id": str(start), "rest_requests": rest_requests}
+
+    def read_results(self, data, chunk, start=0):
+        """
+        Returns the results of a chunk of operations from the Batch API response body.
+
+        :param data: Decoded Batch API response body.
+        :param chunk: List of operations sent.
+        :param start: Index of the first operation of the chunk.
+        :rtype: list
+        """
+
+        serviced = {int(item["id"]): item for item in data.get("serviced_requests", [])}
+        results = []
+        for n, (_, _, _, expected) in enumerate(chunk, start):
+            item = serviced.get(n)
+            if item is None:
+                results.append(StatusCodeError('Request not serviced', 'The batch request ended before it ran', None))
+                continue
+
+            content = base64.b64decode(item.get("body") or b'')
+            if item["status_code"] != expected:
+                results.append(StatusCodeError.from_data(decode(content), item["status_code"]))
+            elif expected == 204:
+                results.append(content)
+            else:
+                results.append(self.__client.codec.loads(content)['result'])
+        return results
+
+
+def unique_updates(updates):
+    """
+    Returns the (sys_id, data) pairs of bulk updates, raising ValueError if a sys_id is repeated,
+    since updates of the same record sent in concurrent chunks could be applied in any order.
+
+    :param updates: Dict, or iterable of pairs, mapping each sys_id to its data.
+    :rtype: list
+    """
+
+    pairs = list(updates.items() if isinstance(updates, dict) else updates)
+    seen = set()
+    for sys_id, _ in pairs:
+        if sys_id in seen:
+            raise ValueError(f'Record {sys_id} is updated more than once. Merge its updates into one')
+        seen.add(sys_id)
+    return pairs
+
+
+def decode(content):
+    """Returns the decoded JSON content, or None if it is not JSON."""
+
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
@@ -0,0 +1,176 @@
+import threading
+import time
+
+from concurrent.futures import Future
+
+# Fields whose values add journal entries instead of replacing a value
+JOURNAL_FIELDS = ('comments', 'work_notes')
+
+
+class PendingWrite:
+    """
+    The merged updates of a record that have not been sent yet.
+
+    :param table: servicenowpy.Table object.
+    :param url: Table API URL of the record.
+    """
+
+    __slots__ = ('table', 'url', 'data', 'futures')
+
+    def __init__(self, table, url):
+        self.table = table
+        self.url = url
+        self.data = {}
+        self.futures = []
+
+
+class WriteBuffer:
+    """
+    Write-behind buffer of record updates. Updates are accepted without waiting
+    for the instance, and successive updates of the same record are merged into
+    one, later fields overwriting earlier ones, except journal fields, whose
+    values are appended, separated by a blank line, so that no note is lost.
+    The merged updates are sent
+    through the Batch API when max_size records are pending, when the oldest
+    pending update is max_age seconds old, or when flush is called.
+
+    Each update returns a concurrent.futures.Future, which resolves to the
+    record returned by the instance after the merged update, or to the
+    StatusCodeError of a failed update. Updates of a record are sent in the
+    order they were made.
+
+    Updates still pending when the process exits are lost, so the buffer must
+    be closed. Used as a context manager, it is closed on exit.
+
+    :param client: The servicenowpy.Client used to send the requests.
+    :param max_size: Number of pending records that triggers a flush.
+    :param max_age: Seconds an update waits at most before it is sent.
+    :param chunk_size: Maximum number of records per batch request.
+    :param workers: Number of batch requests sent concurrently.
+    :param journal_fields: Names of the journal fields, such as comments and work_notes.
+    """
+
+    def __init__(self, client, max_size=100, max_age=1.0, chunk_size=100, workers=4, journal_fields=JOURNAL_FIELDS):
+        self.__client = client
+        self.max_size = max_size
+        self.max_age = max_age
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.journal_fields = set(journal_fields)
+        self.updates = 0
+        self.sent = 0
+        self.__pending = {}
+        self.__first = None
+        self.__closed = False
+        self.__thread = None
+        self.__condition = threading.Condition()
+        # Flushes one at a time, so the updates of a record are sent in order
+        self.__send_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.__pending)
+
+    def patch(self, table, sys_id: str, data: dict, api_version=None, **kwargs):
+        """
+        Adds an update of a record to the buffer and returns its future.
+
+        :param table: servicenowpy.Table object.
+        :param sys_id: Record unique ID.
+        :param data: Fields and values to update in the record.
+        :param api_version: API version (if API versioning is enabled).
+        :param **kwargs: All query parameters to the URL.
+        :rtype: concurrent.futures.Future
+        """
+
+        url = table.make_url(api_version, sys_id=sys_id, **kwargs)
+        future = Future()
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError('The write buffer is closed')
+            write = self.__pending.get(url)
+            if write is None:
+                write = self.__pending[url] = PendingWrite(table, url)
+                if self.__first is None:
+                    self.__first = time.monotonic()
+            for field, value in data.items():
+                if field in self.journal_fields and write.data.get(field):
+                    write.data[field] = f'{write.data[field]}\n\n{value}'
+                else:
+                    write.data[field] = value
+            write.futures.append(future)
+            self.updates += 1
+
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self._run, name='servicenowpy-write-buffer', daemon=True)
+                self.__thread.start()
+            if len(self.__pending) >= self.max_size:
+                self.__condition.notify()
+        return future
+
+    def flush(self):
+        """Sends the pending updates and waits until their futures are resolved."""
+
+        with self.__send_lock:
+            with self.__condition:
+                writes = list(self.__pending.values())
+                self.__pending = {}
+                self.__first = None
+            if writes:
+                self._send(writes)
+
+    def close(self):
+        """Sends the pending updates and stops the buffer. Later updates raise RuntimeError."""
+
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+        if self.__thread is not None:
+            self.__thread.join()
+        self.flush()
+
+    def _run(self):
+        """Flushes the buffer when it is full or its oldest update is too old, until it is closed."""
+
+        while True:
+            with self.__condition:
+                while True:
+                    if not self.__pending:
+                        if self.__closed:
+                            return
+                        timeout = None
+                    else:
+                        timeout = self.__first + self.max_age - time.monotonic()
+                        if self.__closed or len(self.__pending) >= self.max_size or timeout <= 0:
+                            break
+                    self.__condition.wait(timeout)
+            self.flush()
+
+    def _send(self, writes):
+        """Sends merged updates through the Batch API and resolves their futures."""
+
+        batch = self.__client.batch(self.chunk_size, self.workers)
+        for write in writes:
+            batch.add('PATCH', write.url, write.data)
+        try:
+            results = batch.send()
+        except Exception as e:
+            results = [e] * len(writes)
+        finally:
+            for table in {id(write.table): write.table for write in writes}.values():
+                table._invalidate()
+
+        self.sent += len(writes)
+        for write, result in zip(writes, results):
+            for future in write.futures:
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -0,0 +1,162 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """
+    A cached response body.
+
+    :param table: The table name.
+    :param content: Raw response body.
+    :param expires: Monotonic time after which the entry must be revalidated.
+    :param etag: Response ETag, used to revalidate the entry.
+    """
+
+    __slots__ = ('table', 'content', 'expires', 'etag')
+
+    def __init__(self, table, content, expires, etag=None):
+        self.table = table
+        self.content = content
+        self.expires = expires
+        self.etag = etag
+
+    @property
+    def fresh(self):
+        """True if the entry has not expired."""
+
+        return time.monotonic() < self.expires
+
+
+class CacheStats:
+    """Hit and miss counters of a ResponseCache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self):
+        """Share of lookups served without downloading the record again."""
+
+        total = self.hits + self.misses
+        return (self.hits + self.revalidations) / total if total else 0.0
+
+    def __repr__(self):
+        return (
+            f'CacheStats(hits={self.hits}, misses={self.misses}, '
+            f'revalidations={self.revalidations}, evictions={self.evictions})'
+        )
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of record lookups, keyed by request URL.
+
+    Entries expire after a per-table TTL. Expired entries that have an ETag are
+    revalidated with a conditional request instead of being downloaded again.
+    The cache is bounded by its number of entries and, optionally, by the size
+    of the cached bodies. It is safe to share between threads.
+
+    :param max_entries: Maximum number of cached responses.
+    :param max_bytes: Maximum total size of the cached bodies, in bytes.
+    :param ttl: Default time to live of the entries, in seconds.
+    :param table_ttls: Dict mapping table names to their own time to live.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=300, table_ttls=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.table_ttls = table_ttls or {}
+        self.stats = CacheStats()
+        self.size = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def lookup(self, url):
+        """
+        Returns the entry cached for the URL, fresh or not, or None. Fresh entries count as hits.
+
+        :param url: Request URL.
+        :rtype: servicenowpy.cache.CacheEntry
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(url)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self.__entries.move_to_end(url)
+            if entry.fresh:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            return entry
+
+    def store(self, table, url, content, etag=None):
+        """
+        Caches a response body, evicting the least recently used entries if needed.
+
+        :param table: The table name.
+        :param url: Request URL.
+        :param content: Raw response body.
+        :param etag: Response ETag.
+        """
+
+        size = len(url) + len(content)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        entry = CacheEntry(table, content, time.monotonic() + self.table_ttls.get(table, self.ttl), etag)
+        with self.__lock:
+            self.__remove(url)
+            self.__entries[url] = entry
+            self.size += size
+            while len(self.__entries) > self.max_entries or (
+                self.max_bytes is not None and self.size > self.max_bytes
+            ):
+                self.__remove(next(iter(self.__entries)))
+                self.stats.evictions += 1
+
+    def refresh(self, url):
+        """
+        Renews the TTL of an entry after a successful revalidation.
+
+        :param url: Request URL.
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(url)
+            if entry is not None:
+                entry.expires = time.monotonic() + self.table_ttls.get(entry.table, self.ttl)
+                self.stats.revalidations += 1
+
+    def invalidate(self, table):
+        """
+        Drops all the entries of a table.
+
+        :param table: The table name.
+        """
+
+        with self.__lock:
+            for url in [url for url, entry in self.__entries.items() if entry.table == table]:
+                self.__remove(url)
+
+    def clear(self):
+        """Drops all the entries."""
+
+        with self.__lock:
+            self.__entries.clear()
+            self.size = 0
+
+    def __remove(self, url):
+        entry = self.__entries.pop(url, None)
+        if entry is not None:
+            self.size -= len(url) + len(entry.content)
@@ -0,0 +1,210 @@
+import argparse
+import getpass
+import os
+import sys
+import time
+
+import requests
+
+from .codec import CODECS
+from .exceptions import StatusCodeError
+from .export import FORMATS, export_records
+from .extraction import Extraction
+from .servicenow import Client
+
+EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow'}
+
+
+class Progress:
+    """
+    Prints the number of records exported, out of the total, and the rate, on one line of stderr.
+
+    :param total: Total number of records, or None if it is unknown.
+    :param done: Number of records already exported, by a previous run.
+    :param file: Text file the progress is printed to.
+    :param interval: Minimum seconds between two prints.
+    """
+
+    def __init__(self, total=None, done=0, file=None, interval=0.5):
+        self.total = total
+        self.done = done
+        self.file = file or sys.stderr
+        self.interval = interval
+        self.__initial = done
+        self.__start = time.monotonic()
+        self.__printed = 0.0
+        self.__width = 0
+
+    def update(self, records):
+        """Adds records to the count and prints it if interval seconds passed since the last print."""
+
+        self.done += records
+        now = time.monotonic()
+        if now - self.__printed >= self.interval:
+            self.__printed = now
+            self.print()
+
+    def print(self, end=''):
+        elapsed = time.monotonic() - self.__start
+        rate = (self.done - self.__initial) / elapsed if elapsed else 0.0
+        line = f'{self.done:,}'
+        if self.total:
+            line += f'/{self.total:,} records ({min(100.0, 100 * self.done / self.total):.1f}%)'
+        else:
+            line += ' records'
+        line = f'{line}, {rate:,.0f} records/s'
+        # Pads the line to blank out the end of a longer previous one
+        self.file.write(f'\r{line.ljust(self.__width)}{end}')
+        self.__width = len(line)
+        self.file.flush()
+
+    def close(self):
+        self.print(end='\n')
+
+
+def total_count(table, query=None):
+    """
+    Returns the number of records of a query, read from the X-Total-Count header
+    of a one-record page, or None if the instance does not send it.
+
+    :param table: servicenowpy.Table object.
+    :param query: Encoded query.
+    :rtype: int
+    """
+
+    params = {'sysparm_query': query} if query else {}
+    url = table.make_url(sysparm_limit=1, sysparm_fields='sys_id', **params)
+    total = table._request('GET', url, {"Accept": "application/json"}).headers.get('X-Total-Count')
+    return int(total) if total is not None else None
+
+
+def make_parser():
+    """Returns the argument parser of the servicenowpy command."""
+
+    parser = argparse.ArgumentParser(prog='servicenowpy', description="ServiceNow's Table API from the command line.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser(
+        'export',
+        help='export the records of a table to NDJSON, CSV, Parquet or Arrow',
+        description='Streams the records of a table, or of an encoded query, to a file or to stdout.'
+    )
+    export_parser.add_argument('instance', help='instance URL, such as <instance>.service-now.com')
+    export_parser.add_argument('table', help='table name')
+    export_parser.add_argument('-u', '--user', default=os.environ.get('SERVICENOWPY_USER'),
+                        help='instance user. Defaults to $SERVICENOWPY_USER')
+    export_parser.add_argument('-q', '--query', help='encoded query (sysparm_query)')
+    export_parser.add_argument('-f', '--fields', help='comma-separated field names (sysparm_fields)')
+    export_parser.add_argument('--display-value', choices=('true', 'false', 'all'), help='sysparm_display_value')
+    export_parser.add_argument('-o', '--output', default='-', help="output file. Defaults to stdout ('-')")
+    export_parser.add_argument('--format', choices=FORMATS,
+                        help='output format. Defaults to the output file extension, or ndjson')
+    export_parser.add_argument('--page-size', type=int, default=1000, help='records per request. Defaults to 1000')
+    export_parser.add_argument('-w', '--workers', type=int, default=1, help='pages fetched in parallel. Defaults to 1')
+    export_parser.add_argument('--pagination', choices=('keyset', 'offset'), default='keyset',
+                        help='keyset pages by sys_id, offset follows the pagination links. Defaults to keyset')
+    export_parser.add_argument('--resume', action='store_true',
+                        help='checkpoint each page and, if the output file has a checkpoint, continue after it. '
+                             'Requires an ndjson output file')
+    export_parser.add_argument('--checkpoint', help='checkpoint file. Defaults to the output file with .checkpoint appended')
+    export_parser.add_argument('--timeout', type=float, help='timeout of each request, in seconds')
+    export_parser.add_argument('--codec', choices=('auto', *CODECS), default='auto',
+                        help='JSON codec. auto picks the fastest one installed. Defaults to auto')
+    export_parser.add_argument('--http2', action='store_true',
+                        help='multiplex the requests over HTTP/2 (pip install servicenowpy[http2])')
+    export_parser.add_argument('--no-progress', dest='progress', action='store_false', help='do not print the progress')
+    export_parser.set_defaults(func=export_command, parser=export_parser)
+    return parser
+
+
+def export_command(args):
+    """Runs the export command and returns its exit status."""
+
+    format = args.format or EXTENSIONS.get(os.path.splitext(args.output)[1].lower(), 'ndjson')
+    if args.resume and (args.output == '-' or format != 'ndjson'):
+        args.parser.error('--resume requires an ndjson output file')
+    if args.resume and args.workers > 1:
+        args.parser.error('--resume fetches the pages in order, with one worker')
+    if not args.user:
+        args.parser.error('the user is required: pass --user or set $SERVICENOWPY_USER')
+
+    pwd = os.environ.get('SERVICENOWPY_PASSWORD')
+    if pwd is None:
+        pwd = getpass.getpass(f'Password for {args.user}: ')
+
+    params = {}
+    if args.query:
+        params['sysparm_query'] = args.query
+    if args.fields:
+        params['sysparm_fields'] = args.fields
+    if args.display_value:
+        params['sysparm_display_value'] = args.display_value
+
+    try:
+        transport = None
+        if args.http2:
+            from .transport import HTTPXTransport
+            # Requests to a HTTP/2 instance share one connection; the limit applies to HTTP/1.1 instances
+            transport = HTTPXTransport(max_connections=max(10, args.workers))
+        client = Client(
+            args.instance, args.user, pwd, pool_maxsize=max(10, args.workers), timeout=args.timeout,
+            codec=args.codec, transport=transport
+        )
+        with client:
+            table = client.table(args.table)
+            extraction = Extraction(table, args.output, args.checkpoint, args.page_size, **params) if args.resume else None
+            progress = None
+            if args.progress:
+                state = extraction.state if extraction is not None else None
+                progress = Progress(total_count(table, args.query), state['records'] if state else 0)
+            try:
+                if extraction is not None:
+                    extraction.run(None if progress is None else lambda page: progress.update(len(page)))
+                else:
+                    export(table, args, params, format, progress)
+            finally:
+                if progress is not None:
+                    progress.close()
+    except KeyboardInterrupt:
+        if args.resume:
+            print('Interrupted. Run the same command again to resume.', file=sys.stderr)
+        return 130
+    except (StatusCodeError, ValueError, ImportError, requests.RequestException) as e:
+        print(f'servicenowpy: error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+def export(table, args, params, format, progress=None):
+    """Streams the records of the query to the output, fetching the pages with the given workers."""
+
+    workers = args.workers if args.workers > 1 else None
+    pages = table.iter_pages(page_size=args.page_size, workers=workers, pagination=args.pagination, **params)
+
+    def records():
+        for page in pages:
+            yield from page
+            if progress is not None:
+                progress.update(len(page))
+
+    if args.output != '-':
+        output = args.output
+    elif format in ('parquet', 'arrow'):
+        output = sys.stdout.buffer
+    else:
+        output = sys.stdout
+    fields = args.fields.split(',') if args.fields else None
+    export_records(records(), output, format, fields, batch_size=args.page_size)
+
+
+def main(argv=None):
+    """
+    Runs the servicenowpy command and returns its exit status.
+
+    :param argv: Command-line arguments. Defaults to sys.argv[1:].
+    :rtype: int
+    """
+
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,104 @@
+import gzip
+import json
+
+from urllib3.util import make_headers
+
+
+class JSONCodec:
+    """Encodes and decodes JSON bodies with the standard library json module."""
+
+    name = 'json'
+
+    def dumps(self, data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+    def loads(self, content):
+        return json.loads(content)
+
+
+class OrjsonCodec:
+    """Encodes and decodes JSON bodies with orjson (pip install servicenowpy[orjson])."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        try:
+            import orjson
+        except ImportError:
+            raise ImportError("The orjson codec requires orjson. Install it with 'pip install servicenowpy[orjson]'.")
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class UjsonCodec:
+    """Encodes and decodes JSON bodies with ujson (pip install servicenowpy[ujson])."""
+
+    name = 'ujson'
+
+    def __init__(self):
+        try:
+            import ujson
+        except ImportError:
+            raise ImportError("The ujson codec requires ujson. Install it with 'pip install servicenowpy[ujson]'.")
+        self.__ujson = ujson
+        self.loads = ujson.loads
+
+    def dumps(self, data):
+        return self.__ujson.dumps(data, ensure_ascii=False).encode()
+
+
+CODECS = {'json': JSONCodec, 'orjson': OrjsonCodec, 'ujson': UjsonCodec}
+
+
+def get_codec(codec=None):
+    """
+    Returns a codec object.
+
+    :param codec: 'json', 'orjson', 'ujson', 'auto' for the fastest one installed,
+        or an object with dumps and loads methods, which encode to and decode from bytes.
+        None means 'json'.
+    """
+
+    if codec is None:
+        return JSONCodec()
+    if codec == 'auto':
+        for cls in (OrjsonCodec, UjsonCodec):
+            try:
+                return cls()
+            except ImportError:
+                pass
+        return JSONCodec()
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Invalid codec {codec}. Expected one of {', '.join(CODECS)} or 'auto'")
+        return CODECS[codec]()
+    return codec
+
+
+def accept_encoding(compression=True):
+    """
+    Returns the Accept-Encoding header of the responses. With compression, it has
+    gzip and deflate, and br or zstd if the brotli or zstandard libraries are
+    installed, which urllib3 decodes.
+
+    :param compression: If set to False, asks for uncompressed responses.
+    :rtype: str
+    """
+
+    if not compression:
+        return 'identity'
+    return make_headers(accept_encoding=True)['accept-encoding']
+
+
+def compress(data, level=6):
+    """
+    Returns a request body compressed with gzip.
+
+    :param data: Request body, as bytes or str.
+    :param level: Compression level, from 1 (fastest) to 9 (smallest).
+    :rtype: bytes
+    """
+
+    if isinstance(data, str):
+        data = data.encode()
+    return gzip.compress(data, compresslevel=level)
@@ -1,3 +1,9 @@
+import json
+
+# Characters of a non-JSON error body kept as the message
+MAX_TEXT = 500
+
+
 class StatusCodeError(Exception):
     """Exception used when the status code of a http response is not as expected."""
     
@@ -6,5 +12,32 @@ class StatusCodeError(Exception):
         self.detail = detail
         self.status = status
 
+    @classmethod
+    def from_data(cls, data, status):
+        """
+        Returns a StatusCodeError with the error of a decoded ServiceNow response body.
+
+        :param data: Decoded response body.
+        :param status: Response status code.
+        """
+        error = (data.get("error") or {}) if isinstance(data, dict) else {}
+        return cls(error.get("message"), error.get("detail"), status)
+
+    @classmethod
+    def from_response(cls, response, loads=json.loads):
+        """
+        Returns a StatusCodeError with the error of a response. If the body is not
+        JSON, such as a proxy error page or an empty body, the message is the body text.
+
+        :param response: Response object.
+        :param loads: Function that decodes a JSON body, such as the loads method of a client codec.
+        """
+        try:
+            data = loads(response.content)
+        except ValueError:
+            text = response.content.decode('utf-8', 'replace').strip()
+            return cls(text[:MAX_TEXT] or None, None, response.status_code)
+        return cls.from_data(data, response.status_code)
+
     def __str__(self):
         return f"\n  Message: {self.message}\n  Detail: {self.detail}\n  Status: {self.status}"
\ No newline at end of file
@@ -0,0 +1,203 @@
+import csv
+import json
+
+from datetime import date, datetime, timedelta
+
+from .mirror import value
+from .schema import Reference
+
+FORMATS = ('ndjson', 'csv', 'parquet', 'arrow')
+
+
+class NDJSONWriter:
+    """
+    Writes records as newline-delimited JSON. Typed values are written as plain JSON values, see plain.
+
+    :param file: Text file object.
+    :param fields: Field names. Unused, every record is written as is.
+    """
+
+    def __init__(self, file, fields=None):
+        self.file = file
+
+    def write_batch(self, records):
+        self.file.write(''.join(
+            json.dumps({f: plain(v) for f, v in record.items()}) + '\n' for record in records
+        ))
+
+    def close(self):
+        self.file.flush()
+
+
+class CSVWriter:
+    """
+    Writes records as CSV. Reference fields are written as their value, and typed values as by plain.
+
+    :param file: Text file object, opened with newline=''.
+    :param fields: Field names. If omitted, they are taken from the first batch.
+    """
+
+    def __init__(self, file, fields=None):
+        self.file = file
+        self.fields = fields
+        self.writer = None
+
+    def write_batch(self, records):
+        if self.writer is None:
+            self.fields = self.fields or field_names(records)
+            self.writer = csv.DictWriter(self.file, self.fields, extrasaction='ignore')
+            self.writer.writeheader()
+        self.writer.writerows({f: plain(flatten(r.get(f))) for f in self.fields} for r in records)
+
+    def close(self):
+        self.file.flush()
+
+
+class ArrowWriter:
+    """
+    Writes records as Parquet or Arrow IPC, one row group or record batch per
+    written batch. The column types are inferred from the first batch, and
+    reference fields are written as their value. Requires pyarrow.
+
+    :param file: Binary file object.
+    :param fields: Field names. If omitted, they are taken from the first batch.
+    :param format: Either 'parquet' or 'arrow'.
+    """
+
+    def __init__(self, file, fields=None, format='parquet'):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(
+                f"Exporting to {format} requires pyarrow. Install it with 'pip install servicenowpy[arrow]'."
+            )
+        self.pa = pyarrow
+        self.file = file
+        self.fields = fields
+        self.format = format
+        self.schema = None
+        self.writer = None
+
+    def write_batch(self, records):
+        pa = self.pa
+        if self.schema is None:
+            self.fields = self.fields or field_names(records)
+            table = pa.table(self.columns(records))
+            # Columns that are empty in the first batch are written as strings
+            self.schema = pa.schema([
+                pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema
+            ])
+            self.writer = self.open_writer()
+        table = pa.table(self.columns(records), schema=self.schema)
+        self.writer.write_table(table)
+
+    def columns(self, records):
+        return {f: [flatten(r.get(f)) for r in records] for f in self.fields}
+
+    def open_writer(self):
+        if self.format == 'parquet':
+            import pyarrow.parquet
+            return pyarrow.parquet.ParquetWriter(self.file, self.schema)
+        return self.pa.ipc.new_file(self.file, self.schema)
+
+    def close(self):
+        if self.writer is None:
+            # Writes a valid empty file
+            self.schema = self.pa.schema([(f, self.pa.string()) for f in self.fields or []])
+            self.writer = self.open_writer()
+        self.writer.close()
+
+
+def make_writer(file, format='ndjson', fields=None):
+    """
+    Returns the writer of the given format.
+
+    :param file: File object.
+    :param format: One of 'ndjson', 'csv', 'parquet' or 'arrow'.
+    :param fields: Field names.
+    """
+
+    if format == 'ndjson':
+        return NDJSONWriter(file, fields)
+    if format == 'csv':
+        return CSVWriter(file, fields)
+    if format in ('parquet', 'arrow'):
+        return ArrowWriter(file, fields, format)
+    raise ValueError(f'Invalid format {format}. Expected one of {", ".join(FORMATS)}')
+
+
+def export_records(records, path, format='ndjson', fields=None, batch_size=10000):
+    """
+    Writes records to a file in batches, holding at most one batch in memory.
+
+    :param records: Iterable of records.
+    :param path: File path, or file object (text for ndjson and csv, binary for parquet and arrow).
+    :param format: One of 'ndjson', 'csv', 'parquet' or 'arrow'.
+    :param fields: Field names. If omitted, they are taken from the first batch.
+    :param batch_size: Number of records per batch.
+    :return: Number of records written.
+    :rtype: int
+    """
+
+    if format not in FORMATS:
+        raise ValueError(f'Invalid format {format}. Expected one of {", ".join(FORMATS)}')
+
+    if hasattr(path, 'write'):
+        file, owned = path, False
+    elif format in ('parquet', 'arrow'):
+        file, owned = open(path, 'wb'), True
+    else:
+        file, owned = open(path, 'w', newline='', encoding='utf-8'), True
+
+    count = 0
+    try:
+        writer = make_writer(file, format, fields)
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == batch_size:
+                writer.write_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(batch)
+            count += len(batch)
+        writer.close()
+    finally:
+        if owned:
+            file.close()
+    return count
+
+
+def flatten(field):
+    """Returns the value of a field, and the sys_id of a reference of a typed record."""
+
+    if isinstance(field, Reference):
+        return field.sys_id
+    return value(field)
+
+
+def plain(field):
+    """
+    Returns a field value of a typed record as a JSON value: references as their
+    sys_id, dates and date-times in ISO 8601 and durations in seconds. Other
+    values are returned as they are.
+    """
+
+    if isinstance(field, Reference):
+        return field.sys_id
+    if isinstance(field, (datetime, date)):
+        return field.isoformat()
+    if isinstance(field, timedelta):
+        return field.total_seconds()
+    return field
+
+
+def field_names(records):
+    """Returns the field names of a batch of records, in order of appearance."""
+
+    fields = {}
+    for record in records:
+        fields.update(dict.fromkeys(record))
+    return list(fields)
+
@@ -0,0 +1,156 @@
+import json
+import os
+
+
+class Extraction:
+    """
+    Resumable extraction of the records of a query into a NDJSON file.
+
+    Records are fetched by keyset pagination on key. After each page is written
+    and synced to disk, a checkpoint file records the last key, the size of the
+    output file and the number of records. If the extraction stops, for a network
+    error or a StatusCodeError, running it again truncates the output file to
+    the checkpointed size, dropping any partial page, and continues after the
+    last checkpointed key, so each record is written once.
+
+    Pages are also passed to on_page, if given, before they are checkpointed.
+    Delivery to on_page is at least once: the page being handled when the
+    extraction stopped is passed again on the next run. Records always have
+    their key field, which consumers can deduplicate on, and records reads the
+    output file deduplicated by sys_id.
+
+    :param table: servicenowpy.Table object.
+    :param path: Output NDJSON file path.
+    :param checkpoint: Checkpoint file path. Defaults to path with '.checkpoint' appended.
+    :param page_size: Number of records per page.
+    :param key: Unique, sortable field the extraction pages by. It is always extracted.
+    :param **kwargs: Table.iter_pages arguments and query parameters, except workers and
+        pagination, as pages are fetched one at a time by key, and typed. sysparm_query cannot have ORDERBY terms.
+    """
+
+    def __init__(self, table, path, checkpoint=None, page_size=1000, key='sys_id', **kwargs):
+        for name in ('workers', 'pagination'):
+            if name in kwargs:
+                # Checkpoints need the pages in key order, which parallel or offset paging does not give
+                raise ValueError(f'Extraction does not accept {name}: it pages by key, one page at a time')
+        if kwargs.get('typed'):
+            # The output file is read back as JSON, which typed values do not round-trip through
+            raise ValueError('Extraction does not accept typed: it writes the records as the instance returns them')
+        self.table = table
+        self.path = path
+        self.checkpoint = checkpoint or f'{path}.checkpoint'
+        self.page_size = page_size
+        self.key = key
+        self.kwargs = kwargs
+
+        fields = kwargs.get('sysparm_fields')
+        if fields and key not in fields.split(','):
+            self.kwargs['sysparm_fields'] = f'{fields},{key}'
+        self.params = {
+            'table': table.name,
+            'key': key,
+            'query': {k: v for k, v in sorted(self.kwargs.items()) if k.startswith('sysparm_')}
+        }
+
+    @property
+    def state(self):
+        """Dict with the checkpointed last_key, offset, records and done values, or None before the first page."""
+
+        try:
+            with open(self.checkpoint) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        if state['params'] != self.params:
+            raise ValueError(
+                f'Checkpoint {self.checkpoint} belongs to another extraction: {state["params"]}. '
+                'Remove it to start over'
+            )
+        return state
+
+    @property
+    def done(self):
+        """True if the extraction finished."""
+
+        state = self.state
+        return bool(state and state['done'])
+
+    def run(self, on_page=None):
+        """
+        Runs the extraction, from the last checkpoint if there is one, until all the records are written.
+
+        :param on_page: Callable called with each page of records before it is checkpointed.
+        :return: Total number of records written, including the ones of previous runs.
+        :rtype: int
+        """
+
+        state = self.state or {'params': self.params, 'last_key': None, 'offset': 0, 'records': 0, 'done': False}
+        if state['done']:
+            return state['records']
+
+        codec = self.table.client.codec
+        with open(self.path, 'r+b' if os.path.exists(self.path) else 'wb') as file:
+            # Drops what was written after the last checkpoint
+            file.seek(state['offset'])
+            file.truncate()
+            pages = self.table.iter_pages(
+                page_size=self.page_size, pagination='keyset', key=self.key, start_after=state['last_key'],
+                **self.kwargs
+            )
+            for page in pages:
+                last_key = page[-1][self.key]
+                file.write(b''.join(codec.dumps(record) + b'\n' for record in page))
+                file.flush()
+                os.fsync(file.fileno())
+                if on_page is not None:
+                    on_page(page)
+
+                state['last_key'] = last_key['value'] if isinstance(last_key, dict) else last_key
+                state['offset'] = file.tell()
+                state['records'] += len(page)
+                self._save(state)
+
+        state['done'] = True
+        self._save(state)
+        return state['records']
+
+    def records(self):
+        """
+        Yields the records of the output file, skipping records whose sys_id was already read.
+
+        :rtype: generator
+        """
+
+        codec = self.table.client.codec
+        state = self.state
+        seen = set()
+        with open(self.path, 'rb') as file:
+            # Lines after the checkpointed size belong to a page that was not checkpointed
+            end = state['offset'] if state else 0
+            while file.tell() < end:
+                record = codec.loads(file.readline())
+                sys_id = record.get('sys_id')
+                if sys_id is not None:
+                    if sys_id in seen:
+                        continue
+                    seen.add(sys_id)
+                yield record
+
+    def reset(self):
+        """Removes the output and checkpoint files, so the next run starts over."""
+
+        for path in (self.path, self.checkpoint):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _save(self, state):
+        """Writes the checkpoint file, replacing it at once so it is never left half written."""
+
+        tmp = f'{self.checkpoint}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint)
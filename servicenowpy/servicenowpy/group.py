@@ -0,0 +1,194 @@
+import queue
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .servicenow import Client
+
+
+class ClientGroup:
+    """
+    Runs the same operations on many ServiceNow instances at once.
+
+    Each instance has its own servicenowpy.Client, with its own connection pool
+    and options, and the instances are queried concurrently, up to max_workers
+    at a time. Results are keyed, or tagged, by the instance name. A failure on
+    one instance does not stop the others: its result is the exception instead.
+    With a timeout, instances that have not finished in time get a TimeoutError
+    as their result and are not waited for.
+
+    :param clients: Dict mapping instance names to servicenowpy.Client objects,
+        or a list of clients, named by their API URL.
+    :param max_workers: Number of instances queried at once. Defaults to one thread per instance.
+    """
+
+    def __init__(self, clients, max_workers=None):
+        if not isinstance(clients, dict):
+            clients = {client.api_url: client for client in clients}
+        self.clients = clients
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_instances(cls, instances, max_workers=None, max_concurrency=4, **kwargs):
+        """
+        Returns a ClientGroup with a new client for each instance.
+
+        :param instances: Dict mapping instance names to (instance_url, user, pwd) tuples.
+        :param max_workers: Number of instances queried at once.
+        :param max_concurrency: Maximum number of connections to each instance.
+            Requests wait for a free connection beyond it.
+        :param **kwargs: Other servicenowpy.Client arguments, used for every client.
+        :rtype: servicenowpy.ClientGroup
+        """
+
+        kwargs.setdefault('pool_maxsize', max_concurrency)
+        kwargs.setdefault('pool_block', True)
+        clients = {name: Client(*credentials, **kwargs) for name, credentials in instances.items()}
+        return cls(clients, max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.clients)
+
+    def map(self, func, timeout=None):
+        """
+        Calls func with the client of every instance, concurrently, and returns the results by instance name.
+
+        :param func: Callable that takes a servicenowpy.Client.
+        :param timeout: Seconds to wait for all the instances.
+        :return: Dict mapping each instance name to the return value of func, or to the exception it raised.
+        :rtype: dict
+        """
+
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers or len(self.clients) or 1)
+        try:
+            futures = {name: executor.submit(func, client) for name, client in self.clients.items()}
+            wait(futures.values(), timeout)
+            for name, future in futures.items():
+                if not future.done():
+                    future.cancel()
+                    results[name] = TimeoutError(f'Instance {name} did not answer in {timeout} seconds')
+                elif future.exception() is not None:
+                    results[name] = future.exception()
+                else:
+                    results[name] = future.result()
+        finally:
+            # Does not wait for the instances that timed out
+            executor.shutdown(wait=False)
+        return results
+
+    def get(self, table, timeout=None, **kwargs):
+        """
+        Sends the same GET request to the table of every instance.
+
+        :param table: The table name.
+        :param timeout: Seconds to wait for all the instances.
+        :param **kwargs: Table.get arguments and query parameters.
+        :return: Dict mapping each instance name to its records, or to the exception raised.
+        :rtype: dict
+        """
+
+        return self.map(lambda client: client.table(table).get(**kwargs), timeout)
+
+    def count(self, table, query=None, timeout=None, **kwargs):
+        """
+        Counts the records of the table of every instance.
+
+        :param table: The table name.
+        :param query: Encoded query.
+        :param timeout: Seconds to wait for all the instances.
+        :param **kwargs: Table.count arguments.
+        :return: Dict mapping each instance name to its count, or to the exception raised.
+        :rtype: dict
+        """
+
+        return self.map(lambda client: client.table(table).count(query, **kwargs), timeout)
+
+    def iter_pages(self, table, timeout=None, **kwargs):
+        """
+        Sends the same GET request to the table of every instance, and yields
+        (instance name, page) pairs as the pages arrive from any instance. An
+        instance that fails yields (instance name, exception) instead, once,
+        and the others go on.
+
+        :param table: The table name.
+        :param timeout: Seconds to wait for all the instances.
+        :param **kwargs: Table.iter_pages arguments and query parameters.
+        :rtype: generator
+        """
+
+        workers = self.max_workers or len(self.clients) or 1
+        pages = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+        done = object()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def fetch(name, client):
+            try:
+                if not stop.is_set():
+                    for page in client.table(table).iter_pages(**kwargs):
+                        put((name, page))
+                        if stop.is_set():
+                            break
+            except Exception as e:
+                put((name, e))
+            put((name, done))
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for name, client in self.clients.items():
+                executor.submit(fetch, name, client)
+            remaining = set(self.clients)
+            while remaining:
+                try:
+                    wait_time = None if deadline is None else max(0, deadline - time.monotonic())
+                    name, item = pages.get(timeout=wait_time)
+                except queue.Empty:
+                    for name in remaining:
+                        yield name, TimeoutError(f'Instance {name} did not answer in {timeout} seconds')
+                    return
+                if item is done:
+                    remaining.discard(name)
+                else:
+                    yield name, item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def iter_records(self, table, timeout=None, **kwargs):
+        """
+        Like iter_pages, but yields (instance name, record) pairs.
+
+        :param table: The table name.
+        :param timeout: Seconds to wait for all the instances.
+        :param **kwargs: Table.iter_pages arguments and query parameters.
+        :rtype: generator
+        """
+
+        for name, page in self.iter_pages(table, timeout, **kwargs):
+            if isinstance(page, Exception):
+                yield name, page
+            else:
+                for record in page:
+                    yield name, record
+
+    def close(self):
+        """Closes the connection pools of all the clients."""
+
+        for client in self.clients.values():
+            client.close()
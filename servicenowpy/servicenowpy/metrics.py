@@ -0,0 +1,246 @@
+import re
+import threading
+import time
+
+from collections import deque
+from urllib.parse import urlsplit
+
+
+class RequestEvent:
+    """
+    Timings and sizes of a request, passed to the client hooks when it finishes.
+
+    :param method: HTTP method.
+    :param url: Request URL.
+    :param table: The table name, or the API name for requests outside the Table API.
+    :param status: Response status code, or None if the request raised an error.
+    :param elapsed: Total time, in seconds, including retries.
+    :param ttfb: Time, in seconds, until the response headers of the last attempt were read.
+    :param download: Time, in seconds, spent reading the response body.
+    :param bytes_sent: Size of the request body.
+    :param bytes_received: Size of the response body.
+    :param retries: Number of retries.
+    :param error: Exception raised by the request, if any.
+    """
+
+    kind = 'request'
+
+    __slots__ = (
+        'method', 'url', 'table', 'status', 'elapsed', 'ttfb', 'download',
+        'bytes_sent', 'bytes_received', 'retries', 'error'
+    )
+
+    def __init__(
+        self, method, url, table, status, elapsed, ttfb=0.0, download=0.0,
+        bytes_sent=0, bytes_received=0, retries=0, error=None
+    ):
+        self.method = method
+        self.url = url
+        self.table = table
+        self.status = status
+        self.elapsed = elapsed
+        self.ttfb = ttfb
+        self.download = download
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.retries = retries
+        self.error = error
+
+    def __repr__(self):
+        return f'RequestEvent({self.method} {self.table} status={self.status} elapsed={self.elapsed:.4f})'
+
+
+class DecodeEvent:
+    """
+    JSON decoding time of a response body, passed to the client hooks.
+
+    :param method: HTTP method of the request.
+    :param table: The table name.
+    :param elapsed: Decoding time, in seconds.
+    :param records: Number of records decoded.
+    :param size: Size of the decoded body.
+    """
+
+    kind = 'decode'
+
+    __slots__ = ('method', 'table', 'elapsed', 'records', 'size')
+
+    def __init__(self, method, table, elapsed, records, size):
+        self.method = method
+        self.table = table
+        self.elapsed = elapsed
+        self.records = records
+        self.size = size
+
+    def __repr__(self):
+        return f'DecodeEvent({self.method} {self.table} records={self.records} elapsed={self.elapsed:.4f})'
+
+
+class Stats:
+    """
+    Client hook that aggregates the events per table and method. Each event is
+    counted in constant time, and percentiles are computed from a sliding window
+    of the latest latencies only when they are read. It is safe to share between
+    threads.
+
+    :param window: Number of latest latencies kept per table and method.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self.__lock = threading.Lock()
+        self.__entries = {}
+
+    def __call__(self, event):
+        with self.__lock:
+            entry = self.__entries.get((event.table, event.method))
+            if entry is None:
+                entry = self.__entries[(event.table, event.method)] = StatsEntry(self.window)
+            entry.add(event)
+
+    def keys(self):
+        """Returns the (table, method) pairs seen."""
+
+        with self.__lock:
+            return list(self.__entries)
+
+    def get(self, table, method):
+        """
+        Returns the aggregated stats of a table and method.
+
+        :param table: The table name.
+        :param method: HTTP method.
+        :rtype: dict
+        """
+
+        with self.__lock:
+            entry = self.__entries.get((table, method))
+            return entry.summary() if entry else None
+
+    def summary(self):
+        """
+        Returns the aggregated stats of all tables and methods, keyed by 'METHOD table'.
+
+        :rtype: dict
+        """
+
+        with self.__lock:
+            return {f'{method} {table}': entry.summary() for (table, method), entry in self.__entries.items()}
+
+    def reset(self):
+        """Drops all the aggregated stats."""
+
+        with self.__lock:
+            self.__entries.clear()
+
+
+class StatsEntry:
+    """Aggregated events of one table and method."""
+
+    def __init__(self, window):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.decodes = 0
+        self.records = 0
+        self.statuses = {}
+        self.latencies = deque(maxlen=window)
+        self.ttfbs = deque(maxlen=window)
+        self.decode_times = deque(maxlen=window)
+
+    def add(self, event):
+        if event.kind == 'decode':
+            self.decodes += 1
+            self.records += event.records
+            self.decode_times.append(event.elapsed)
+            return
+
+        self.requests += 1
+        self.retries += event.retries
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+        self.statuses[event.status] = self.statuses.get(event.status, 0) + 1
+        if event.error is not None or event.status is None or event.status >= 400:
+            self.errors += 1
+        self.latencies.append(event.elapsed)
+        self.ttfbs.append(event.ttfb)
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'statuses': dict(self.statuses),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'pages': self.decodes,
+            'records': self.records,
+            'latency': percentiles(self.latencies),
+            'ttfb': percentiles(self.ttfbs),
+            'decode': percentiles(self.decode_times),
+        }
+
+
+class OpenTelemetryHook:
+    """
+    Client hook that records every request as a span of an OpenTelemetry tracer.
+    Decoding times are recorded as spans too.
+
+    :param tracer: opentelemetry.trace.Tracer object.
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def __call__(self, event):
+        end = time.time_ns()
+        start = end - int(event.elapsed * 1e9)
+        if event.kind == 'decode':
+            attributes = {
+                'servicenow.table': event.table,
+                'servicenow.records': event.records,
+                'servicenow.body_size': event.size,
+            }
+            span = self.tracer.start_span(f'decode {event.table}', start_time=start, attributes=attributes)
+        else:
+            attributes = {
+                'http.method': event.method,
+                'http.url': event.url,
+                'servicenow.table': event.table,
+                'servicenow.retries': event.retries,
+                'servicenow.ttfb': event.ttfb,
+                'http.request_content_length': event.bytes_sent,
+                'http.response_content_length': event.bytes_received,
+            }
+            if event.status is not None:
+                attributes['http.status_code'] = event.status
+            span = self.tracer.start_span(f'{event.method} {event.table}', start_time=start, attributes=attributes)
+            if event.error is not None:
+                span.record_exception(event.error)
+        span.end(end_time=end)
+
+
+def percentiles(values):
+    """Returns the p50, p95 and p99 of a sequence of values, or None if it is empty."""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        'p50': ordered[round(last * 0.50)],
+        'p95': ordered[round(last * 0.95)],
+        'p99': ordered[round(last * 0.99)],
+    }
+
+
+def table_from_url(url):
+    """Returns the table name of a Table API URL, or the API name for other URLs."""
+
+    m = re.search(r'/api/now/(?:v\d+/)?(?:table|stats)/([^/?]+)', url)
+    if m:
+        return m.group(1)
+    m = re.search(r'/api/now/(?:v\d+/)?([^/?]+)', url)
+    return m.group(1) if m else urlsplit(url).path
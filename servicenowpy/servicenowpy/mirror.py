@@ -0,0 +1,185 @@
+import json
+import re
+import sqlite3
+
+# Table that keeps the sync cursor of every mirror in the database
+STATE_TABLE = '_servicenowpy_sync'
+
+
+class TableMirror:
+    """
+    Local SQLite copy of a ServiceNow table, kept up to date with delta syncs.
+
+    The first sync loads the whole table. Later syncs only fetch the records
+    whose watermark field changed since the last one. Records are fetched in
+    (watermark, key) order and each page is committed together with the sync
+    cursor, so an interrupted sync resumes where it stopped. Records are
+    upserted by key and stored as JSON, and the mirror can be read without
+    hitting the instance.
+
+    Several tables can be mirrored in the same database file.
+
+    :param table: servicenowpy.Table object.
+    :param path: SQLite database path.
+    :param watermark_field: Field that tells when a record last changed.
+    :param key: Field that uniquely identifies a record.
+    """
+
+    def __init__(self, table, path, watermark_field='sys_updated_on', key='sys_id'):
+        if not re.fullmatch(r'\w+', table.name):
+            raise ValueError(f'Invalid table name {table.name}')
+
+        self.table = table
+        self.path = path
+        self.watermark_field = watermark_field
+        self.key = key
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        with self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table.name}" '
+                '(key TEXT PRIMARY KEY, watermark TEXT, data TEXT NOT NULL)'
+            )
+            self.connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "{table.name}_watermark" ON "{table.name}" (watermark)'
+            )
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {STATE_TABLE} '
+                '(table_name TEXT PRIMARY KEY, watermark TEXT, last_key TEXT)'
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute(f'SELECT COUNT(*) FROM "{self.table.name}"').fetchone()[0]
+
+    def __iter__(self):
+        return self.select()
+
+    @property
+    def cursor(self):
+        """Tuple with the watermark and key of the last synced record, or (None, None)."""
+
+        row = self.connection.execute(
+            f'SELECT watermark, last_key FROM {STATE_TABLE} WHERE table_name = ?',
+            (self.table.name,)
+        ).fetchone()
+        return row if row else (None, None)
+
+    def sync(self, page_size=1000, api_version=None, headers={"Accept":"application/json"}, **kwargs):
+        """
+        Fetches the records changed since the last sync and upserts them in the mirror.
+
+        :param page_size: Number of records per request and per transaction.
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param **kwargs: Other query parameters to the URL. sysparm_query filters the mirrored records.
+        :return: Number of records upserted.
+        :rtype: int
+        """
+
+        user_query = kwargs.pop('sysparm_query', '')
+        if 'sysparm_fields' in kwargs:
+            fields = kwargs['sysparm_fields'].split(',')
+            missing = [f for f in (self.key, self.watermark_field) if f not in fields]
+            kwargs['sysparm_fields'] = ','.join(fields + missing)
+
+        count = 0
+        while True:
+            watermark, last_key = self.cursor
+            pages = self.table.iter_pages(
+                api_version,
+                headers,
+                page_size=page_size,
+                sysparm_query=self.make_query(user_query, watermark, last_key),
+                **kwargs
+            )
+            page = next(pages, [])
+            pages.close()
+            if not page:
+                return count
+
+            rows = [(value(r[self.key]), value(r[self.watermark_field]), json.dumps(r)) for r in page]
+            with self.connection:
+                self.connection.executemany(
+                    f'INSERT OR REPLACE INTO "{self.table.name}" (key, watermark, data) VALUES (?, ?, ?)',
+                    rows
+                )
+                self.connection.execute(
+                    f'INSERT OR REPLACE INTO {STATE_TABLE} (table_name, watermark, last_key) VALUES (?, ?, ?)',
+                    (self.table.name, rows[-1][1], rows[-1][0])
+                )
+            count += len(rows)
+            if len(page) < page_size:
+                return count
+
+    def make_query(self, user_query='', watermark=None, last_key=None):
+        """
+        Returns the encoded query of the records after the given cursor, in (watermark, key) order.
+
+        :param user_query: Encoded query that filters the mirrored records.
+        :param watermark: Watermark of the last synced record.
+        :param last_key: Key of the last synced record.
+        :rtype: str
+        """
+
+        order = f'ORDERBY{self.watermark_field}^ORDERBY{self.key}'
+        prefix = f'{user_query}^' if user_query else ''
+        if watermark is None:
+            return prefix + order
+        return (
+            f'{prefix}{self.watermark_field}>{watermark}'
+            f'^NQ{prefix}{self.watermark_field}={watermark}^{self.key}>{last_key}'
+            f'^{order}'
+        )
+
+    def get(self, key):
+        """
+        Returns the mirrored record with the given key, or None.
+
+        :param key: Record key, usually its sys_id.
+        :rtype: dict
+        """
+
+        row = self.connection.execute(
+            f'SELECT data FROM "{self.table.name}" WHERE key = ?', (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def select(self, where=None, params=()):
+        """
+        Yields the mirrored records, optionally filtered by an SQL condition.
+        Fields can be read with json_extract(data, '$.field').
+
+        :param where: SQL condition.
+        :param params: Parameters of the SQL condition.
+        :rtype: generator
+        """
+
+        sql = f'SELECT data FROM "{self.table.name}"'
+        if where:
+            sql += f' WHERE {where}'
+        for row in self.connection.execute(sql, params):
+            yield json.loads(row[0])
+
+    def reset(self):
+        """Drops the mirrored records and the sync cursor, so the next sync is a full load."""
+
+        with self.connection:
+            self.connection.execute(f'DELETE FROM "{self.table.name}"')
+            self.connection.execute(f'DELETE FROM {STATE_TABLE} WHERE table_name = ?', (self.table.name,))
+
+    def close(self):
+        """Closes the database connection."""
+
+        self.connection.close()
+
+
+def value(field):
+    """Returns the value of a field, which is a dict when it has a reference link."""
+
+    return field['value'] if isinstance(field, dict) else field
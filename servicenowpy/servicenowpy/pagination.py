@@ -0,0 +1,71 @@
+import re
+
+# Number of values of a sys_id, which is 32 hexadecimal digits
+SYS_ID_SPACE = 16 ** 32
+
+
+def keyset_query(query, key, after=None, upto=None):
+    """
+    Returns an encoded query that selects the records of query with key in the
+    range (after, upto], ordered by key. Each ^NQ group gets the range conditions.
+
+    :param query: Encoded query. It cannot have ORDERBY terms.
+    :param key: Unique, sortable field name.
+    :param after: Exclusive lower bound of key, or None.
+    :param upto: Inclusive upper bound of key, or None.
+    :rtype: str
+    """
+
+    if re.search(r'(^|\^)ORDERBY', query or ''):
+        raise ValueError('Keyset pagination orders by the key field. Remove ORDERBY from sysparm_query')
+
+    conditions = ''
+    if after is not None:
+        conditions += f'^{key}>{after}'
+    if upto is not None:
+        conditions += f'^{key}<={upto}'
+
+    if query:
+        groups = '^NQ'.join(group + conditions for group in query.split('^NQ'))
+    else:
+        groups = conditions[1:]
+    return f'{groups}^ORDERBY{key}' if groups else f'ORDERBY{key}'
+
+
+def ordered_query(query, key='sys_id'):
+    """
+    Returns query with an ORDERBY key term appended if it has no ORDERBY term,
+    so offset pages fetched in parallel see the records in the same order.
+
+    :param query: Encoded query, or None.
+    :param key: Unique field name.
+    :rtype: str
+    """
+
+    if re.search(r'(^|\^)ORDERBY', query or ''):
+        return query
+    return f'{query}^ORDERBY{key}' if query else f'ORDERBY{key}'
+
+
+def key_ranges(count, start_after=None):
+    """
+    Splits the sys_id space into ranges of the same size, for parallel keyset
+    pagination. sys_ids are random, so each range holds about the same number
+    of records.
+
+    :param count: Number of ranges.
+    :param start_after: If given, the ranges only cover the sys_ids after it.
+    :return: List of (after, upto) tuples, where None means unbounded.
+    :rtype: list
+    """
+
+    bounds = [None] + [f'{i * SYS_ID_SPACE // count:032x}' for i in range(1, count)] + [None]
+    ranges = []
+    for after, upto in zip(bounds, bounds[1:]):
+        if start_after is not None:
+            if upto is not None and upto <= start_after:
+                continue
+            if after is None or after < start_after:
+                after = start_after
+        ranges.append((after, upto))
+    return ranges
@@ -0,0 +1,140 @@
+from collections.abc import Mapping
+
+class Missing:
+    """Marks a field that a record does not have, which is not the same as a None value."""
+
+    def __repr__(self):
+        return 'MISSING'
+
+    def __reduce__(self):
+        # Copies and unpickled rows keep the same marker, as it is compared by identity
+        return 'MISSING'
+
+
+MISSING = Missing()
+
+
+class RecordSet:
+    """
+    Compact container of records that stores the field names once and each
+    record as a tuple of values. Rows are read through Row views, which are
+    created on access and behave like read-only dicts.
+
+    Records with fields not seen before extend the field names, so the
+    container also fits results whose records have different fields.
+
+    :param records: Iterable of record dicts.
+    """
+
+    def __init__(self, records=()):
+        self.fields = []
+        self.rows = []
+        self.__index = {}
+        self.extend(records)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        for values in self.rows:
+            yield Row(self.__index, values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            subset = RecordSet()
+            # Copies the field names, so adding fields to the subset leaves this set as it is
+            subset.fields = list(self.fields)
+            subset.rows = self.rows[i]
+            subset.__index = dict(self.__index)
+            return subset
+        return Row(self.__index, self.rows[i])
+
+    def __repr__(self):
+        return f'RecordSet(fields={len(self.fields)}, rows={len(self.rows)})'
+
+    def extend(self, records):
+        """
+        Appends records to the container.
+
+        :param records: Iterable of record dicts.
+        """
+
+        index = self.__index
+        for record in records:
+            if len(record) != len(index) or any(field not in index for field in record):
+                for field in record:
+                    if field not in index:
+                        index[field] = len(self.fields)
+                        self.fields.append(field)
+            self.rows.append(tuple(record.get(field, MISSING) for field in self.fields))
+
+    def column(self, field):
+        """
+        Returns the values of a field, with None for the records that do not have it.
+
+        :param field: Field name.
+        :rtype: list
+        """
+
+        i = self.__index[field]
+        return [None if i >= len(values) or values[i] is MISSING else values[i] for values in self.rows]
+
+    def to_dicts(self):
+        """
+        Returns the records as a list of dicts.
+
+        :rtype: list
+        """
+
+        return [row.to_dict() for row in self]
+
+
+class Row(Mapping):
+    """
+    Read-only view of a RecordSet row. Fields can be read as keys or attributes.
+
+    :param index: Dict mapping field names to their position in the values.
+    :param values: Tuple of values.
+    """
+
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, field):
+        i = self._index[field]
+        if i >= len(self._values) or self._values[i] is MISSING:
+            raise KeyError(field)
+        return self._values[i]
+
+    def __getattr__(self, field):
+        if field.startswith('_'):
+            # Slots that are not set yet, as during copying or unpickling, must not be looked up as fields
+            raise AttributeError(field)
+        try:
+            return self[field]
+        except KeyError:
+            raise AttributeError(field)
+
+    def __iter__(self):
+        for field, i in self._index.items():
+            if i < len(self._values) and self._values[i] is not MISSING:
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'Row({self.to_dict()!r})'
+
+    def to_dict(self):
+        """
+        Returns the record as a dict.
+
+        :rtype: dict
+        """
+
+        return {field: self._values[i] for field, i in self._index.items()
+                if i < len(self._values) and self._values[i] is not MISSING}
@@ -0,0 +1,116 @@
+import re
+
+from collections import OrderedDict
+
+
+class ReferenceResolver:
+    """
+    Fills in fields of the records referenced by a page of records, such as
+    'assigned_to.name'. The distinct references of a page are fetched with one
+    bulk query per referenced table, and the referenced records are kept in an
+    LRU cache, so references shared by many pages are only fetched once.
+
+    The values are added to each record under the dot-walked name, like the
+    instance does for dot-walked sysparm_fields. Paths can walk more than one
+    reference, such as 'assigned_to.manager.name'. The referenced table is read
+    from the reference link, so sysparm_exclude_reference_link must not be set.
+
+    :param client: servicenowpy.Client used to fetch the referenced records.
+    :param paths: List of dot-walked field names.
+    :param cache_size: Maximum number of referenced records kept in the cache.
+    :param workers: Number of concurrent requests per referenced table.
+    """
+
+    def __init__(self, client, paths, cache_size=10000, workers=4):
+        self.client = client
+        self.paths = list(paths)
+        self.cache_size = cache_size
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self.__cache = OrderedDict()
+        for path in self.paths:
+            if '.' not in path.strip('.'):
+                raise ValueError(f'Invalid path {path}. Expected a reference field and a field of the referenced table')
+
+    @property
+    def fields(self):
+        """The reference fields the records need to have."""
+
+        return list(dict.fromkeys(path.partition('.')[0] for path in self.paths))
+
+    def resolve(self, records):
+        """
+        Adds the values of the paths to the records and returns them.
+
+        :param records: List of record dicts.
+        :rtype: list
+        """
+
+        self._resolve(records, self.paths)
+        return records
+
+    def clear(self):
+        """Drops the cached records."""
+
+        self.__cache.clear()
+
+    def _resolve(self, records, paths):
+        walks = {}
+        for path in paths:
+            field, _, rest = path.partition('.')
+            walks.setdefault(field, []).append(rest)
+
+        for field, rests in walks.items():
+            fields = tuple(sorted({rest.partition('.')[0] for rest in rests}))
+            deeper = [rest for rest in rests if '.' in rest]
+            found = self._fetch(records, field, fields, deeper)
+            for record in records:
+                reference = record.get(field)
+                referenced = None
+                if isinstance(reference, dict) and reference.get('link'):
+                    referenced = found.get((table_from_link(reference['link']), reference.get('value')))
+                for rest in rests:
+                    record[f'{field}.{rest}'] = referenced.get(rest, '') if referenced else ''
+
+    def _fetch(self, records, field, fields, deeper):
+        """Returns the records referenced by field, by (table, sys_id), fetching the ones not cached."""
+
+        found = {}
+        wanted = {}
+        for record in records:
+            reference = record.get(field)
+            if not isinstance(reference, dict) or not reference.get('link') or not reference.get('value'):
+                continue
+            table = table_from_link(reference['link'])
+            key = (table, reference['value'], fields, tuple(deeper))
+            if key in self.__cache:
+                self.__cache.move_to_end(key)
+                found[(table, reference['value'])] = self.__cache[key]
+                self.hits += 1
+            elif (table, reference['value']) not in found:
+                wanted.setdefault(table, set()).add(reference['value'])
+
+        for table, sys_ids in wanted.items():
+            self.misses += len(sys_ids)
+            fetched = self.client.table(table).get_records(
+                sorted(sys_ids), workers=self.workers, sysparm_fields=','.join(fields)
+            )
+            referenced = [r for r in fetched.values() if r is not None]
+            if deeper:
+                self._resolve(referenced, deeper)
+            for sys_id, record in fetched.items():
+                # Missing records are cached too, so they are not asked for again
+                self.__cache[(table, sys_id, fields, tuple(deeper))] = record
+                found[(table, sys_id)] = record
+
+        while len(self.__cache) > self.cache_size:
+            self.__cache.popitem(last=False)
+        return found
+
+
+def table_from_link(link):
+    """Returns the table name of a reference link."""
+
+    m = re.search(r'/table/([^/?]+)/[^/?]*$', link)
+    return m.group(1) if m else None
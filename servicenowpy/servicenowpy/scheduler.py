@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Methods that can be sent again without changing the result
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+
+class RequestScheduler:
+    """
+    Retries throttled and failed requests and adapts the number of requests in
+    flight to what the instance accepts.
+
+    Responses with status 429 are retried for every method, since the instance
+    rejected them before doing any work. Server errors and connection errors are
+    only retried for idempotent methods. The wait honours the Retry-After header
+    and otherwise uses exponential backoff with full jitter.
+
+    The concurrency limit follows AIMD: it grows by about one request per
+    round of successful responses, and is multiplied by decrease_factor when a
+    request is throttled, fails or is slower than target_latency.
+
+    :param max_retries: Maximum number of retries of a request.
+    :param backoff_factor: Base wait, in seconds, of the exponential backoff.
+    :param max_backoff: Maximum wait between retries, in seconds.
+    :param min_concurrency: Lowest concurrency limit.
+    :param max_concurrency: Highest concurrency limit.
+    :param initial_concurrency: Starting concurrency limit. Defaults to min_concurrency.
+    :param decrease_factor: Factor applied to the concurrency limit on congestion.
+    :param target_latency: Response time, in seconds, above which a request counts as congestion.
+    :param retry_statuses: Status codes that are retried.
+    """
+
+    def __init__(
+        self,
+        max_retries=5,
+        backoff_factor=0.5,
+        max_backoff=60,
+        min_concurrency=1,
+        max_concurrency=32,
+        initial_concurrency=None,
+        decrease_factor=0.5,
+        target_latency=None,
+        retry_statuses=(429, 500, 502, 503, 504)
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.target_latency = target_latency
+        self.retry_statuses = frozenset(retry_statuses)
+        self.limit = float(initial_concurrency or min_concurrency)
+        self.in_flight = 0
+        self.retries = 0
+        self.throttled = 0
+        self.latency = 0.0
+        self.__last_decrease = 0.0
+        self.__condition = threading.Condition()
+
+    @property
+    def concurrency(self):
+        """Current maximum number of requests in flight."""
+
+        return max(self.min_concurrency, int(self.limit))
+
+    def send(self, send, method):
+        """
+        Calls send when the concurrency limit allows it, retrying it while the
+        response or error is retryable, and returns the last response.
+
+        :param send: Callable that sends the request and returns the response.
+        :param method: HTTP method of the request.
+        :rtype: requests.models.Response
+        """
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.acquire()
+            start = time.monotonic()
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout):
+                self.release(True, time.monotonic() - start)
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                self.wait(attempt)
+                attempt += 1
+                self.retries += 1
+                continue
+            except BaseException:
+                # Frees the slot on any other error, or later requests would wait for it forever
+                self.release(True, time.monotonic() - start)
+                raise
+
+            status = response.status_code
+            latency = time.monotonic() - start
+            slow = self.target_latency is not None and latency > self.target_latency
+            self.release(status == 429 or status >= 500 or slow, latency)
+            if status == 429:
+                self.throttled += 1
+
+            retryable = status in self.retry_statuses and (idempotent or status == 429)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            response.close()
+            self.wait(attempt, retry_after(response))
+            attempt += 1
+            self.retries += 1
+
+    def acquire(self):
+        """Waits until a request can be sent without going over the concurrency limit."""
+
+        with self.__condition:
+            while self.in_flight >= self.concurrency:
+                self.__condition.wait()
+            self.in_flight += 1
+
+    def release(self, congested=False, latency=0.0):
+        """
+        Marks a request as finished and adapts the concurrency limit.
+
+        :param congested: If set to True, the request was throttled, failed or was too slow.
+        :param latency: Response time of the request, in seconds.
+        """
+
+        with self.__condition:
+            self.in_flight -= 1
+            self.latency = latency if not self.latency else 0.8 * self.latency + 0.2 * latency
+            now = time.monotonic()
+            if congested:
+                # Decreases once per round trip, as the requests already in flight see the same congestion
+                if now - self.__last_decrease > self.latency:
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                    self.__last_decrease = now
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.__condition.notify_all()
+
+    def wait(self, attempt, retry_after=None):
+        """
+        Sleeps before a retry.
+
+        :param attempt: Number of retries already made.
+        :param retry_after: Wait, in seconds, requested by the instance.
+        """
+
+        backoff = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+        if retry_after is not None:
+            backoff = min(self.max_backoff, retry_after) + random.uniform(0, self.backoff_factor)
+        time.sleep(backoff)
+
+
+def retry_after(response):
+    """Returns the wait, in seconds, set by the Retry-After header of a response, or None."""
+
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,266 @@
+import json
+import os
+import re
+import threading
+import time
+
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# A decoded reference field: the referenced table and the sys_id of the record
+Reference = namedtuple('Reference', ('table', 'sys_id'))
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def decode_datetime(value):
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc) if value else None
+
+
+def decode_date(value):
+    return date.fromisoformat(value) if value else None
+
+
+def decode_duration(value):
+    return decode_datetime(value) - EPOCH if value else None
+
+
+def decode_int(value):
+    return int(value) if value else None
+
+
+def decode_float(value):
+    return float(value) if value else None
+
+
+def decode_bool(value):
+    return value == 'true' if value else None
+
+
+# Decoders of the field types that are not read as strings, by internal_type
+DECODERS = {
+    'glide_date_time': decode_datetime,
+    'due_date': decode_datetime,
+    'glide_date': decode_date,
+    'glide_duration': decode_duration,
+    'timer': decode_duration,
+    'integer': decode_int,
+    'longint': decode_int,
+    'decimal': decode_float,
+    'float': decode_float,
+    'percent_complete': decode_float,
+    'boolean': decode_bool,
+}
+
+
+class TableSchema:
+    """
+    Fields of a table, including the ones inherited from its super classes, and
+    their types as defined in sys_dictionary.
+
+    :param table: The table name.
+    :param fields: Dict mapping field names to their internal_type.
+    :param references: Dict mapping reference fields to the referenced table.
+    :param fetched: Time the schema was read from the instance, in seconds since the epoch.
+    """
+
+    def __init__(self, table, fields, references=None, fetched=None):
+        self.table = table
+        self.fields = fields
+        self.references = references or {}
+        self.fetched = time.time() if fetched is None else fetched
+
+    def __repr__(self):
+        return f'TableSchema(table={self.table!r}, fields={len(self.fields)})'
+
+    def __contains__(self, field):
+        return field in self.fields
+
+    def projection(self, fields):
+        """
+        Returns the sysparm_fields value of a list of fields, after checking that
+        the table has them. Dot-walked fields must start with a reference field.
+        The instance silently leaves out the fields it does not know, so they
+        raise ValueError instead.
+
+        :param fields: List of field names, or a comma-separated string of them.
+        :rtype: str
+        """
+
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        fields = list(dict.fromkeys(f.strip() for f in fields if f.strip()))
+        unknown = [
+            f for f in fields
+            if f.partition('.')[0] not in self.fields or ('.' in f and f.partition('.')[0] not in self.references)
+        ]
+        if unknown:
+            raise ValueError(f'Table {self.table} has no fields {", ".join(unknown)}')
+        return ','.join(fields)
+
+    def decoder(self, field):
+        """Returns the function that decodes the values of a field, or None if they are strings."""
+
+        if field in self.references:
+            table = self.references[field]
+            return lambda value: decode_reference(table, value)
+        return DECODERS.get(self.fields.get(field))
+
+    def decode(self, records):
+        """
+        Replaces the string values of the records by typed values, in place, and
+        returns the records. The values are decoded by column, one field of the
+        whole page at a time. Empty values decode to None.
+
+        :param records: List of record dicts with the raw field values.
+        :rtype: list
+        """
+
+        if not records:
+            return records
+
+        for field in list(records[0]):
+            decode = self.decoder(field)
+            if decode is None:
+                continue
+            try:
+                column = [record[field] for record in records]
+            except KeyError:
+                for record in records:
+                    if field in record:
+                        record[field] = decode(record[field])
+                continue
+            for record, value in zip(records, map(decode, column)):
+                record[field] = value
+        return records
+
+    def to_dict(self):
+        return {'table': self.table, 'fields': self.fields, 'references': self.references, 'fetched': self.fetched}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['table'], data['fields'], data['references'], data['fetched'])
+
+
+def decode_reference(table, value):
+    if isinstance(value, dict):
+        value = value.get('value')
+    return Reference(table, value) if value else None
+
+
+class SchemaCache:
+    """
+    Cache of table schemas. Schemas are kept in memory and, if path is given,
+    in a JSON file per instance and table under path, so they are shared by
+    processes and survive restarts. Schemas older than ttl are read again
+    from the instance. It is safe to share between threads.
+
+    :param path: Directory of the cache files. If None, schemas are only kept in memory.
+    :param ttl: Time to live of the schemas, in seconds.
+    """
+
+    def __init__(self, path=None, ttl=86400):
+        self.path = Path(path).expanduser() if path is not None else None
+        self.ttl = ttl
+        self.__schemas = {}
+        self.__lock = threading.Lock()
+
+    def lookup(self, instance_url, table):
+        """
+        Returns the fresh schema cached for a table, or None.
+
+        :param instance_url: Instance URL.
+        :param table: The table name.
+        :rtype: servicenowpy.schema.TableSchema
+        """
+
+        key = (instance_url, table)
+        with self.__lock:
+            schema = self.__schemas.get(key)
+        if schema is None and self.path is not None:
+            try:
+                with open(self.file(instance_url, table)) as f:
+                    schema = TableSchema.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError):
+                return None
+            with self.__lock:
+                self.__schemas[key] = schema
+        if schema is None or time.time() - schema.fetched > self.ttl:
+            return None
+        return schema
+
+    def store(self, instance_url, schema):
+        """
+        Caches a schema, writing its file if the cache has a path.
+
+        :param instance_url: Instance URL.
+        :param schema: servicenowpy.schema.TableSchema object.
+        """
+
+        with self.__lock:
+            self.__schemas[(instance_url, schema.table)] = schema
+        if self.path is not None:
+            file = self.file(instance_url, schema.table)
+            file.parent.mkdir(parents=True, exist_ok=True)
+            # Writes a temporary file and renames it, so readers never see a partial file
+            tmp = file.with_name(f'{file.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(schema.to_dict(), f)
+            os.replace(tmp, file)
+
+    def clear(self):
+        """Drops the cached schemas, including their files."""
+
+        with self.__lock:
+            self.__schemas.clear()
+        if self.path is not None:
+            for file in self.path.glob('*/*.json'):
+                file.unlink()
+
+    def file(self, instance_url, table):
+        host = re.sub(r'^https?://|/api/now/?$', '', instance_url.rstrip('/'))
+        return self.path / re.sub(r'[^\w.-]', '_', host) / f'{table}.json'
+
+
+def discover(client, table):
+    """
+    Reads the schema of a table from the instance: its super classes from
+    sys_db_object, then the fields of all of them from sys_dictionary. Fields
+    defined again by a child table override the ones of its super class.
+
+    :param client: servicenowpy.Client object.
+    :param table: The table name.
+    :rtype: servicenowpy.schema.TableSchema
+    """
+
+    chain = []
+    name = table
+    while name and name not in chain:
+        found = client.table('sys_db_object').get(
+            sysparm_query=f'name={name}', sysparm_fields='name,super_class.name', sysparm_limit=1
+        )
+        if not found:
+            break
+        chain.append(name)
+        name = found[0].get('super_class.name')
+    if not chain:
+        raise ValueError(f'Table {table} not found in sys_db_object')
+
+    entries = client.table('sys_dictionary').get(
+        sysparm_query=f'nameIN{",".join(chain)}^elementISNOTEMPTY',
+        sysparm_fields='name,element,internal_type,reference',
+        sysparm_exclude_reference_link='true'
+    )
+    depth = {name: i for i, name in enumerate(chain)}
+    entries.sort(key=lambda entry: -depth.get(entry['name'], 0))
+
+    fields = {}
+    references = {}
+    for entry in entries:
+        fields[entry['element']] = entry['internal_type']
+        if entry['internal_type'] == 'reference' and entry.get('reference'):
+            references[entry['element']] = entry['reference']
+        else:
+            references.pop(entry['element'], None)
+    return TableSchema(table, fields, references)
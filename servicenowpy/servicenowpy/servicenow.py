@@ -1,21 +1,107 @@
-import json
+import queue
 import re
+import socket
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
 import requests
 
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from .aggregate import field_list, make_params as make_aggregate_params, read_result as read_aggregate_result
+from .batch import Batch, unique_updates
+from .buffer import JOURNAL_FIELDS, WriteBuffer
+from .codec import accept_encoding, compress, get_codec
 from .exceptions import StatusCodeError
+from .export import export_records
+from .extraction import Extraction
+from .metrics import DecodeEvent, RequestEvent, table_from_url
+from .mirror import TableMirror
+from .pagination import key_ranges, keyset_query, ordered_query
+from .records import RecordSet
+from .references import ReferenceResolver
+from .schema import SchemaCache, discover
+from .streaming import CHUNK_SIZE, iter_array_items
+from .transport import RequestsTransport
+
+# Default sysparm_limit of the pages fetched in parallel or by keyset
+PARALLEL_PAGE_SIZE = 1000
+
+# Longest URL sent by get_records and get_records_by_number
+MAX_URL_LENGTH = 4096
 
 class Client:
     """
     Represents a ServiceNow instance.
 
+    The client owns a pool of keep-alive connections that is shared by every
+    Table object it creates. It can be used as a context manager, which closes
+    the pool on exit.
+
     :param instance_url: ServiceNow instance URL.
     :param user: Instance user.
     :param pwd: Instance password.
+    :param pool_connections: Number of per-host connection pools to cache.
+    :param pool_maxsize: Maximum number of connections kept open to the instance.
+    :param pool_block: If set to True, waits for a free connection when the pool is full instead of opening a throwaway one.
+    :param keep_alive: If set to True, enables TCP keep-alive probes on the pooled connections.
+    :param timeout: Timeout in seconds for every request, either a float or a (connect, read) tuple.
+    :param cache: servicenowpy.ResponseCache used by get_record and get_record_by_number.
+    :param scheduler: servicenowpy.RequestScheduler that retries throttled and failed requests and adapts the concurrency.
+    :param hooks: List of callables called with a RequestEvent after every request
+        and a DecodeEvent after every decoded response body, such as servicenowpy.Stats.
+    :param schema_cache: servicenowpy.SchemaCache of the table schemas. Defaults to an in-memory cache.
+    :param codec: JSON codec of the request and response bodies: 'json', 'orjson', 'ujson', 'auto'
+        for the fastest one installed, or an object with dumps and loads methods.
+    :param compression: If set to True, asks for compressed responses (gzip, deflate, and br if brotli is installed).
+    :param compress_requests: If set, request bodies of at least this many bytes are sent gzip compressed.
+    :param transport: servicenowpy.Transport that sends the requests, such as servicenowpy.HTTPXTransport
+        for HTTP/2. Defaults to a servicenowpy.RequestsTransport with the pool arguments above.
     """
 
-    def __init__(self, instance_url: str, user: str, pwd: str):
+    def __init__(
+        self,
+        instance_url: str,
+        user: str,
+        pwd: str,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        timeout=None,
+        cache=None,
+        scheduler=None,
+        hooks=None,
+        schema_cache=None,
+        codec=None,
+        compression=True,
+        compress_requests=None,
+        transport=None
+    ):
         self.__instance_url = self.make_api_url(instance_url)
         self.__credentials = user, pwd
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler
+        self.hooks = list(hooks or [])
+        self.schema_cache = schema_cache if schema_cache is not None else SchemaCache()
+        self.codec = get_codec(codec)
+        self.compression = compression
+        self.compress_requests = compress_requests
+        if transport is None:
+            transport = RequestsTransport(self.make_session(pool_connections, pool_maxsize, pool_block, keep_alive))
+        self.transport = transport
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
 
     def make_api_url(self, instance_url):
@@ -24,10 +110,43 @@ class Client:
         m = re.search(r'^https?://', instance_url)
         url = f'https://{instance_url}' if not m else instance_url
         url = url.rstrip('/')
-        url += '/api/now/'
+        if not url.endswith('/api/now'):
+            url += '/api/now'
+        url += '/'
         return url
 
 
+    def make_session(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True):
+        """
+        Returns the requests.Session object shared by the client tables.
+
+        :param pool_connections: Number of per-host connection pools to cache.
+        :param pool_maxsize: Maximum number of connections kept open to the instance.
+        :param pool_block: If set to True, waits for a free connection when the pool is full.
+        :param keep_alive: If set to True, enables TCP keep-alive probes on the pooled connections.
+        :rtype: requests.Session
+        """
+
+        socket_options = None
+        if keep_alive:
+            socket_options = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        adapter = PooledAdapter(
+            socket_options=socket_options,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+
+        s = requests.Session()
+        s.auth = self.__credentials
+        s.headers.update({"Accept":"application/json", "Accept-Encoding": accept_encoding(self.compression)})
+        s.mount('https://', adapter)
+        s.mount('http://', adapter)
+        return s
+
+
     def table(self, table):
         """
         Returns servicenowpy.Table object.
@@ -36,7 +155,158 @@ class Client:
         :rtype: servicenowpy.Table
         """
 
-        return Table(table, self.__instance_url, self.__credentials)
+        return Table(table, self.__instance_url, self.__credentials, self)
+
+
+    def write_buffer(self, max_size=100, max_age=1.0, chunk_size=100, workers=4, journal_fields=JOURNAL_FIELDS):
+        """
+        Returns servicenowpy.WriteBuffer object, which merges record updates and sends them in bulk.
+
+        :param max_size: Number of pending records that triggers a flush.
+        :param max_age: Seconds an update waits at most before it is sent.
+        :param chunk_size: Maximum number of records per batch request.
+        :param workers: Number of batch requests sent concurrently.
+        :param journal_fields: Names of the journal fields, whose merged values are appended.
+        :rtype: servicenowpy.WriteBuffer
+        """
+
+        return WriteBuffer(self, max_size, max_age, chunk_size, workers, journal_fields)
+
+
+    def schema(self, table, refresh=False):
+        """
+        Returns the schema of a table, read from sys_db_object and sys_dictionary
+        the first time and then from the schema cache until it expires.
+
+        :param table: The table name.
+        :param refresh: If set to True, reads the schema from the instance even if it is cached.
+        :rtype: servicenowpy.schema.TableSchema
+        """
+
+        schema = None if refresh else self.schema_cache.lookup(self.__instance_url, table)
+        if schema is None:
+            schema = discover(self, table)
+            self.schema_cache.store(self.__instance_url, schema)
+        return schema
+
+
+    def batch(self, chunk_size=100, workers=4):
+        """
+        Returns servicenowpy.Batch object, which sends many operations through the Batch API.
+
+        :param chunk_size: Maximum number of operations per batch request.
+        :param workers: Number of batch requests sent concurrently.
+        :rtype: servicenowpy.Batch
+        """
+
+        return Batch(self, chunk_size, workers)
+
+
+    @property
+    def session(self):
+        """The requests.Session object of the transport, or None if the transport is not built on requests."""
+
+        return getattr(self.transport, 'session', None)
+
+
+    @property
+    def api_url(self):
+        """Instance URL with '/api/now/' appended."""
+
+        return self.__instance_url
+
+
+    def _send(self, method, url, headers=None, data=None, stream=False):
+        """
+        Sends a request through the client transport and returns the response.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param headers: Request headers.
+        :param data: Request body.
+        :param stream: If set to True, the response body is not downloaded until it is read.
+        :rtype: requests.models.Response
+        """
+
+        headers = {"Accept": "application/json", "Accept-Encoding": accept_encoding(self.compression), **(headers or {})}
+        if data is not None:
+            headers = {"Content-Type": "application/json", **headers}
+            if self.compress_requests is not None and len(data) >= self.compress_requests:
+                data = compress(data)
+                headers["Content-Encoding"] = "gzip"
+
+        attempts = []
+
+        def send():
+            start = time.perf_counter()
+            try:
+                return self.transport.request(
+                    method, url, headers=headers, data=data, auth=self.__credentials, timeout=self.timeout,
+                    stream=stream
+                )
+            finally:
+                attempts.append(time.perf_counter() - start)
+
+        if not self.hooks:
+            return send() if self.scheduler is None else self.scheduler.send(send, method)
+
+        start = time.perf_counter()
+        table = table_from_url(url)
+        bytes_sent = len(data) if data else 0
+        try:
+            response = send() if self.scheduler is None else self.scheduler.send(send, method)
+        except Exception as e:
+            self._emit(RequestEvent(
+                method, url, table, None, time.perf_counter() - start,
+                bytes_sent=bytes_sent, retries=max(0, len(attempts) - 1), error=e
+            ))
+            raise
+
+        ttfb = response.elapsed.total_seconds()
+        if stream:
+            download, bytes_received = 0.0, int(response.headers.get('Content-Length', 0))
+        else:
+            download, bytes_received = max(0.0, attempts[-1] - ttfb), len(response.content)
+        self._emit(RequestEvent(
+            method, url, table, response.status_code, time.perf_counter() - start, ttfb, download,
+            bytes_sent, bytes_received, len(attempts) - 1
+        ))
+        return response
+
+
+    def _emit(self, event):
+        """
+        Calls the client hooks with an event.
+
+        :param event: servicenowpy.RequestEvent or servicenowpy.DecodeEvent object.
+        """
+
+        for hook in self.hooks:
+            hook(event)
+
+
+    def close(self):
+        """Closes all the pooled connections."""
+
+        self.transport.close()
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that applies custom socket options to its pooled connections.
+
+    :param socket_options: Socket options set on every new connection.
+    :param **kwargs: HTTPAdapter pool arguments.
+    """
+
+    def __init__(self, socket_options=None, **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.socket_options is not None:
+            kwargs['socket_options'] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
 
 
 class Table:
@@ -46,18 +316,42 @@ class Table:
     :param table: The table name.
     :param instance_url: ServiceNow instance URL".
     :param credentials: Tuple containing user and password, respectively.
+    :param client: The servicenowpy.Client whose connections are used. If omitted, the table creates its own.
     """
 
-    def __init__(self, table, instance_url, credentials: tuple):
+    def __init__(self, table, instance_url, credentials: tuple, client=None):
         self.__table = table
         self.__instance_url = instance_url
         self.__credentials = credentials
+        self.__client = client
+
+    @property
+    def name(self):
+        """The table name."""
+
+        return self.__table
+
+    @property
+    def client(self):
+        """The servicenowpy.Client used to send the requests."""
+
+        if self.__client is None:
+            self.__client = Client(self.__instance_url, *self.__credentials)
+        return self.__client
 
     def get(
         self,
         api_version=None,
         headers={"Accept":"application/json"},
         verbose=False,
+        page_size=None,
+        workers=None,
+        record_type='dict',
+        pagination='offset',
+        key='sys_id',
+        start_after=None,
+        resolve=None,
+        typed=False,
         **kwargs
     ):
         """
@@ -66,33 +360,370 @@ class Table:
         :param api_version: API version, if API versioning is enabled.
         :param headers: Request headers.
         :param verbose: If set to True, prints the full URL before it sends the request.
+        :param page_size: Number of records per page (sysparm_limit).
+        :param workers: If greater than 1, fetches the pages in parallel with this many threads. See iter_pages.
+        :param record_type: 'dict' returns a list of dicts. 'compact' returns a servicenowpy.RecordSet,
+            which stores the field names once and each record as a tuple.
+        :param pagination: 'offset' follows the pagination links. 'keyset' pages by key. See iter_pages.
+        :param key: Unique, sortable field of keyset pagination.
+        :param start_after: Key value after which keyset pagination starts.
+        :param resolve: List of dot-walked reference fields to fill in, such as 'assigned_to.name'. See iter_pages.
+        :param typed: If set to True, decodes the field values by their type in the table schema. See iter_pages.
         :param **kwargs: All query parameters to the URL.
-        :rtype: list
+        :rtype: list or servicenowpy.RecordSet
+        """
+
+        if record_type == 'dict':
+            result = []
+        elif record_type == 'compact':
+            result = RecordSet()
+        else:
+            raise ValueError(f"Invalid record_type {record_type}. Expected 'dict' or 'compact'")
+
+        pages = self.iter_pages(
+            api_version, headers, verbose, page_size, workers, pagination, key, start_after, resolve, typed, **kwargs
+        )
+        for page in pages:
+            result.extend(page)
+        return result
+
+    def iter_pages(
+        self,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        page_size=None,
+        workers=None,
+        pagination='offset',
+        key='sys_id',
+        start_after=None,
+        resolve=None,
+        typed=False,
+        **kwargs
+    ):
         """
+        Sends GET requests to the instance table, following the pagination links,
+        and yields the records of each page as soon as it is decoded.
+
+        With workers greater than 1, the first page is fetched alone to read the
+        X-Total-Count header, and the remaining pages are fetched by offset on a
+        thread pool. Pages are still yielded in offset order. Unless sysparm_query
+        has an ORDERBY term, ORDERBYsys_id is appended to it, so that every page
+        sees the records in the same order. The client pool_maxsize should be at least workers.
+
+        With pagination set to 'keyset', the records are ordered by key and each
+        page asks for the records after the last key seen, so deep pages cost the
+        same as the first one and rows changed mid-pull are not skipped or repeated.
+        The pull can be resumed from the key of the last record received with
+        start_after. With workers greater than 1, the sys_id space is split into
+        ranges that are paged on a thread pool, and pages are yielded in the order
+        they arrive; this requires key to be sys_id.
+
+        With resolve, the fields of the referenced records are added to each
+        page, fetching the distinct references of the page with one query per
+        referenced table. The referenced records are cached for the whole pull.
+
+        With typed, the schema of the table is read from sys_dictionary, or from
+        the client schema cache, and each page is decoded one field at a time:
+        dates and times become timezone-aware datetime objects, integers, decimals
+        and booleans their Python types, and references servicenowpy.schema.Reference
+        tuples. Empty values become None. Unless resolve is used, reference links
+        are left out of the responses, since the schema holds the referenced tables.
+
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param page_size: Number of records per page (sysparm_limit).
+        :param workers: If greater than 1, fetches the pages in parallel with this many threads.
+        :param pagination: Either 'offset' or 'keyset'.
+        :param key: Unique, sortable field of keyset pagination. sysparm_query cannot have ORDERBY terms.
+        :param start_after: Key value after which keyset pagination starts.
+        :param resolve: List of dot-walked reference fields to fill in, such as 'assigned_to.name',
+            or a servicenowpy.ReferenceResolver.
+        :param typed: If set to True, decodes the field values by their type in the table schema,
+            and checks sysparm_fields against it. sysparm_fields can then be a list.
+        :param **kwargs: All query parameters to the URL.
+        :rtype: generator
+        """
+
+        if typed:
+            schema = self._typed_params(resolve, kwargs)
+            pages = self.iter_pages(
+                api_version, headers, verbose, page_size, workers, pagination, key, start_after, resolve, **kwargs
+            )
+            for page in pages:
+                yield schema.decode(page)
+            return
+
+        if resolve:
+            resolver = resolve if isinstance(resolve, ReferenceResolver) else ReferenceResolver(self.client, resolve)
+            fields = kwargs.get('sysparm_fields')
+            added_fields = [f for f in resolver.fields if fields and f not in fields.split(',')]
+            if added_fields:
+                kwargs['sysparm_fields'] = ','.join([fields, *added_fields])
+            pages = self.iter_pages(
+                api_version, headers, verbose, page_size, workers, pagination, key, start_after, **kwargs
+            )
+            for page in pages:
+                resolver.resolve(page)
+                for record in page:
+                    for field in added_fields:
+                        record.pop(field, None)
+                yield page
+            return
 
+        if pagination == 'keyset':
+            if workers and workers > 1:
+                yield from self._iter_pages_keyset_parallel(
+                    api_version, headers, verbose, page_size, workers, key, start_after, **kwargs
+                )
+            else:
+                yield from self._iter_pages_keyset(
+                    api_version, headers, verbose, page_size, key, start_after, None, **kwargs
+                )
+            return
+        if pagination != 'offset':
+            raise ValueError(f"Invalid pagination {pagination}. Expected 'offset' or 'keyset'")
+
+        if workers and workers > 1:
+            yield from self._iter_pages_parallel(api_version, headers, verbose, page_size, workers, **kwargs)
+            return
+
+        if page_size:
+            kwargs['sysparm_limit'] = page_size
         url = self.make_url(api_version, **kwargs)
         if verbose:
             print(url)
-        session = self.get_session(headers)
 
-        result = []
         while url:
-            response = session.get(url)
-            self.check_status_code(response)
+            response = self._request('GET', url, headers)
+            url = self.get_next_link(response)
+            page = self._json(response.content, 'GET')['result']
+            # Drops the raw body before the caller gets the page
+            del response
+            yield page
+
+    def iter_records(
+        self,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        page_size=None,
+        workers=None,
+        stream=False,
+        pagination='offset',
+        key='sys_id',
+        start_after=None,
+        resolve=None,
+        typed=False,
+        **kwargs
+    ):
+        """
+        Sends GET requests to the instance table and yields one record at a time,
+        fetching the next page only when the current one is exhausted.
+
+        With stream set to True, each record is decoded as soon as it is read from
+        the connection, so not even a whole page is held in memory.
+
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param page_size: Number of records per page (sysparm_limit).
+        :param workers: If greater than 1, fetches the pages in parallel with this many threads. See iter_pages.
+        :param stream: If set to True, decodes the records incrementally from the response stream.
+        :param pagination: 'offset' follows the pagination links. 'keyset' pages by key. See iter_pages.
+        :param key: Unique, sortable field of keyset pagination.
+        :param start_after: Key value after which keyset pagination starts.
+        :param resolve: List of dot-walked reference fields to fill in, such as 'assigned_to.name'. See iter_pages.
+        :param typed: If set to True, decodes the field values by their type in the table schema. See iter_pages.
+        :param **kwargs: All query parameters to the URL.
+        :rtype: generator
+        """
+
+        if stream:
+            if workers and workers > 1:
+                raise ValueError('stream and workers cannot be used together')
+            if pagination != 'offset' or resolve:
+                raise ValueError('stream can only be used with offset pagination and without resolve')
+            if typed:
+                schema = self._typed_params(resolve, kwargs)
+                for record in self._iter_records_stream(api_version, headers, verbose, page_size, **kwargs):
+                    yield schema.decode([record])[0]
+                return
+            yield from self._iter_records_stream(api_version, headers, verbose, page_size, **kwargs)
+            return
+
+        pages = self.iter_pages(
+            api_version, headers, verbose, page_size, workers, pagination, key, start_after, resolve, typed, **kwargs
+        )
+        for page in pages:
+            yield from page
+
+    def _typed_params(self, resolve, kwargs):
+        """Returns the table schema, after checking the query parameters of a typed query against it."""
 
-            data = response.json()
-            result.extend(data['result'])
+        if kwargs.get('sysparm_display_value', 'false') != 'false':
+            raise ValueError('typed cannot be used with display values')
+        schema = self.schema()
+        if kwargs.get('sysparm_fields'):
+            kwargs['sysparm_fields'] = schema.projection(kwargs['sysparm_fields'])
+        if not resolve:
+            kwargs.setdefault('sysparm_exclude_reference_link', 'true')
+        return schema
 
-            # Searches for the next page link in the pagination relative links
+    def _iter_records_stream(self, api_version, headers, verbose, page_size, **kwargs):
+        """Yields the records of a query, decoding them incrementally from each response stream."""
+
+        if page_size:
+            kwargs['sysparm_limit'] = page_size
+        url = self.make_url(api_version, **kwargs)
+        if verbose:
+            print(url)
+
+        while url:
+            response = self._request('GET', url, headers, stream=True)
+            url = self.get_next_link(response)
+            with response:
+                yield from iter_array_items(response.iter_content(CHUNK_SIZE), 'result', response.encoding or 'utf-8')
+
+    def _iter_pages_parallel(self, api_version, headers, verbose, page_size, workers, **kwargs):
+        """Yields the pages of a query in offset order, fetching them on a thread pool."""
+
+        page_size = int(page_size or kwargs.pop('sysparm_limit', PARALLEL_PAGE_SIZE))
+        kwargs.pop('sysparm_limit', None)
+        first_offset = int(kwargs.pop('sysparm_offset', 0))
+        kwargs['sysparm_query'] = ordered_query(kwargs.get('sysparm_query'))
+
+        def fetch(offset):
+            url = self.make_url(api_version, sysparm_offset=offset, sysparm_limit=page_size, **kwargs)
+            return self._request('GET', url, headers)
+
+        if verbose:
+            print(self.make_url(api_version, sysparm_offset=first_offset, sysparm_limit=page_size, **kwargs))
+        response = fetch(first_offset)
+        total = response.headers.get('X-Total-Count')
+        yield self._json(response.content, 'GET')['result']
+
+        if total is None:
+            # Without the total count, falls back to following the pagination links
+            url = self.get_next_link(response)
+            while url:
+                response = self._request('GET', url, headers)
+                url = self.get_next_link(response)
+                yield self._json(response.content, 'GET')['result']
+            return
+
+        offsets = iter(range(first_offset + page_size, int(total), page_size))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Keeps at most `workers` pages in flight so a slow consumer bounds memory
+            pending = deque(executor.submit(fetch, o) for _, o in zip(range(workers), offsets))
             try:
-                link = response.headers['Link']
-                m = re.search(r'(.*),<(.*)>;rel="next', link)
-                # Loop ends here with url with value None if pagination were needed
-                url = m.group(2) if m else None
-            except:
-                # Loop ends here if no pagination were needed
-                break
-        return result
+                while pending:
+                    response = pending.popleft().result()
+                    for offset in offsets:
+                        pending.append(executor.submit(fetch, offset))
+                        break
+                    yield self._json(response.content, 'GET')['result']
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _iter_pages_keyset(self, api_version, headers, verbose, page_size, key, after, upto, **kwargs):
+        """Yields the pages of a query with key in the range (after, upto], paging by key."""
+
+        page_size = int(page_size or kwargs.pop('sysparm_limit', PARALLEL_PAGE_SIZE))
+        kwargs.pop('sysparm_limit', None)
+        if 'sysparm_offset' in kwargs:
+            raise ValueError('sysparm_offset cannot be used with keyset pagination. Use start_after')
+        query = kwargs.pop('sysparm_query', '')
+        # Every page has its own query, so counting the records would only slow them down
+        kwargs.setdefault('sysparm_no_count', 'true')
+
+        fields = kwargs.get('sysparm_fields')
+        added_key = bool(fields) and key not in fields.split(',')
+        if added_key:
+            kwargs['sysparm_fields'] = f'{fields},{key}'
+
+        while True:
+            url = self.make_url(
+                api_version, sysparm_query=keyset_query(query, key, after, upto), sysparm_limit=page_size, **kwargs
+            )
+            if verbose:
+                print(url)
+            response = self._request('GET', url, headers)
+            page = self._json(response.content, 'GET')['result']
+            del response
+            if not page:
+                return
+
+            after = page[-1][key]
+            if isinstance(after, dict):
+                after = after['value']
+            if added_key:
+                for record in page:
+                    del record[key]
+            yield page
+            if len(page) < page_size:
+                return
+
+    def _iter_pages_keyset_parallel(self, api_version, headers, verbose, page_size, workers, key, start_after, **kwargs):
+        """Yields the pages of a query as they arrive, paging ranges of the sys_id space on a thread pool."""
+
+        if key != 'sys_id':
+            raise ValueError('Parallel keyset pagination splits the sys_id space. Set key to sys_id')
+
+        # More ranges than workers, so a range with more records does not hold back the others
+        ranges = key_ranges(workers * 4, start_after)
+        pages = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def fetch(after, upto):
+            try:
+                if not stop.is_set():
+                    for page in self._iter_pages_keyset(
+                        api_version, headers, verbose, page_size, key, after, upto, **kwargs
+                    ):
+                        put(page)
+                        if stop.is_set():
+                            break
+            except Exception as e:
+                put(e)
+            put(done)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for after, upto in ranges:
+                executor.submit(fetch, after, upto)
+            try:
+                remaining = len(ranges)
+                while remaining:
+                    item = pages.get()
+                    if item is done:
+                        remaining -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
+
+    def schema(self, refresh=False):
+        """
+        Returns the schema of the table. See Client.schema.
+
+        :param refresh: If set to True, reads the schema from the instance even if it is cached.
+        :rtype: servicenowpy.schema.TableSchema
+        """
+
+        return self.client.schema(self.name, refresh)
 
     def get_record(
         self,
@@ -117,11 +748,9 @@ class Table:
         if verbose:
             print(url)
 
-        session = self.get_session(headers)
-        response = session.get(url)
-        self.check_status_code(response)
+        content = self._get_content(url, headers)
 
-        return response.json()['result']
+        return self._json(content, 'GET')['result']
 
     def get_record_by_number(
         self,
@@ -148,11 +777,172 @@ class Table:
         if verbose:
             print(url)
 
-        session = self.get_session(headers)
-        response = session.get(url)
-        self.check_status_code(response)
+        content = self._get_content(url, headers)
+
+        return self._json(content, 'GET')['result']
+
+    def get_records(
+        self,
+        sys_ids,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        workers=4,
+        **kwargs
+    ):
+        """
+        Gets many records by sys_id in a few requests. The sys_ids are deduplicated
+        and split into sys_idIN queries that keep the URLs under MAX_URL_LENGTH,
+        which are sent concurrently.
 
-        return response.json()['result']
+        :param sys_ids: Iterable of record unique IDs.
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends each request.
+        :param workers: Number of requests sent concurrently.
+        :param **kwargs: Other query parameters to the URL.
+        :return: Dict mapping each sys_id to its record, or to None if it was not found.
+        :rtype: dict
+        """
+
+        return self._get_records_by('sys_id', sys_ids, api_version, headers, verbose, workers, **kwargs)
+
+    def get_records_by_number(
+        self,
+        numbers,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        workers=4,
+        **kwargs
+    ):
+        """
+        Gets many records by number in a few requests. The numbers are deduplicated
+        and split into numberIN queries that keep the URLs under MAX_URL_LENGTH,
+        which are sent concurrently.
+
+        :param numbers: Iterable of record numbers.
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends each request.
+        :param workers: Number of requests sent concurrently.
+        :param **kwargs: Other query parameters to the URL.
+        :return: Dict mapping each number to its record, or to None if it was not found.
+        :rtype: dict
+        """
+
+        return self._get_records_by('number', numbers, api_version, headers, verbose, workers, **kwargs)
+
+    def _get_records_by(self, field, values, api_version, headers, verbose, workers, **kwargs):
+        """Returns a dict mapping each value to the record whose field has it, or to None."""
+
+        result = dict.fromkeys(values)
+        if not result:
+            return result
+
+        query = kwargs.pop('sysparm_query', None)
+        fields = kwargs.get('sysparm_fields')
+        added_field = bool(fields) and field not in fields.split(',')
+        if added_field:
+            kwargs['sysparm_fields'] = f'{fields},{field}'
+
+        def make_query(chunk):
+            return f'{field}IN{",".join(chunk)}' + (f'^{query}' if query else '')
+
+        # Splits the values so that every URL stays under the limit
+        room = MAX_URL_LENGTH - len(quote(self.make_url(api_version, sysparm_query=make_query([]), **kwargs), safe=':/?&=,'))
+        chunks = [[]]
+        size = 0
+        for value in result:
+            length = len(quote(str(value), safe='')) + 1
+            if chunks[-1] and size + length > room:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(str(value))
+            size += length
+
+        def fetch(chunk):
+            records = []
+            for page in self.iter_pages(api_version, headers, verbose, sysparm_query=make_query(chunk), **kwargs):
+                records.extend(page)
+            return records
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for records in executor.map(fetch, chunks):
+                for record in records:
+                    value = record[field]['value'] if isinstance(record[field], dict) else record[field]
+                    if added_field:
+                        del record[field]
+                    if value in result and result[value] is None:
+                        result[value] = record
+        return result
+
+    def count(
+        self,
+        query=None,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Returns the number of records that match a query, counted by the instance
+        through the Aggregate API, without downloading them.
+
+        :param query: Encoded query (sysparm_query).
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: Other query parameters to the URL.
+        :rtype: int
+        """
+
+        return self.aggregate(query, api_version=api_version, headers=headers, verbose=verbose, **kwargs)['count']
+
+    def aggregate(
+        self,
+        query=None,
+        group_by=None,
+        count=True,
+        sum=None,
+        avg=None,
+        min=None,
+        max=None,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        verbose=False,
+        **kwargs
+    ):
+        """
+        Sends a GET request to the Aggregate API of the table, which computes the
+        count, sums, averages, minimums and maximums on the instance.
+
+        Returns a dict like {'count': 10, 'sum': {'reassignment_count': 12}}. With
+        group_by, returns one such dict per group, keyed by the group value, or by
+        a tuple of values if there is more than one group_by field.
+
+        :param query: Encoded query (sysparm_query).
+        :param group_by: Field name, or list of field names, to group by.
+        :param count: If set to True, counts the records.
+        :param sum: Field name, or list of field names, to sum.
+        :param avg: Field name, or list of field names, to average.
+        :param min: Field name, or list of field names, to get the minimum of.
+        :param max: Field name, or list of field names, to get the maximum of.
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param verbose: If set to True, prints the full URL before it sends the request.
+        :param **kwargs: Other query parameters to the URL, such as sysparm_having.
+        :rtype: dict
+        """
+
+        functions = {'sum': sum, 'avg': avg, 'min': min, 'max': max}
+        params = make_aggregate_params(query, group_by, count, functions)
+        url = self._make_url('stats', api_version, **params, **kwargs)
+        if verbose:
+            print(url)
+
+        response = self._request('GET', url, headers)
+        return read_aggregate_result(self._json(response.content, 'GET')['result'], group_by)
 
     def patch(
         self,
@@ -178,13 +968,12 @@ class Table:
         url = self.make_url(api_version, sys_id=sys_id, **kwargs)
         if verbose:
             print(url)
-        session = self.get_session(headers)
 
-        req_body = json.dumps(data)
-        response = session.patch(url, req_body)
-        self.check_status_code(response)
+        req_body = self.client.codec.dumps(data)
+        response = self._request('PATCH', url, headers, req_body)
+        self._invalidate()
 
-        result = response.json()
+        result = self._json(response.content, 'PATCH')
         return result['result']
 
     def post(
@@ -209,13 +998,11 @@ class Table:
         url = self.make_url(api_version, **kwargs)
         if verbose:
             print(url)
-        session = self.get_session(headers)
 
-        req_body = json.dumps(data)
-        response = session.post(url, req_body)
-        self.check_status_code(response, 201)
+        req_body = self.client.codec.dumps(data)
+        response = self._request('POST', url, headers, req_body, 201)
 
-        return response.json()['result']
+        return self._json(response.content, 'POST')['result']
 
     def put(
         self,
@@ -241,13 +1028,12 @@ class Table:
         url = self.make_url(api_version, sys_id=sys_id, **kwargs)
         if verbose:
             print(url)
-        session = self.get_session(headers)
 
-        req_body = json.dumps(data)
-        response = session.put(url, req_body)
-        self.check_status_code(response)
+        req_body = self.client.codec.dumps(data)
+        response = self._request('PUT', url, headers, req_body)
+        self._invalidate()
 
-        result = response.json()
+        result = self._json(response.content, 'PUT')
         return result['result']
 
     def delete(
@@ -271,15 +1057,177 @@ class Table:
         url = self.make_url(api_version, sys_id=sys_id, **kwargs)
         if verbose:
             print(url)
-        session = self.get_session(headers)
 
-        response = session.delete(url)
-        self.check_status_code(response, 204)
+        response = self._request('DELETE', url, headers, expected=204)
+        self._invalidate()
         return response.content
 
+    def bulk_post(self, records, api_version=None, chunk_size=100, workers=4, **kwargs):
+        """
+        Creates many records through the Batch API.
+
+        :param records: Iterable of dicts with the fields and values of each new record.
+        :param api_version: API version (if API versioning is enabled).
+        :param chunk_size: Maximum number of records per batch request.
+        :param workers: Number of batch requests sent concurrently.
+        :param **kwargs: All query parameters to the URL.
+        :return: The created records, or the exception of each one that failed, in the input order. See Batch.send.
+        :rtype: list
+        """
+
+        batch = self.client.batch(chunk_size, workers)
+        for data in records:
+            batch.post(self, data, api_version, **kwargs)
+        return batch.send()
+
+    def bulk_patch(self, updates, api_version=None, chunk_size=100, workers=4, **kwargs):
+        """
+        Updates many records through the Batch API.
+
+        :param updates: Dict, or iterable of pairs, mapping each sys_id to the fields and values to update.
+            A sys_id repeated in the pairs raises ValueError.
+        :param api_version: API version (if API versioning is enabled).
+        :param chunk_size: Maximum number of records per batch request.
+        :param workers: Number of batch requests sent concurrently.
+        :param **kwargs: All query parameters to the URL.
+        :return: The updated records, or the exception of each one that failed, in the input order. See Batch.send.
+        :rtype: list
+        """
+
+        batch = self.client.batch(chunk_size, workers)
+        for sys_id, data in unique_updates(updates):
+            batch.patch(self, sys_id, data, api_version, **kwargs)
+        try:
+            return batch.send()
+        finally:
+            self._invalidate()
+
+    def bulk_put(self, updates, api_version=None, chunk_size=100, workers=4, **kwargs):
+        """
+        Replaces many records through the Batch API.
+
+        :param updates: Dict, or iterable of pairs, mapping each sys_id to its new values.
+            A sys_id repeated in the pairs raises ValueError.
+        :param api_version: API version (if API versioning is enabled).
+        :param chunk_size: Maximum number of records per batch request.
+        :param workers: Number of batch requests sent concurrently.
+        :param **kwargs: All query parameters to the URL.
+        :return: The updated records, or the exception of each one that failed, in the input order. See Batch.send.
+        :rtype: list
+        """
+
+        batch = self.client.batch(chunk_size, workers)
+        for sys_id, data in unique_updates(updates):
+            batch.put(self, sys_id, data, api_version, **kwargs)
+        try:
+            return batch.send()
+        finally:
+            self._invalidate()
+
+    def bulk_delete(self, sys_ids, api_version=None, chunk_size=100, workers=4, **kwargs):
+        """
+        Deletes many records through the Batch API.
+
+        :param sys_ids: Iterable of record unique IDs.
+        :param api_version: API version (if API versioning is enabled).
+        :param chunk_size: Maximum number of records per batch request.
+        :param workers: Number of batch requests sent concurrently.
+        :param **kwargs: All query parameters to the URL.
+        :return: The response contents, or the exception of each one that failed, in the input order. See Batch.send.
+        :rtype: list
+        """
+
+        batch = self.client.batch(chunk_size, workers)
+        for sys_id in sys_ids:
+            batch.delete(self, sys_id, api_version, **kwargs)
+        try:
+            return batch.send()
+        finally:
+            self._invalidate()
+
+    def sync_to(self, path, page_size=1000, **kwargs):
+        """
+        Syncs the table into a local SQLite mirror and returns it. The first call loads
+        the whole table, and the next ones only fetch the records updated since.
+
+        :param path: SQLite database path.
+        :param page_size: Number of records per request and per transaction.
+        :param **kwargs: Other query parameters to the URL. sysparm_query filters the mirrored records.
+        :rtype: servicenowpy.TableMirror
+        """
+
+        mirror = TableMirror(self, path)
+        mirror.sync(page_size, **kwargs)
+        return mirror
+
+    def export(
+        self,
+        path,
+        format='ndjson',
+        batch_size=10000,
+        api_version=None,
+        headers={"Accept":"application/json"},
+        page_size=None,
+        workers=None,
+        pagination='offset',
+        key='sys_id',
+        start_after=None,
+        resolve=None,
+        typed=False,
+        **kwargs
+    ):
+        """
+        Streams the records of a query into a NDJSON, CSV, Parquet or Arrow file,
+        writing them in batches so at most one batch is held in memory.
+        Parquet and Arrow require pyarrow.
+
+        :param path: File path, or file object (text for ndjson and csv, binary for parquet and arrow).
+        :param format: One of 'ndjson', 'csv', 'parquet' or 'arrow'.
+        :param batch_size: Number of records per batch (and per Parquet row group).
+        :param api_version: API version, if API versioning is enabled.
+        :param headers: Request headers.
+        :param page_size: Number of records per page (sysparm_limit).
+        :param workers: If greater than 1, fetches the pages in parallel with this many threads. See iter_pages.
+        :param pagination: 'offset' follows the pagination links. 'keyset' pages by key. See iter_pages.
+        :param key: Unique, sortable field of keyset pagination.
+        :param start_after: Key value after which keyset pagination starts.
+        :param resolve: List of dot-walked reference fields to fill in, such as 'assigned_to.name'. See iter_pages.
+        :param typed: If set to True, decodes the field values by their type in the table schema. References
+            are written as their sys_id, and dates and date-times in ISO 8601 to NDJSON and CSV.
+        :param **kwargs: All query parameters to the URL. sysparm_fields sets the exported columns.
+        :return: Number of records written.
+        :rtype: int
+        """
+
+        fields = kwargs.get('sysparm_fields')
+        records = self.iter_records(
+            api_version, headers, page_size=page_size, workers=workers,
+            pagination=pagination, key=key, start_after=start_after, resolve=resolve, typed=typed, **kwargs
+        )
+        return export_records(records, path, format, field_list(fields) if fields else None, batch_size)
+
+    def extract(self, path, checkpoint=None, page_size=1000, key='sys_id', on_page=None, **kwargs):
+        """
+        Writes the records of a query to a NDJSON file, checkpointing each page, so
+        that running it again after a failure resumes from the last checkpoint.
+        See servicenowpy.Extraction.
+
+        :param path: Output NDJSON file path.
+        :param checkpoint: Checkpoint file path. Defaults to path with '.checkpoint' appended.
+        :param page_size: Number of records per page.
+        :param key: Unique, sortable field the extraction pages by.
+        :param on_page: Callable called with each page of records before it is checkpointed.
+        :param **kwargs: iter_pages arguments, except workers, pagination and typed, and query parameters.
+        :return: Total number of records written, including the ones of previous runs.
+        :rtype: int
+        """
+
+        return Extraction(self, path, checkpoint, page_size, key, **kwargs).run(on_page)
+
     def get_session(self, headers):
         """
-        Returns a requests.Session object.
+        Returns a requests.Session object. It shares the client connection pool,
+        so closing it closes the pooled connections too.
 
         :param headers: Request headers.
         """
@@ -287,9 +1235,84 @@ class Table:
         s = requests.Session()
         s.auth = self.__credentials
         s.headers.update(headers)
+        if self.client.session is None:
+            raise TypeError(f'{type(self.client.transport).__name__} has no requests.Session to share')
+        for prefix, adapter in self.client.session.adapters.items():
+            s.mount(prefix, adapter)
         return s
 
-    def check_status_code(self, response: requests.models.Response, expected=200):
+    def _request(self, method, url, headers, data=None, expected=200, stream=False):
+        """
+        Sends a request through the client connection pool and checks its status code.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param headers: Request headers.
+        :param data: Request body.
+        :param expected: Expected status code.
+        :param stream: If set to True, the response body is not downloaded until it is read.
+        :rtype: requests.models.Response
+        """
+
+        response = self.client._send(method, url, headers, data, stream)
+        self.check_status_code(response, expected)
+        return response
+
+    def _json(self, content, method):
+        """
+        Decodes a JSON response body, reporting the decoding time to the client hooks.
+
+        :param content: Response body.
+        :param method: HTTP method of the request.
+        :rtype: dict
+        """
+
+        codec = self.client.codec
+        if not self.client.hooks:
+            return codec.loads(content)
+
+        start = time.perf_counter()
+        data = codec.loads(content)
+        result = data.get('result') if isinstance(data, dict) else None
+        records = len(result) if isinstance(result, list) else 1
+        self.client._emit(DecodeEvent(method, self.__table, time.perf_counter() - start, records, len(content)))
+        return data
+
+    def _get_content(self, url, headers):
+        """
+        Returns the body of a GET request, served from the client cache when it has a fresh copy.
+
+        :param url: Full request URL.
+        :param headers: Request headers.
+        :rtype: bytes
+        """
+
+        cache = self.client.cache
+        if cache is None:
+            return self._request('GET', url, headers).content
+
+        entry = cache.lookup(url)
+        if entry is not None and entry.fresh:
+            return entry.content
+
+        if entry is not None and entry.etag:
+            headers = {**headers, "If-None-Match": entry.etag}
+        response = self.client._send('GET', url, headers)
+        if entry is not None and response.status_code == 304:
+            cache.refresh(url)
+            return entry.content
+
+        self.check_status_code(response)
+        cache.store(self.__table, url, response.content, response.headers.get('ETag'))
+        return response.content
+
+    def _invalidate(self):
+        """Drops the cached responses of the table after a write."""
+
+        if self.client.cache is not None:
+            self.client.cache.invalidate(self.__table)
+
+    def check_status_code(self, response, expected=200):
         """
         Checks if the given response status code is as expected.
         Raises a StatusCodeError if it is not.
@@ -298,8 +1321,21 @@ class Table:
         :param expected: Expected status code.
         """
         if response.status_code != expected:
-            data = response.json()
-            raise StatusCodeError(data["error"]["message"], data["error"]["detail"], response.status_code)
+            raise StatusCodeError.from_response(response, self.client.codec.loads)
+
+    def get_next_link(self, response):
+        """
+        Returns the next page URL from the response pagination links, or None if it is the last page.
+
+        :param response: Response object.
+        :rtype: str
+        """
+
+        link = response.headers.get('Link')
+        if not link:
+            return None
+        m = re.search(r'(.*),<(.*)>;rel="next', link)
+        return m.group(2) if m else None
 
     def make_url(self, api_version=None, sys_id=None, **kwargs):
         """
@@ -308,10 +1344,20 @@ class Table:
         :rtype: str
         """
 
+        return self._make_url('table', api_version, sys_id, **kwargs)
+
+    def _make_url(self, api, api_version=None, sys_id=None, **kwargs):
+        """
+        Returns a complete url of one of the table APIs.
+
+        :param api: API path, such as 'table' or 'stats'.
+        :rtype: str
+        """
+
         url = self.__instance_url
         if api_version:
             url += f'{api_version}/'
-        url += f'table/{self.__table}'
+        url += f'{api}/{self.__table}'
         if sys_id:
             url += f'/{sys_id}'
         if kwargs:
@@ -0,0 +1,64 @@
+import codecs
+import json
+import re
+
+# Size of the chunks read from the socket when streaming a response
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = ' \t\r\n'
+
+
+def iter_array_items(chunks, key='result', encoding='utf-8'):
+    """
+    Yields the items of a JSON array, found under the given top-level key, as they
+    are decoded from an iterable of byte chunks. Only the item being decoded and
+    the current chunk are kept in memory.
+
+    :param chunks: Iterable of bytes, such as Response.iter_content().
+    :param key: Key of the array in the JSON object.
+    :param encoding: Body encoding.
+    :rtype: generator
+    """
+
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+
+    def fill():
+        # Drops what was already decoded and appends the next chunk
+        nonlocal buffer, pos
+        for chunk in chunks:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+            pos = 0
+            return True
+        return False
+
+    m = start.search(buffer)
+    while not m:
+        if not fill():
+            raise ValueError(f'No "{key}" array in the response body')
+        m = start.search(buffer)
+    pos = m.end()
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in WHITESPACE + ',':
+            pos += 1
+        if pos == len(buffer):
+            if not fill():
+                raise ValueError('Response body ended before the end of the array')
+            continue
+        if buffer[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The item is incomplete, unless the body has no more chunks
+            if not fill():
+                raise
+            continue
+        pos = end
+        yield item
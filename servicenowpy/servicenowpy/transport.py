@@ -0,0 +1,402 @@
+import gzip
+import json
+import re
+import threading
+import time
+import uuid
+
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+from requests.structures import CaseInsensitiveDict
+
+from .aggregate import FUNCTIONS
+
+# Field names are lowercase, so an operator such as IN is not read as the end of the field name
+CONDITION = re.compile(r'([a-z0-9_.]+)(STARTSWITH|NOT IN|IN|!=|>=|<=|=|>|<)(.*)$', re.S)
+
+
+class Transport:
+    """
+    Sends the HTTP requests of a servicenowpy.Client.
+
+    Subclasses implement request, and close if they hold connections. The
+    responses they return must have the status_code, headers, content, encoding
+    and elapsed attributes, and the iter_content, json and close methods, of a
+    requests.Response, and work as context managers. Connection errors and
+    timeouts must be raised as requests.ConnectionError and requests.Timeout,
+    so that retries work the same with every transport.
+    """
+
+    def request(self, method, url, headers=None, data=None, auth=None, timeout=None, stream=False):
+        """
+        Sends a request and returns the response.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param headers: Request headers.
+        :param data: Request body.
+        :param auth: Tuple containing user and password, respectively.
+        :param timeout: Timeout in seconds, either a float or a (connect, read) tuple.
+        :param stream: If set to True, the response body is not downloaded until it is read.
+        """
+
+        raise NotImplementedError
+
+    def close(self):
+        """Closes the connections of the transport."""
+
+
+class RequestsTransport(Transport):
+    """
+    Transport built on a requests.Session, over HTTP/1.1. It is the default.
+
+    :param session: requests.Session object, such as the one built by Client.make_session.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def request(self, method, url, headers=None, data=None, auth=None, timeout=None, stream=False):
+        return self.session.request(
+            method, url, headers=headers, data=data, auth=auth, timeout=timeout, stream=stream
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class Response:
+    """
+    Response of the transports that are not built on requests, with the
+    attributes and methods of a requests.Response that the client uses.
+
+    :param status_code: Response status code.
+    :param headers: Response headers.
+    :param content: Response body. Omitted for streamed responses.
+    :param iter_chunks: For streamed responses, callable that takes a chunk size and yields the body.
+    :param elapsed: Seconds until the response headers were read.
+    :param encoding: Text encoding of the body.
+    :param on_close: Callable that releases the connection of a streamed response.
+    """
+
+    def __init__(
+        self, status_code, headers=None, content=None, iter_chunks=None, elapsed=0.0, encoding=None, on_close=None
+    ):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.elapsed = timedelta(seconds=elapsed)
+        self.encoding = encoding
+        self.__content = content
+        self.__iter_chunks = iter_chunks
+        self.__on_close = on_close
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return f'<Response [{self.status_code}]>'
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        if self.__content is None:
+            self.__content = b''.join(self.__iter_chunks(65536)) if self.__iter_chunks else b''
+            self.close()
+        return self.__content
+
+    def iter_content(self, chunk_size=1):
+        if self.__content is not None or self.__iter_chunks is None:
+            content = self.content
+            for i in range(0, len(content), chunk_size):
+                yield content[i:i + chunk_size]
+            return
+        yield from self.__iter_chunks(chunk_size)
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        if self.__on_close is not None:
+            self.__on_close()
+            self.__on_close = None
+
+
+class HTTPXTransport(Transport):
+    """
+    Transport built on httpx, which multiplexes concurrent requests over a few
+    HTTP/2 connections when the instance supports it. Requires httpx and h2
+    (pip install servicenowpy[http2]).
+
+    :param http2: If set to True, uses HTTP/2 with the instances that support it.
+    :param max_connections: Maximum number of connections open to the instance.
+    :param max_keepalive_connections: Maximum number of idle connections kept alive.
+    :param keepalive_expiry: Seconds an idle connection is kept alive.
+    """
+
+    def __init__(self, http2=True, max_connections=10, max_keepalive_connections=10, keepalive_expiry=5.0):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("HTTPXTransport requires httpx. Install it with 'pip install servicenowpy[http2]'.")
+        self.httpx = httpx
+        self.client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+
+    def request(self, method, url, headers=None, data=None, auth=None, timeout=None, stream=False):
+        httpx = self.httpx
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        request = self.client.build_request(method, url, headers=headers, content=data, timeout=timeout)
+
+        start = time.perf_counter()
+        with self.errors():
+            response = self.client.send(request, auth=auth, stream=True)
+        elapsed = time.perf_counter() - start
+
+        if not stream:
+            try:
+                with self.errors():
+                    response.read()
+            finally:
+                response.close()
+            return Response(
+                response.status_code, response.headers.multi_items(), response.content,
+                elapsed=elapsed, encoding=response.encoding
+            )
+
+        def iter_chunks(chunk_size):
+            with self.errors():
+                yield from response.iter_bytes(chunk_size)
+
+        return Response(
+            response.status_code, response.headers.multi_items(), iter_chunks=iter_chunks,
+            elapsed=elapsed, encoding=response.encoding, on_close=response.close
+        )
+
+    def errors(self):
+        """Returns a context manager that raises httpx errors as requests errors."""
+
+        return TranslatedErrors(self.httpx)
+
+    def close(self):
+        self.client.close()
+
+
+class TranslatedErrors:
+    """Context manager that raises httpx timeouts and connection errors as requests.Timeout and requests.ConnectionError."""
+
+    def __init__(self, httpx):
+        self.httpx = httpx
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            return False
+        if issubclass(exc_type, self.httpx.TimeoutException):
+            raise requests.Timeout(str(exc)) from exc
+        if issubclass(exc_type, self.httpx.TransportError):
+            raise requests.ConnectionError(str(exc)) from exc
+        return False
+
+
+class MemoryTransport(Transport):
+    """
+    Transport that serves the Table API from records held in memory, without
+    any network, for fast tests. It supports listing with sysparm_query (=, !=,
+    >, >=, <, <=, IN, NOT IN, STARTSWITH, ^NQ and ORDERBY), sysparm_fields,
+    sysparm_limit and sysparm_offset with Link and X-Total-Count headers,
+    getting, creating, updating and deleting records by sys_id, and counts of
+    the Aggregate API, optionally grouped. Writes are kept. Other query terms,
+    such as ^OR, LIKE or ENDSWITH, get a 400 response.
+
+    Other requests are passed to handler, if given, which returns a Response or None.
+
+    :param tables: Dict mapping table names to lists of record dicts.
+    :param handler: Callable that takes method, url, headers and data.
+    """
+
+    def __init__(self, tables=None, handler=None):
+        self.tables = {name: {r['sys_id']: dict(r) for r in records} for name, records in (tables or {}).items()}
+        self.handler = handler
+        self.requests = []
+        self.__lock = threading.Lock()
+
+    def request(self, method, url, headers=None, data=None, auth=None, timeout=None, stream=False):
+        with self.__lock:
+            self.requests.append((method, url))
+            if self.handler is not None:
+                response = self.handler(method, url, headers, data)
+                if response is not None:
+                    return response
+
+            parts = urlsplit(url)
+            m = re.search(r'/api/now/(?:v\d+/)?(table|stats)/(\w+)(?:/(\w+))?$', parts.path)
+            if m is None:
+                return error_response(400, 'Requested URI does not represent any resource')
+            api, table, sys_id = m.groups()
+            params = dict(parse_qsl(parts.query))
+            if table not in self.tables:
+                return error_response(400, f'Invalid table {table}')
+            records = self.tables[table]
+            if api == 'stats':
+                return self.stats(records, params)
+            encoding = CaseInsensitiveDict(headers or {}).get('Content-Encoding')
+            if encoding == 'gzip' and data:
+                data = gzip.decompress(data)
+            elif encoding not in (None, 'identity'):
+                return error_response(415, f'Unsupported Content-Encoding {encoding}')
+            if isinstance(data, bytes):
+                data = data.decode()
+            body = json.loads(data) if data else None
+
+            if sys_id is None and method == 'GET':
+                return self.list(url, records, params)
+            if method == 'POST':
+                record = {**body, 'sys_id': uuid.uuid4().hex}
+                records[record['sys_id']] = record
+                return json_response(201, {'result': project(record, params)})
+            if sys_id not in records:
+                return error_response(404, 'No Record found')
+            if method == 'GET':
+                return json_response(200, {'result': project(records[sys_id], params)})
+            if method in ('PATCH', 'PUT'):
+                records[sys_id].update(body)
+                return json_response(200, {'result': project(records[sys_id], params)})
+            if method == 'DELETE':
+                del records[sys_id]
+                return Response(204)
+            return error_response(405, f'Method {method} not allowed')
+
+    def list(self, url, records, params):
+        try:
+            matches = select(records.values(), params.get('sysparm_query', ''))
+        except ValueError as e:
+            return error_response(400, str(e))
+
+        offset = int(params.get('sysparm_offset', 0))
+        limit = int(params.get('sysparm_limit', 10000))
+        page = [project(r, params) for r in matches[offset:offset + limit]]
+        headers = {}
+        if params.get('sysparm_no_count') != 'true':
+            headers['X-Total-Count'] = str(len(matches))
+        if offset + limit < len(matches):
+            base = url.split('?')[0]
+            query = urlencode({**params, 'sysparm_offset': offset + limit})
+            headers['Link'] = f'<{base}?{urlencode({**params, "sysparm_offset": 0})}>;rel="first",<{base}?{query}>;rel="next"'
+        return json_response(200, {'result': page}, headers)
+
+    def stats(self, records, params):
+        if any(f'sysparm_{name}_fields' in params for name in FUNCTIONS):
+            return error_response(400, 'Only counts are supported')
+        try:
+            matches = select(records.values(), params.get('sysparm_query', ''))
+        except ValueError as e:
+            return error_response(400, str(e))
+        count = params.get('sysparm_count') == 'true'
+        group_by = params.get('sysparm_group_by')
+        if not group_by:
+            return json_response(200, {'result': {'stats': {'count': str(len(matches))} if count else {}}})
+
+        fields = group_by.split(',')
+        groups = {}
+        for record in matches:
+            groups.setdefault(tuple(value(record, f) for f in fields), []).append(record)
+        result = [
+            {
+                'stats': {'count': str(len(group))} if count else {},
+                'groupby_fields': [{'field': f, 'value': v} for f, v in zip(fields, values)]
+            }
+            for values, group in sorted(groups.items())
+        ]
+        return json_response(200, {'result': result})
+
+
+def select(records, query):
+    """Returns the records that match an encoded query, in its ORDERBY order."""
+
+    groups, order_by = parse_query(query)
+    matches = [r for r in records if not groups or any(all(c(r) for c in g) for g in groups)]
+    for field, descending in reversed(order_by):
+        matches.sort(key=lambda r: value(r, field), reverse=descending)
+    return matches
+
+
+def value(record, field):
+    """Returns the value of a record field as a string, or the value of a reference."""
+
+    v = record.get(field, '')
+    return v.get('value', '') if isinstance(v, dict) else str(v)
+
+
+def project(record, params):
+    fields = params.get('sysparm_fields')
+    if not fields:
+        return dict(record)
+    return {f: record.get(f, '') for f in fields.split(',')}
+
+
+def parse_query(query):
+    """Returns the groups of conditions of an encoded query, and its ORDERBY fields."""
+
+    groups = []
+    order_by = []
+    for group in filter(None, query.split('^NQ')):
+        conditions = []
+        for term in filter(None, group.split('^')):
+            if term.startswith('ORDERBYDESC'):
+                order_by.append((term[11:], True))
+            elif term.startswith('ORDERBY'):
+                order_by.append((term[7:], False))
+            else:
+                conditions.append(condition(term))
+        if conditions:
+            groups.append(conditions)
+    return groups, order_by
+
+
+def condition(term):
+    m = CONDITION.match(term)
+    if m is None:
+        raise ValueError(f'Unsupported condition {term}')
+    field, op, operand = m.groups()
+    tests = {
+        '=': lambda v: v == operand,
+        '!=': lambda v: v != operand,
+        '>': lambda v: v > operand,
+        '>=': lambda v: v >= operand,
+        '<': lambda v: v < operand,
+        '<=': lambda v: v <= operand,
+        'IN': lambda v: v in operand.split(','),
+        'NOT IN': lambda v: v not in operand.split(','),
+        'STARTSWITH': lambda v: v.startswith(operand),
+    }
+    test = tests[op]
+    return lambda record: test(value(record, field))
+
+
+def json_response(status, data, headers=None):
+    return Response(
+        status, {'Content-Type': 'application/json;charset=UTF-8', **(headers or {})},
+        json.dumps(data).encode(), encoding='utf-8'
+    )
+
+
+def error_response(status, message):
+    return json_response(status, {'error': {'message': message, 'detail': None}, 'status': 'failure'})
@@ -0,0 +1,37 @@
+import unittest
+
+from servicenowpy.aggregate import make_params, read_result
+
+
+class TestAggregate(unittest.TestCase):
+
+    def test_make_params(self):
+        params = make_params('active=true', ['state', 'priority'], True, {'sum': 'reassignment_count', 'avg': None})
+        self.assertEqual(params, {
+            'sysparm_query': 'active=true',
+            'sysparm_count': 'true',
+            'sysparm_group_by': 'state,priority',
+            'sysparm_sum_fields': 'reassignment_count'
+        })
+
+
+    def test_invalid_function(self):
+        with self.assertRaises(ValueError):
+            make_params(functions={'median': 'priority'})
+
+
+    def test_read_result(self):
+        result = {"stats": {"count": "12", "avg": {"priority": "2.5000"}, "max": {"sys_updated_on": "2021-09-17 02:08:50"}}}
+        self.assertEqual(
+            read_result(result),
+            {'count': 12, 'avg': {'priority': 2.5}, 'max': {'sys_updated_on': '2021-09-17 02:08:50'}}
+        )
+
+
+    def test_read_grouped_result(self):
+        result = [
+            {"stats": {"count": "3"}, "groupby_fields": [{"field": "state", "value": "1"}, {"field": "active", "value": "true"}]},
+            {"stats": {"count": "4"}, "groupby_fields": [{"field": "state", "value": "2"}, {"field": "active", "value": "true"}]}
+        ]
+        self.assertEqual(read_result(result, 'state,active'), {('1', 'true'): {'count': 3}, ('2', 'true'): {'count': 4}})
+        self.assertEqual(read_result(result[:1], ['state']), {'1': {'count': 3}})
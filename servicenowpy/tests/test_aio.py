@@ -0,0 +1,103 @@
+import asyncio
+import os
+import unittest
+
+from unittest import skipIf
+
+from servicenowpy import AsyncClient, AsyncTable, StatusCodeError
+from servicenowpy.aio import httpx
+from servicenowpy.codec import JSONCodec
+
+
+@skipIf(httpx is None, 'httpx is not installed.')
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+
+    async def test_table(self):
+        async with AsyncClient('instance_url', 'user', 'pwd') as sn_client:
+            inc_table = sn_client.table('incident')
+            self.assertIsInstance(inc_table, AsyncTable)
+            self.assertIs(inc_table.client, sn_client)
+
+
+    async def test_semaphore(self):
+        async with AsyncClient('instance_url', 'user', 'pwd', max_concurrency=3) as sn_client:
+            self.assertIsInstance(sn_client.semaphore, asyncio.Semaphore)
+            self.assertIs(sn_client.semaphore, sn_client.semaphore)
+            self.assertEqual(sn_client.max_concurrency, 3)
+
+
+@skipIf(httpx is None, 'httpx is not installed.')
+class TestAsyncTable(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        self.sn_client = AsyncClient(self.mock_instance_url, 'user', 'pwd')
+
+
+    async def asyncTearDown(self):
+        await self.sn_client.aclose()
+
+
+    async def test_get(self):
+        inc_table = self.sn_client.table('incident')
+        result = await inc_table.get()
+        self.assertIsInstance(result, list)
+
+
+    async def test_iter_records(self):
+        inc_table = self.sn_client.table('incident')
+        fields = 'number,assignment_group'
+        records = [record async for record in inc_table.iter_records(sysparm_fields=fields)]
+        self.assertEqual(records, await inc_table.get(sysparm_fields=fields))
+
+
+    async def test_get_record(self):
+        sys_id = '1c741bd70b2322007518478d83673af3'
+        inc_table = self.sn_client.table('incident')
+        result = await inc_table.get_record(sys_id)
+        self.assertIsInstance(result, dict)
+        self.assertEqual(result['sys_id'], sys_id)
+
+
+    async def test_get_record_by_number(self):
+        number = 'INC0000001'
+        inc_table = self.sn_client.table('incident')
+        result = await inc_table.get_record_by_number(number)
+        self.assertEqual(result[0]['number'], number)
+
+
+    async def test_delete(self):
+        sys_id = '1c741bd70b2322007518478d83673af3'
+        inc_table = self.sn_client.table('incident')
+        result = await inc_table.delete(sys_id)
+        self.assertEqual(result, b'')
+
+
+    async def test_concurrent_requests(self):
+        sys_ids = [f'{n:032x}' for n in range(20)]
+        inc_table = self.sn_client.table('incident')
+        results = await asyncio.gather(*(inc_table.get_record(sys_id) for sys_id in sys_ids))
+        self.assertEqual(len(results), len(sys_ids))
+        for result in results:
+            self.assertIsInstance(result, dict)
+
+
+    async def test_check_status_code_raises_exception(self):
+        bad_table = self.sn_client.table('badtable')
+        with self.assertRaises(StatusCodeError):
+            await bad_table.get()
+
+
+    async def test_check_status_code_uses_client_codec(self):
+        decoded = []
+
+        class SpyCodec(JSONCodec):
+            def loads(self, content):
+                decoded.append(content)
+                return super().loads(content)
+
+        async with AsyncClient(self.mock_instance_url, 'user', 'pwd', codec=SpyCodec()) as sn_client:
+            with self.assertRaises(StatusCodeError) as cm:
+                await sn_client.table('badtable').get()
+        self.assertEqual(cm.exception.status, 400)
+        self.assertEqual(len(decoded), 1)
@@ -0,0 +1,177 @@
+import base64
+import json
+import os
+import unittest
+
+import requests
+
+from servicenowpy import Batch, Client, RequestsTransport, StatusCodeError
+from servicenowpy.transport import Response
+
+
+def encode(data):
+    return base64.b64encode(json.dumps(data).encode()).decode()
+
+
+class TestBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sn_client = Client('mock.service-now.com', 'user', 'pwd')
+        cls.inc_table = cls.sn_client.table('incident')
+
+
+    def test_client_batch(self):
+        batch = self.sn_client.batch(chunk_size=50, workers=2)
+        self.assertIsInstance(batch, Batch)
+        self.assertEqual(batch.chunk_size, 50)
+
+
+    def test_add(self):
+        batch = self.sn_client.batch()
+        first = batch.post(self.inc_table, {"short_description": "Test"}, sysparm_fields='sys_id')
+        second = batch.delete(self.inc_table, 'abc')
+        self.assertEqual((first, second), (0, 1))
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(
+            batch.operations[0],
+            ('POST', '/api/now/table/incident?sysparm_fields=sys_id', {"short_description": "Test"}, 201)
+        )
+        self.assertEqual(batch.operations[1], ('DELETE', '/api/now/table/incident/abc', None, 204))
+
+
+    def test_make_body(self):
+        batch = self.sn_client.batch()
+        batch.patch(self.inc_table, 'abc', {"state": "2"})
+        batch.delete(self.inc_table, 'def')
+        body = batch.make_body(batch.operations, 10)
+
+        self.assertEqual(body["batch_request_id"], '10')
+        patch, delete = body["rest_requests"]
+        self.assertEqual(patch["id"], '10')
+        self.assertEqual(patch["method"], 'PATCH')
+        self.assertEqual(patch["url"], '/api/now/table/incident/abc')
+        self.assertEqual(json.loads(base64.b64decode(patch["body"])), {"state": "2"})
+        self.assertEqual(delete["id"], '11')
+        self.assertNotIn("body", delete)
+
+
+    def test_read_results(self):
+        batch = self.sn_client.batch()
+        for sys_id in ('a', 'b', 'c'):
+            batch.patch(self.inc_table, sys_id, {"state": "2"})
+        batch.delete(self.inc_table, 'd')
+        data = {
+            "batch_request_id": "0",
+            "serviced_requests": [
+                {"id": "3", "status_code": 204, "body": ""},
+                {"id": "0", "status_code": 200, "body": encode({"result": {"sys_id": "a"}})},
+                {"id": "1", "status_code": 404, "body": encode({
+                    "error": {"message": "No Record found", "detail": "Record doesn't exist"},
+                    "status": "failure"
+                })}
+            ],
+            "unserviced_requests": ["2"]
+        }
+        results = batch.read_results(data, batch.operations)
+
+        self.assertEqual(results[0], {"sys_id": "a"})
+        self.assertIsInstance(results[1], StatusCodeError)
+        self.assertEqual(results[1].status, 404)
+        self.assertEqual(results[1].message, 'No Record found')
+        self.assertIsInstance(results[2], StatusCodeError)
+        self.assertEqual(results[3], b'')
+
+
+class FlakyTransport(RequestsTransport):
+    """
+    Sends requests through a requests.Session, failing the batch requests of
+    some chunks with an exception, or answering them with a given response.
+    """
+
+    def __init__(self, session, failures):
+        super().__init__(session)
+        self.failures = failures
+
+    def request(self, method, url, headers=None, data=None, **kwargs):
+        failure = self.failures.get(json.loads(data)['batch_request_id']) if url.endswith('/batch') else None
+        if isinstance(failure, Exception):
+            raise failure
+        if failure is not None:
+            return failure
+        return super().request(method, url, headers, data, **kwargs)
+
+
+class TestBatchSend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        cls.sn_client = Client(cls.mock_instance_url, 'user', 'pwd')
+        cls.inc_table = cls.sn_client.table('incident')
+        cls.sys_ids = [r['sys_id'] for r in cls.inc_table.get(sysparm_fields='sys_id', sysparm_query='ORDERBYsys_id')]
+
+
+    def test_send(self):
+        batch = self.sn_client.batch(chunk_size=2)
+        batch.post(self.inc_table, {"short_description": "Created"})
+        batch.patch(self.inc_table, self.sys_ids[0], {"short_description": "Updated"})
+        batch.delete(self.inc_table, 'f' * 32)
+        results = batch.send()
+
+        self.assertEqual(results[0]['short_description'], 'Created')
+        self.assertEqual(results[1]['short_description'], 'Updated')
+        self.assertIsInstance(results[2], StatusCodeError)
+        self.assertEqual(results[2].status, 404)
+        self.assertEqual(batch.operations, [])
+
+
+    def test_bulk(self):
+        created = self.inc_table.bulk_post([{"short_description": str(n)} for n in range(5)], chunk_size=2)
+        self.assertEqual([r['short_description'] for r in created], ['0', '1', '2', '3', '4'])
+
+        updates = {sys_id: {"short_description": "Updated"} for sys_id in self.sys_ids[:3]}
+        for results in (self.inc_table.bulk_patch(updates, chunk_size=2), self.inc_table.bulk_put(updates)):
+            self.assertEqual([r['sys_id'] for r in results], self.sys_ids[:3])
+
+        results = self.inc_table.bulk_delete(self.sys_ids[:2] + ['f' * 32])
+        self.assertEqual(results[:2], [b'', b''])
+        self.assertEqual(results[2].status, 404)
+
+
+    def test_bulk_duplicate_sys_ids(self):
+        sys_id = self.sys_ids[0]
+        with self.assertRaises(ValueError):
+            self.inc_table.bulk_patch([(sys_id, {"priority": "1"}), (sys_id, {"impact": "1"})])
+        with self.assertRaises(ValueError):
+            self.inc_table.bulk_put([(sys_id, {"priority": "1"}), (sys_id, {"impact": "1"})])
+
+
+    def test_failed_chunk(self):
+        session = self.sn_client.make_session()
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd', transport=FlakyTransport(session, {'2': requests.ConnectionError('Connection reset by peer')}))
+        inc_table = sn_client.table('incident')
+        updates = {sys_id: {"short_description": "Updated"} for sys_id in self.sys_ids[:6]}
+        results = inc_table.bulk_patch(updates, chunk_size=2)
+
+        self.assertEqual([r['sys_id'] for r in results[:2] + results[4:]], self.sys_ids[:2] + self.sys_ids[4:6])
+        self.assertIsInstance(results[2], requests.ConnectionError)
+        self.assertIs(results[2], results[3])
+        sn_client.close()
+
+
+    def test_invalid_chunk_response(self):
+        session = self.sn_client.make_session()
+        failures = {
+            '2': Response(200, {'Content-Type': 'text/html'}, b'<html>Sign in</html>'),
+            '4': Response(200, {'Content-Type': 'application/json'}, b'{"serviced_requests": [{"id": "4"}]}'),
+        }
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd', transport=FlakyTransport(session, failures))
+        results = sn_client.table('incident').bulk_delete(self.sys_ids[:6], chunk_size=2)
+
+        self.assertEqual(results[:2], [b'', b''])
+        for result in results[2:]:
+            self.assertIsInstance(result, StatusCodeError)
+            self.assertEqual(result.message, 'Invalid batch response')
+            self.assertEqual(result.status, 200)
+        sn_client.close()
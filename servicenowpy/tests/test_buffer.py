@@ -0,0 +1,74 @@
+import os
+import unittest
+
+from servicenowpy import Client, StatusCodeError, WriteBuffer
+
+
+class TestWriteBuffer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        cls.sys_ids = [f'{n:032x}' for n in (1, 2)]
+
+
+    def test_merge(self):
+        events = []
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd', hooks=[events.append])
+        inc_table = sn_client.table('incident')
+
+        with sn_client.write_buffer(max_age=60) as buffer:
+            self.assertIsInstance(buffer, WriteBuffer)
+            first = buffer.patch(inc_table, self.sys_ids[0], {'state': '2'})
+            second = buffer.patch(inc_table, self.sys_ids[0], {'state': '3', 'work_notes': 'Working on it'})
+            other = buffer.patch(inc_table, self.sys_ids[1], {'state': '6'})
+            self.assertEqual(len(buffer), 2)
+            self.assertFalse(first.done())
+            buffer.flush()
+
+        self.assertEqual(len([e for e in events if e.kind == 'request']), 1)
+        self.assertIs(first.result(), second.result())
+        self.assertEqual(first.result()['state'], '3')
+        self.assertEqual(first.result()['work_notes'], 'Working on it')
+        self.assertEqual(other.result()['state'], '6')
+        self.assertEqual((buffer.updates, buffer.sent), (3, 2))
+
+
+    def test_merge_journal_fields(self):
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd')
+        inc_table = sn_client.table('incident')
+        with sn_client.write_buffer(max_age=60) as buffer:
+            buffer.patch(inc_table, self.sys_ids[0], {'work_notes': 'First note', 'state': '2'})
+            future = buffer.patch(inc_table, self.sys_ids[0], {'work_notes': 'Second note', 'state': '3'})
+
+        self.assertEqual(future.result()['work_notes'], 'First note\n\nSecond note')
+        self.assertEqual(future.result()['state'], '3')
+
+
+    def test_flush_on_size(self):
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd')
+        inc_table = sn_client.table('incident')
+        with sn_client.write_buffer(max_size=2, max_age=60) as buffer:
+            futures = [buffer.patch(inc_table, sys_id, {'state': '2'}) for sys_id in self.sys_ids]
+            self.assertEqual([f.result(timeout=10)['sys_id'] for f in futures], self.sys_ids)
+
+
+    def test_flush_on_age(self):
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd')
+        with sn_client.write_buffer(max_age=0.05) as buffer:
+            future = buffer.patch(sn_client.table('incident'), self.sys_ids[0], {'state': '2'})
+            self.assertEqual(future.result(timeout=10)['state'], '2')
+
+
+    def test_failed_update(self):
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd')
+        inc_table = sn_client.table('incident')
+        with sn_client.write_buffer() as buffer:
+            missing = buffer.patch(inc_table, 'f' * 32, {'state': '2'})
+            found = buffer.patch(inc_table, self.sys_ids[0], {'state': '2'})
+
+        self.assertIsInstance(missing.exception(), StatusCodeError)
+        self.assertEqual(missing.exception().status, 404)
+        self.assertEqual(found.result()['state'], '2')
+        with self.assertRaises(RuntimeError):
+            buffer.patch(inc_table, self.sys_ids[0], {'state': '2'})
@@ -0,0 +1,99 @@
+import os
+import time
+import unittest
+
+from servicenowpy import Client, ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_lookup_miss_and_hit(self):
+        cache = ResponseCache()
+        self.assertIsNone(cache.lookup('url'))
+        cache.store('incident', 'url', b'{}')
+        self.assertEqual(cache.lookup('url').content, b'{}')
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.store('incident', 'a', b'a')
+        cache.store('incident', 'b', b'b')
+        cache.lookup('a')
+        cache.store('incident', 'c', b'c')
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.lookup('b'))
+        self.assertIsNotNone(cache.lookup('a'))
+        self.assertEqual(cache.stats.evictions, 1)
+
+
+    def test_max_bytes(self):
+        cache = ResponseCache(max_bytes=20)
+        cache.store('incident', 'a', b'x' * 10)
+        cache.store('incident', 'b', b'x' * 10)
+        self.assertEqual(len(cache), 1)
+        self.assertLessEqual(cache.size, 20)
+
+        cache.store('incident', 'c', b'x' * 30)
+        self.assertIsNone(cache.lookup('c'))
+
+
+    def test_table_ttls(self):
+        cache = ResponseCache(ttl=60, table_ttls={'sys_user': 0})
+        cache.store('sys_user', 'user', b'{}')
+        cache.store('incident', 'inc', b'{}')
+        time.sleep(0.01)
+
+        self.assertFalse(cache.lookup('user').fresh)
+        self.assertTrue(cache.lookup('inc').fresh)
+
+
+    def test_refresh(self):
+        cache = ResponseCache(ttl=0, table_ttls={'sys_user': 0})
+        cache.store('sys_user', 'user', b'{}', etag='"abc"')
+        cache.table_ttls['sys_user'] = 60
+        cache.refresh('user')
+
+        self.assertTrue(cache.lookup('user').fresh)
+        self.assertEqual(cache.stats.revalidations, 1)
+
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        cache.store('incident', 'a', b'a')
+        cache.store('sys_user', 'b', b'b')
+        cache.invalidate('incident')
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, len('b') + len(b'b'))
+
+
+class TestTableCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+
+
+    def test_get_record_cached(self):
+        sys_id = '1c741bd70b2322007518478d83673af3'
+        cache = ResponseCache()
+        inc_table = Client(self.mock_instance_url, 'user', 'pwd', cache=cache).table('incident')
+
+        first = inc_table.get_record(sys_id)
+        second = inc_table.get_record(sys_id)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+
+    def test_write_invalidates(self):
+        sys_id = '1c741bd70b2322007518478d83673af3'
+        cache = ResponseCache()
+        inc_table = Client(self.mock_instance_url, 'user', 'pwd', cache=cache).table('incident')
+
+        inc_table.get_record_by_number('INC0000001')
+        self.assertEqual(len(cache), 1)
+        inc_table.delete(sys_id)
+        self.assertEqual(len(cache), 0)
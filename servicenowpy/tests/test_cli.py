@@ -0,0 +1,126 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from servicenowpy import Client, Extraction
+from servicenowpy.cli import Progress, main, total_count
+
+
+class TestCLI(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        cls.inc_table = Client(cls.mock_instance_url, 'user', 'pwd').table('incident')
+
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        env = mock.patch.dict(os.environ, {'SERVICENOWPY_PASSWORD': 'pwd'})
+        env.start()
+        self.addCleanup(env.stop)
+
+
+    def run_cli(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = main(['export', self.mock_instance_url, 'incident', '-u', 'user', *args])
+        return status, stdout.getvalue(), stderr.getvalue()
+
+
+    def test_total_count(self):
+        self.assertEqual(total_count(self.inc_table), self.inc_table.count())
+        self.assertEqual(total_count(self.inc_table, 'priority=1'), self.inc_table.count('priority=1'))
+
+
+    def test_export_stdout(self):
+        status, stdout, stderr = self.run_cli('-f', 'number,sys_id', '-q', 'priority=1', '--no-progress')
+        self.assertEqual(status, 0)
+        self.assertEqual(stderr, '')
+        records = [json.loads(line) for line in stdout.splitlines()]
+        expected = self.inc_table.get(sysparm_fields='number,sys_id', sysparm_query='priority=1^ORDERBYsys_id')
+        self.assertEqual(records, expected)
+
+
+    def test_export_csv_workers(self):
+        path = os.path.join(self.dir.name, 'incident.csv')
+        status, stdout, stderr = self.run_cli('-f', 'number,priority', '-o', path, '-w', '4', '--page-size', '10')
+        self.assertEqual(status, 0)
+
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        total = self.inc_table.count()
+        self.assertEqual(len(rows), total)
+        self.assertEqual(list(rows[0]), ['number', 'priority'])
+        self.assertIn(f'{total}/{total} records (100.0%)', stderr)
+
+
+    def test_resume(self):
+        path = os.path.join(self.dir.name, 'incident.ndjson')
+        extraction = Extraction(self.inc_table, path, page_size=10, sysparm_fields='number')
+        pages = []
+
+        def stop(page):
+            pages.append(page)
+            if len(pages) == 2:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            extraction.run(stop)
+        self.assertEqual(extraction.state['records'], 10)
+
+        status, stdout, stderr = self.run_cli('-f', 'number', '-o', path, '--resume', '--page-size', '10')
+        self.assertEqual(status, 0)
+        self.assertTrue(extraction.done)
+        self.assertEqual(len(list(extraction.records())), self.inc_table.count())
+
+
+    def test_errors(self):
+        with self.assertRaises(SystemExit) as cm, contextlib.redirect_stderr(io.StringIO()):
+            main(['export', self.mock_instance_url, 'incident', '-u', 'user', '--resume'])
+        self.assertEqual(cm.exception.code, 2)
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main(['export', self.mock_instance_url, 'nope', '-u', 'user', '--no-progress'])
+        self.assertEqual(status, 1)
+        self.assertIn('Invalid table nope', stderr.getvalue())
+
+
+    def test_client_errors(self):
+        with self.assertRaises(SystemExit) as cm, contextlib.redirect_stderr(io.StringIO()):
+            self.run_cli('--codec', 'simplejson')
+        self.assertEqual(cm.exception.code, 2)
+
+        error = ImportError("HTTPXTransport requires httpx. Install it with 'pip install servicenowpy[http2]'.")
+        with mock.patch('servicenowpy.transport.HTTPXTransport.__init__', side_effect=error):
+            status, stdout, stderr = self.run_cli('--http2', '--no-progress')
+        self.assertEqual(status, 1)
+        self.assertEqual(stderr, f'servicenowpy: error: {error}\n')
+
+        with mock.patch('servicenowpy.cli.Client', side_effect=ImportError('orjson is not installed')):
+            status, stdout, stderr = self.run_cli('--codec', 'orjson', '--no-progress')
+        self.assertEqual(status, 1)
+        self.assertIn('orjson is not installed', stderr)
+
+
+class TestProgress(unittest.TestCase):
+
+    def test_print(self):
+        file = io.StringIO()
+        progress = Progress(200, done=50, file=file, interval=0)
+        progress.update(50)
+        progress.close()
+        self.assertIn('100/200 records (50.0%)', file.getvalue())
+        self.assertTrue(file.getvalue().endswith('\n'))
+
+        file = io.StringIO()
+        Progress(file=file).close()
+        self.assertIn('0 records', file.getvalue())
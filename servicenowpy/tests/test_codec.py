@@ -0,0 +1,80 @@
+import gzip
+import os
+import unittest
+
+from servicenowpy import Client
+from servicenowpy.codec import JSONCodec, accept_encoding, compress, get_codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_json_codec(self):
+        data = {'short_description': 'Não consigo acessar', 'priority': 1}
+        content = JSONCodec().dumps(data)
+        self.assertIsInstance(content, bytes)
+        self.assertEqual(JSONCodec().loads(content), data)
+
+
+    def test_get_codec(self):
+        self.assertIsInstance(get_codec(), JSONCodec)
+        self.assertIsInstance(get_codec('json'), JSONCodec)
+        self.assertIn(get_codec('auto').name, ('json', 'orjson', 'ujson'))
+        custom = JSONCodec()
+        self.assertIs(get_codec(custom), custom)
+        with self.assertRaises(ValueError):
+            get_codec('yaml')
+
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson_codec(self):
+        codec = get_codec('orjson')
+        data = {'result': [{'number': 'INC0000001', 'short_description': 'Não consigo acessar'}]}
+        self.assertEqual(codec.loads(codec.dumps(data)), data)
+        self.assertEqual(codec.loads(JSONCodec().dumps(data)), data)
+
+
+    def test_compress(self):
+        self.assertEqual(gzip.decompress(compress('{"a":1}')), b'{"a":1}')
+        self.assertEqual(accept_encoding(False), 'identity')
+        self.assertIn('gzip', accept_encoding())
+
+
+class TestCompression(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+
+
+    def test_compressed_responses(self):
+        responses = []
+        with Client(self.mock_instance_url, 'user', 'pwd') as sn_client:
+            sn_client.session.hooks['response'].append(lambda r, *args, **kwargs: responses.append(r))
+            records = sn_client.table('incident').get(page_size=50)
+        self.assertEqual(responses[0].headers.get('Content-Encoding'), 'gzip')
+
+        responses = []
+        with Client(self.mock_instance_url, 'user', 'pwd', compression=False) as sn_client:
+            sn_client.session.hooks['response'].append(lambda r, *args, **kwargs: responses.append(r))
+            self.assertEqual(sn_client.table('incident').get(page_size=50), records)
+        self.assertIsNone(responses[0].headers.get('Content-Encoding'))
+
+
+    def test_compressed_requests(self):
+        requests_sent = []
+        with Client(self.mock_instance_url, 'user', 'pwd', codec='auto', compress_requests=100) as sn_client:
+            sn_client.session.hooks['response'].append(lambda r, *args, **kwargs: requests_sent.append(r.request))
+            inc_table = sn_client.table('incident')
+            small = inc_table.post({'short_description': 'Short'})
+            large = inc_table.post({'short_description': 'Long' * 100})
+
+        self.assertEqual(small['short_description'], 'Short')
+        self.assertEqual(large['short_description'], 'Long' * 100)
+        self.assertNotIn('Content-Encoding', requests_sent[0].headers)
+        self.assertEqual(requests_sent[1].headers['Content-Encoding'], 'gzip')
+        self.assertEqual(requests_sent[1].headers['Content-Type'], 'application/json')
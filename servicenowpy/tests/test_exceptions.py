@@ -1,6 +1,7 @@
 import unittest
 
 from servicenowpy import StatusCodeError
+from servicenowpy.transport import Response
     
 class TestExceptions(unittest.TestCase):
     def test_status_code_error_exception(self):
@@ -10,3 +11,31 @@ class TestExceptions(unittest.TestCase):
             self.assertEqual(e.message, 'Testing')
             self.assertEqual(e.detail, 'Testing if it raises right')
             self.assertEqual(e.status, 404)
+
+    def test_status_code_error_from_data(self):
+        data = {"error": {"message": "Invalid table badtable", "detail": None}, "status": "failure"}
+        e = StatusCodeError.from_data(data, 400)
+        self.assertEqual(e.message, 'Invalid table badtable')
+        self.assertIsNone(e.detail)
+        self.assertEqual(e.status, 400)
+
+    def test_status_code_error_from_data_without_error(self):
+        e = StatusCodeError.from_data(None, 502)
+        self.assertIsNone(e.message)
+        self.assertEqual(e.status, 502)
+
+    def test_status_code_error_from_response(self):
+        body = b'{"error": {"message": "No Record found", "detail": "ACL"}, "status": "failure"}'
+        e = StatusCodeError.from_response(Response(404, content=body))
+        self.assertEqual(e.message, 'No Record found')
+        self.assertEqual(e.detail, 'ACL')
+        self.assertEqual(e.status, 404)
+
+    def test_status_code_error_from_response_not_json(self):
+        e = StatusCodeError.from_response(Response(502, content=b'<html>Bad Gateway</html>'))
+        self.assertEqual(e.message, '<html>Bad Gateway</html>')
+        self.assertEqual(e.status, 502)
+
+        e = StatusCodeError.from_response(Response(429, content=b''))
+        self.assertIsNone(e.message)
+        self.assertEqual(e.status, 429)
@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from unittest import skipIf
+
+from datetime import date, datetime, timedelta, timezone
+
+from servicenowpy import Client
+from servicenowpy.export import export_records
+from servicenowpy.schema import Reference
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+RECORDS = [
+    {"number": "INC0000060", "state": "7", "assigned_to": {"link": "https://mock/sys_user/1", "value": "1"}},
+    {"number": "INC0000009", "state": "1", "assigned_to": ""},
+    {"number": "INC0009005", "state": "2", "assigned_to": {"link": "https://mock/sys_user/2", "value": "2"}}
+]
+
+TYPED_RECORDS = [
+    {
+        "number": "INC0000060", "opened_at": datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc),
+        "due": date(2024, 5, 2), "time_worked": timedelta(minutes=90),
+        "assigned_to": Reference("sys_user", "1"), "priority": 1, "active": True
+    },
+    {
+        "number": "INC0000009", "opened_at": None, "due": None, "time_worked": None,
+        "assigned_to": None, "priority": 3, "active": False
+    }
+]
+
+
+class TestExportRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+    def test_ndjson(self):
+        file = io.StringIO()
+        count = export_records(RECORDS, file, 'ndjson', batch_size=2)
+        self.assertEqual(count, 3)
+        self.assertEqual([json.loads(line) for line in file.getvalue().splitlines()], RECORDS)
+
+
+    def test_csv(self):
+        file = io.StringIO(newline='')
+        export_records(iter(RECORDS), file, 'csv', batch_size=2)
+        rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], {"number": "INC0000060", "state": "7", "assigned_to": "1"})
+
+
+    def test_csv_fields(self):
+        path = os.path.join(self.tmp_dir.name, 'incident.csv')
+        export_records(RECORDS, path, 'csv', fields=['number'])
+        with open(path, newline='') as f:
+            self.assertEqual(f.read().split(), ['number', 'INC0000060', 'INC0000009', 'INC0009005'])
+
+
+    def test_typed_ndjson(self):
+        file = io.StringIO()
+        export_records(TYPED_RECORDS, file, 'ndjson')
+        first = json.loads(file.getvalue().splitlines()[0])
+        self.assertEqual(first['opened_at'], '2024-05-01T08:30:00+00:00')
+        self.assertEqual(first['due'], '2024-05-02')
+        self.assertEqual(first['time_worked'], 5400.0)
+        self.assertEqual(first['assigned_to'], '1')
+        self.assertEqual((first['priority'], first['active']), (1, True))
+
+
+    def test_typed_csv(self):
+        file = io.StringIO(newline='')
+        export_records(TYPED_RECORDS, file, 'csv')
+        rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+        self.assertEqual(rows[0]['opened_at'], '2024-05-01T08:30:00+00:00')
+        self.assertEqual(rows[0]['assigned_to'], '1')
+        self.assertEqual(rows[1]['assigned_to'], '')
+
+
+    @skipIf(pyarrow is None, 'pyarrow is not installed.')
+    def test_typed_parquet(self):
+        path = os.path.join(self.tmp_dir.name, 'incident.parquet')
+        export_records(TYPED_RECORDS, path, 'parquet')
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.schema.field('assigned_to').type, pyarrow.string())
+        self.assertTrue(pyarrow.types.is_timestamp(table.schema.field('opened_at').type))
+        self.assertEqual(table.to_pylist()[0]['assigned_to'], '1')
+
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            export_records(RECORDS, io.StringIO(), 'xlsx')
+
+
+    @skipIf(pyarrow is None, 'pyarrow is not installed.')
+    def test_parquet(self):
+        path = os.path.join(self.tmp_dir.name, 'incident.parquet')
+        count = export_records(RECORDS, path, 'parquet', batch_size=2)
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(
+            parquet_file.read().to_pylist()[0],
+            {"number": "INC0000060", "state": "7", "assigned_to": "1"}
+        )
+
+
+    @skipIf(pyarrow is None, 'pyarrow is not installed.')
+    def test_arrow(self):
+        path = os.path.join(self.tmp_dir.name, 'incident.arrow')
+        export_records(RECORDS, path, 'arrow', batch_size=2)
+        with pyarrow.ipc.open_file(path) as reader:
+            self.assertEqual(reader.num_record_batches, 2)
+            self.assertEqual(reader.read_all().num_rows, 3)
+
+
+    @skipIf(pyarrow is None, 'pyarrow is not installed.')
+    def test_parquet_empty(self):
+        path = os.path.join(self.tmp_dir.name, 'incident.parquet')
+        export_records([], path, 'parquet', fields=['number'])
+        self.assertEqual(pyarrow.parquet.read_table(path).column_names, ['number'])
+
+
+class TestTableExport(unittest.TestCase):
+
+    def test_export_typed(self):
+        inc_table = Client(os.environ['SERVICENOWPY_MOCK_API_URL'], 'user', 'pwd').table('incident')
+        file = io.StringIO()
+        fields = ['sys_id', 'number', 'opened_at', 'priority', 'assigned_to']
+        count = inc_table.export(file, 'ndjson', typed=True, sysparm_fields=fields)
+
+        records = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual(count, len(records))
+        self.assertEqual(list(records[0]), fields)
+        self.assertIsInstance(records[0]['priority'], int)
+        raw = {r['sys_id']: r for r in inc_table.get(sysparm_fields='sys_id,opened_at,assigned_to')}
+        for record in records:
+            expected = raw[record['sys_id']]
+            self.assertEqual(record['opened_at'][:19], expected['opened_at'].replace(' ', 'T'))
+            self.assertEqual(record['assigned_to'], expected['assigned_to']['value'] if expected['assigned_to'] else None)
+
+
+    def test_export(self):
+        inc_table = Client(os.environ['SERVICENOWPY_MOCK_API_URL'], 'user', 'pwd').table('incident')
+        file = io.StringIO()
+        count = inc_table.export(file, 'ndjson', sysparm_fields='number,assignment_group')
+
+        lines = file.getvalue().splitlines()
+        self.assertEqual(count, len(lines))
+        self.assertEqual(list(json.loads(lines[0])), ['number', 'assignment_group'])
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import unittest
+
+from servicenowpy import Client, Extraction
+
+
+class PageError(Exception):
+    pass
+
+
+class TestExtraction(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        cls.sn_client = Client(cls.mock_instance_url, 'user', 'pwd')
+        cls.inc_table = cls.sn_client.table('incident')
+        cls.expected = cls.inc_table.get(sysparm_fields='number,sys_id', sysparm_query='ORDERBYsys_id')
+
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'incident.ndjson')
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def read_lines(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+
+    def test_extract(self):
+        count = self.inc_table.extract(self.path, page_size=30, sysparm_fields='number')
+        self.assertEqual(count, len(self.expected))
+        self.assertEqual(self.read_lines(), self.expected)
+
+        extraction = Extraction(self.inc_table, self.path, page_size=30, sysparm_fields='number')
+        self.assertTrue(extraction.done)
+        self.assertEqual(extraction.run(), count)
+        self.assertEqual(list(extraction.records()), self.expected)
+
+
+    def test_resume(self):
+        delivered = []
+
+        def fail_on_second_page(page):
+            delivered.append(page)
+            if len(delivered) == 2:
+                raise PageError()
+
+        extraction = Extraction(self.inc_table, self.path, page_size=20, sysparm_fields='number')
+        with self.assertRaises(PageError):
+            extraction.run(fail_on_second_page)
+        self.assertEqual(extraction.state['records'], 20)
+        self.assertFalse(extraction.done)
+        # The second page was written, but not checkpointed
+        self.assertEqual(len(self.read_lines()), 40)
+        self.assertEqual(list(extraction.records()), self.expected[:20])
+
+        # A partial line left by a crash while writing
+        with open(self.path, 'a') as f:
+            f.write('{"number": "INC')
+
+        resumed = []
+        self.assertEqual(extraction.run(resumed.append), len(self.expected))
+        self.assertEqual(self.read_lines(), self.expected)
+        # At least once: the page that was not checkpointed is delivered again
+        self.assertEqual(resumed[0], delivered[1])
+
+
+    def test_ordered_pages_only(self):
+        with self.assertRaises(ValueError):
+            Extraction(self.inc_table, self.path, page_size=10, workers=4)
+        with self.assertRaises(ValueError):
+            self.inc_table.extract(self.path, pagination='offset')
+        with self.assertRaises(ValueError):
+            self.inc_table.extract(self.path, typed=True)
+        self.assertFalse(os.path.exists(self.path))
+
+
+    def test_other_extraction(self):
+        Extraction(self.inc_table, self.path, page_size=50).run()
+        other = Extraction(self.inc_table, self.path, page_size=50, sysparm_query='active=true')
+        with self.assertRaises(ValueError):
+            other.run()
+        other.reset()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertGreater(other.run(), 0)
+
+
+    def test_records_deduplicated(self):
+        extraction = Extraction(self.inc_table, self.path, page_size=50, sysparm_fields='number')
+        extraction.run()
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(content + content)
+        state = extraction.state
+        state['offset'] *= 2
+        extraction._save(state)
+        self.assertEqual(list(extraction.records()), self.expected)
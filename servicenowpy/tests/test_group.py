@@ -0,0 +1,70 @@
+import os
+import threading
+import unittest
+
+import requests
+
+from servicenowpy import Client, ClientGroup
+
+
+class TestClientGroup(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        cls.instances = {
+            'acme': (cls.mock_instance_url, 'user', 'pwd'),
+            'globex': (cls.mock_instance_url, 'user', 'pwd'),
+            # Nothing listens on the discard port, so its requests fail at once
+            'broken': ('http://127.0.0.1:9', 'user', 'pwd'),
+        }
+
+
+    def test_from_instances(self):
+        with ClientGroup.from_instances(self.instances, max_concurrency=2) as group:
+            self.assertEqual(len(group), 3)
+            self.assertIsInstance(group.clients['acme'], Client)
+        group = ClientGroup([Client(self.mock_instance_url, 'user', 'pwd')])
+        self.assertEqual(list(group.clients), [f'{self.mock_instance_url}/api/now/'])
+
+
+    def test_get(self):
+        expected = Client(self.mock_instance_url, 'user', 'pwd').table('incident').get(sysparm_fields='number')
+        with ClientGroup.from_instances(self.instances) as group:
+            results = group.get('incident', sysparm_fields='number')
+            counts = group.count('incident')
+
+        self.assertEqual(results['acme'], expected)
+        self.assertEqual(results['globex'], expected)
+        self.assertIsInstance(results['broken'], requests.ConnectionError)
+        self.assertEqual(counts['acme'], len(expected))
+
+
+    def test_iter_records(self):
+        with ClientGroup.from_instances(self.instances) as group:
+            items = list(group.iter_records('incident', sysparm_fields='number', page_size=20))
+
+        records = [(name, r) for name, r in items if name != 'broken']
+        errors = [r for name, r in items if name == 'broken']
+        total = Client(self.mock_instance_url, 'user', 'pwd').table('incident').count()
+        self.assertEqual(len(records), total * 2)
+        self.assertEqual(len([r for name, r in records if name == 'acme']), total)
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], requests.ConnectionError)
+
+
+    def test_timeout(self):
+        release = threading.Event()
+
+        def count(client):
+            if client is group.clients['broken']:
+                release.wait(10)
+            return client.table('incident').count()
+
+        group = ClientGroup.from_instances(self.instances)
+        try:
+            results = group.map(count, timeout=1)
+        finally:
+            release.set()
+        self.assertIsInstance(results['acme'], int)
+        self.assertIsInstance(results['broken'], TimeoutError)
@@ -0,0 +1,96 @@
+import os
+import unittest
+
+from servicenowpy import Client, DecodeEvent, OpenTelemetryHook, RequestEvent, StatusCodeError, Stats
+from servicenowpy.metrics import percentiles, table_from_url
+
+
+class RecordingSpan:
+    def __init__(self, name, start_time, attributes):
+        self.name = name
+        self.start_time = start_time
+        self.attributes = attributes
+        self.end_time = None
+        self.exceptions = []
+
+    def record_exception(self, exception):
+        self.exceptions.append(exception)
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, start_time=None, attributes=None):
+        span = RecordingSpan(name, start_time, attributes)
+        self.spans.append(span)
+        return span
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_percentiles(self):
+        result = percentiles(list(range(1, 101)))
+        self.assertEqual(result['p50'], 51)
+        self.assertEqual(result['p95'], 95)
+        self.assertEqual(result['p99'], 99)
+        self.assertIsNone(percentiles([]))
+
+
+    def test_table_from_url(self):
+        self.assertEqual(table_from_url('https://mock/api/now/table/incident?sysparm_limit=1'), 'incident')
+        self.assertEqual(table_from_url('https://mock/api/now/v2/table/incident/abc'), 'incident')
+        self.assertEqual(table_from_url('https://mock/api/now/v1/batch'), 'batch')
+
+
+    def test_stats(self):
+        stats = Stats(window=10)
+        for n in range(20):
+            stats(RequestEvent('GET', 'url', 'incident', 200, n / 100, bytes_received=100, retries=n % 2))
+        stats(RequestEvent('GET', 'url', 'incident', 429, 0.5))
+        stats(DecodeEvent('GET', 'incident', 0.01, 500, 100))
+
+        summary = stats.get('incident', 'GET')
+        self.assertEqual(summary['requests'], 21)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['retries'], 10)
+        self.assertEqual(summary['statuses'], {200: 20, 429: 1})
+        self.assertEqual(summary['bytes_received'], 2000)
+        self.assertEqual((summary['pages'], summary['records']), (1, 500))
+        self.assertEqual(summary['latency']['p99'], 0.5)
+        self.assertIn('GET incident', stats.summary())
+
+        stats.reset()
+        self.assertIsNone(stats.get('incident', 'GET'))
+
+
+    def test_opentelemetry_hook(self):
+        tracer = RecordingTracer()
+        hook = OpenTelemetryHook(tracer)
+        error = StatusCodeError('Invalid table', None, 400)
+        hook(RequestEvent('GET', 'url', 'incident', 400, 0.25, error=error))
+
+        span = tracer.spans[0]
+        self.assertEqual(span.name, 'GET incident')
+        self.assertEqual(span.attributes['http.status_code'], 400)
+        self.assertEqual(span.end_time - span.start_time, 250000000)
+        self.assertEqual(span.exceptions, [error])
+
+
+class TestClientHooks(unittest.TestCase):
+
+    def test_hooks(self):
+        stats = Stats()
+        events = []
+        sn_client = Client(os.environ['SERVICENOWPY_MOCK_API_URL'], 'user', 'pwd', hooks=[stats, events.append])
+        records = sn_client.table('incident').get()
+
+        self.assertEqual([event.kind for event in events], ['request', 'decode'])
+        self.assertEqual(events[0].status, 200)
+        self.assertGreater(events[0].bytes_received, 0)
+        self.assertGreaterEqual(events[0].elapsed, events[0].ttfb)
+        self.assertEqual(events[1].records, len(records))
+        self.assertEqual(stats.get('incident', 'GET')['pages'], 1)
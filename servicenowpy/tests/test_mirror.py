@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from servicenowpy import Client, TableMirror
+
+
+class TestTableMirror(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        cls.sn_client = Client(cls.mock_instance_url, 'user', 'pwd')
+
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'mirror.db')
+
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+    def test_make_query_first_sync(self):
+        with TableMirror(self.sn_client.table('incident'), self.path) as mirror:
+            self.assertEqual(mirror.make_query(), 'ORDERBYsys_updated_on^ORDERBYsys_id')
+            self.assertEqual(mirror.make_query('active=true'), 'active=true^ORDERBYsys_updated_on^ORDERBYsys_id')
+
+
+    def test_make_query_delta_sync(self):
+        with TableMirror(self.sn_client.table('incident'), self.path) as mirror:
+            query = mirror.make_query('active=true', '2021-09-17 02:08:50', 'abc')
+            self.assertEqual(
+                query,
+                'active=true^sys_updated_on>2021-09-17 02:08:50'
+                '^NQactive=true^sys_updated_on=2021-09-17 02:08:50^sys_id>abc'
+                '^ORDERBYsys_updated_on^ORDERBYsys_id'
+            )
+
+
+    def test_invalid_table_name(self):
+        with self.assertRaises(ValueError):
+            TableMirror(self.sn_client.table('incident"; DROP'), self.path)
+
+
+    def test_sync_to(self):
+        inc_table = self.sn_client.table('incident')
+        records = inc_table.get()
+
+        with inc_table.sync_to(self.path) as mirror:
+            self.assertEqual(len(mirror), len(records))
+            self.assertEqual(mirror.get(records[0]['sys_id']), records[0])
+            self.assertEqual(mirror.cursor[0], records[-1]['sys_updated_on'])
+
+        with TableMirror(inc_table, self.path) as mirror:
+            self.assertEqual(mirror.sync(), 0)
+            self.assertEqual(len(mirror), len(records))
+
+
+    def test_select(self):
+        inc_table = self.sn_client.table('incident')
+        number = inc_table.get()[0]['number']
+
+        with inc_table.sync_to(self.path) as mirror:
+            selected = list(mirror.select("json_extract(data, '$.number') = ?", (number,)))
+            self.assertEqual(selected[0]['number'], number)
+            mirror.reset()
+            self.assertEqual(len(mirror), 0)
+            self.assertEqual(mirror.cursor, (None, None))
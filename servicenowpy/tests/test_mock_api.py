@@ -1,7 +1,9 @@
 import os
 import unittest
 
-from servicenowpy import Client
+import requests
+
+from servicenowpy import Client, StatusCodeError
 
 
 class TestMockAPI(unittest.TestCase):
@@ -21,3 +23,93 @@ class TestMockAPI(unittest.TestCase):
         )
         self.assertTrue(response.ok)
         self.assertIsInstance(response.content, type(b''))
+
+
+    def test_pagination_headers(self):
+        mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        response = requests.get(f'{mock_instance_url}/api/now/table/incident?sysparm_limit=10')
+
+        total = int(response.headers['X-Total-Count'])
+        self.assertEqual(len(response.json()['result']), 10)
+        self.assertIn('rel="next"', response.headers['Link'])
+        self.assertEqual(
+            len(Client(mock_instance_url, 'user', 'pwd').table('incident').get(page_size=10)),
+            total
+        )
+
+
+    def test_query(self):
+        mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        inc_table = Client(mock_instance_url, 'user', 'pwd').table('incident')
+
+        result = inc_table.get(sysparm_query='active=true^priorityIN1,2^ORDERBYDESCsys_id', sysparm_fields='sys_id,active,priority')
+        self.assertTrue(result)
+        self.assertTrue(all(r['active'] == 'true' and r['priority'] in ('1', '2') for r in result))
+        self.assertEqual([r['sys_id'] for r in result], sorted((r['sys_id'] for r in result), reverse=True))
+
+        ordered = inc_table.get(sysparm_query='ORDERBYsys_id', page_size=10, sysparm_fields='sys_id')
+        after = inc_table.get(sysparm_query=f'sys_id>{ordered[1]["sys_id"]}^ORDERBYsys_id', page_size=10, sysparm_fields='sys_id')
+        self.assertEqual(after, ordered[2:])
+
+
+    def test_record_not_found(self):
+        inc_table = Client(os.environ['SERVICENOWPY_MOCK_API_URL'], 'user', 'pwd').table('incident')
+        with self.assertRaises(StatusCodeError) as cm:
+            inc_table.get_record('f' * 32)
+        self.assertEqual(cm.exception.status, 404)
+
+
+    def test_metadata_tables(self):
+        mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        sn_client = Client(mock_instance_url, 'user', 'pwd')
+
+        tables = sn_client.table('sys_db_object').get(sysparm_fields='name,super_class.name')
+        self.assertIn({'name': 'incident', 'super_class.name': 'task'}, tables)
+        self.assertIn({'name': 'sys_user', 'super_class.name': ''}, tables)
+
+        fields = sn_client.table('sys_dictionary').get(
+            sysparm_query='name=task^elementISNOTEMPTY', sysparm_fields='element'
+        )
+        sample = next(sn_client.table('task').iter_records(page_size=1))
+        self.assertEqual({f['element'] for f in fields}, set(sample))
+
+
+    def test_stats(self):
+        mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        total = len(Client(mock_instance_url, 'user', 'pwd').table('incident').get(sysparm_query='active=true'))
+        response = requests.get(f'{mock_instance_url}/api/now/stats/incident?sysparm_count=true&sysparm_query=active=true')
+        self.assertEqual(response.json()['result']['stats']['count'], str(total))
+
+        response = requests.get(f'{mock_instance_url}/api/now/stats/incident?sysparm_count=true&sysparm_group_by=active')
+        counts = {r['groupby_fields'][0]['value']: r['stats']['count'] for r in response.json()['result']}
+        self.assertEqual(counts['true'], str(total))
+
+
+    def test_batch(self):
+        inc_table = Client(os.environ['SERVICENOWPY_MOCK_API_URL'], 'user', 'pwd').table('incident')
+        results = inc_table.bulk_patch({
+            '1c741bd70b2322007518478d83673af3': {"state": "2"},
+            'f' * 32: {"state": "2"}
+        })
+        self.assertEqual(results[0]['state'], '2')
+        self.assertIsInstance(results[1], StatusCodeError)
+
+
+    def test_import_set(self):
+        mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        response = requests.post(f'{mock_instance_url}/api/now/import/u_imp_incident', json={"short_description": "Imported"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['result'][0]['status'], 'inserted')
+        self.assertEqual(response.json()['result'][0]['table'], 'incident')
+
+
+    def test_rate_limit(self):
+        mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        config = requests.get(f'{mock_instance_url}/mock/config').json()
+        requests.put(f'{mock_instance_url}/mock/config', json={"rate_limit": 1, "rate_burst": 1})
+        try:
+            statuses = [requests.get(f'{mock_instance_url}/api/now/table/incident?sysparm_limit=1').status_code for _ in range(3)]
+        finally:
+            requests.put(f'{mock_instance_url}/mock/config', json={k: config[k] for k in ('rate_limit', 'rate_burst')})
+        self.assertEqual(statuses[0], 200)
+        self.assertIn(429, statuses)
@@ -0,0 +1,58 @@
+import unittest
+
+from servicenowpy.pagination import key_ranges, keyset_query, ordered_query
+
+
+class TestKeysetQuery(unittest.TestCase):
+
+    def test_without_query(self):
+        self.assertEqual(keyset_query('', 'sys_id'), 'ORDERBYsys_id')
+        self.assertEqual(keyset_query(None, 'sys_id', 'abc'), 'sys_id>abc^ORDERBYsys_id')
+
+
+    def test_range(self):
+        self.assertEqual(
+            keyset_query('active=true', 'number', 'INC0000001', 'INC0000100'),
+            'active=true^number>INC0000001^number<=INC0000100^ORDERBYnumber'
+        )
+
+
+    def test_conditions_in_every_group(self):
+        self.assertEqual(
+            keyset_query('active=true^NQpriority=1', 'sys_id', 'abc'),
+            'active=true^sys_id>abc^NQpriority=1^sys_id>abc^ORDERBYsys_id'
+        )
+
+
+    def test_order_by_not_allowed(self):
+        with self.assertRaises(ValueError):
+            keyset_query('active=true^ORDERBYnumber', 'sys_id')
+
+
+class TestOrderedQuery(unittest.TestCase):
+
+    def test_order_by_added(self):
+        self.assertEqual(ordered_query(None), 'ORDERBYsys_id')
+        self.assertEqual(ordered_query('active=true^NQpriority=1'), 'active=true^NQpriority=1^ORDERBYsys_id')
+
+
+    def test_order_by_kept(self):
+        self.assertEqual(ordered_query('active=true^ORDERBYnumber'), 'active=true^ORDERBYnumber')
+        self.assertEqual(ordered_query('ORDERBYDESCnumber', 'number'), 'ORDERBYDESCnumber')
+
+
+class TestKeyRanges(unittest.TestCase):
+
+    def test_ranges_cover_sys_id_space(self):
+        ranges = key_ranges(4)
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(ranges[0], (None, '4' + '0' * 31))
+        self.assertEqual(ranges[-1], ('c' + '0' * 31, None))
+        for (_, upto), (after, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(upto, after)
+
+
+    def test_start_after(self):
+        start_after = '8' + '1' * 31
+        ranges = key_ranges(4, start_after)
+        self.assertEqual(ranges, [(start_after, 'c' + '0' * 31), ('c' + '0' * 31, None)])
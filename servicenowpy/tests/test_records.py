@@ -0,0 +1,95 @@
+import copy
+import os
+import pickle
+import unittest
+
+from servicenowpy import Client, RecordSet, Row
+
+
+RECORDS = [
+    {"number": "INC0000060", "state": "7", "assigned_to": {"link": "https://mock/sys_user/1", "value": "1"}},
+    {"number": "INC0000009", "state": "1", "assigned_to": ""},
+    {"number": "INC0009005", "state": None, "priority": "1"}
+]
+
+
+class TestRecordSet(unittest.TestCase):
+
+    def setUp(self):
+        self.records = RecordSet(RECORDS)
+
+
+    def test_shared_fields(self):
+        self.assertEqual(self.records.fields, ['number', 'state', 'assigned_to', 'priority'])
+        self.assertEqual(len(self.records), 3)
+        self.assertEqual(self.records.rows[0], ("INC0000060", "7", RECORDS[0]["assigned_to"]))
+
+
+    def test_row_access(self):
+        row = self.records[0]
+        self.assertIsInstance(row, Row)
+        self.assertEqual(row['number'], 'INC0000060')
+        self.assertEqual(row.state, '7')
+        self.assertEqual(row.get('priority', '4'), '4')
+        self.assertNotIn('priority', row)
+        with self.assertRaises(KeyError):
+            row['priority']
+        with self.assertRaises(AttributeError):
+            row.priority
+
+
+    def test_copy_row(self):
+        row = self.records[1]
+        for duplicate in (copy.copy(row), copy.deepcopy(row), pickle.loads(pickle.dumps(row))):
+            self.assertEqual(duplicate.to_dict(), RECORDS[1])
+            self.assertNotIn('priority', duplicate)
+        with self.assertRaises(AttributeError):
+            row._missing
+
+
+    def test_missing_is_not_none(self):
+        row = self.records[2]
+        self.assertIsNone(row['state'])
+        self.assertNotIn('assigned_to', row)
+
+
+    def test_to_dicts(self):
+        self.assertEqual(self.records.to_dicts(), RECORDS)
+        self.assertEqual(list(self.records), RECORDS)
+
+
+    def test_column(self):
+        self.assertEqual(self.records.column('priority'), [None, None, '1'])
+
+
+    def test_slice(self):
+        subset = self.records[1:]
+        self.assertIsInstance(subset, RecordSet)
+        self.assertEqual(subset.to_dicts(), RECORDS[1:])
+
+
+    def test_slice_fields_are_copied(self):
+        subset = self.records[:1]
+        subset.extend([{"number": "INC0000010", "impact": "2"}])
+        self.assertIn('impact', subset.fields)
+        self.assertNotIn('impact', self.records.fields)
+        self.assertEqual(self.records.to_dicts(), RECORDS)
+        self.assertEqual(subset[1]['impact'], '2')
+
+
+class TestTableCompact(unittest.TestCase):
+
+    def test_get_compact(self):
+        inc_table = Client(os.environ['SERVICENOWPY_MOCK_API_URL'], 'user', 'pwd').table('incident')
+        fields = 'number,assignment_group'
+        result = inc_table.get(record_type='compact', sysparm_fields=fields)
+
+        self.assertIsInstance(result, RecordSet)
+        self.assertEqual(result.fields, fields.split(','))
+        self.assertEqual(result.to_dicts(), inc_table.get(sysparm_fields=fields))
+
+
+    def test_get_invalid_record_type(self):
+        inc_table = Client('instance_url', 'user', 'pwd').table('incident')
+        with self.assertRaises(ValueError):
+            inc_table.get(record_type='tuple')
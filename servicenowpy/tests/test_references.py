@@ -0,0 +1,71 @@
+import os
+import unittest
+
+from servicenowpy import Client, ReferenceResolver
+from servicenowpy.references import table_from_link
+
+
+class TestReferenceResolver(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+        cls.sn_client = Client(cls.mock_instance_url, 'user', 'pwd')
+
+
+    def test_table_from_link(self):
+        self.assertEqual(table_from_link('https://dev.service-now.com/api/now/table/sys_user/6816f79c'), 'sys_user')
+        self.assertEqual(table_from_link('https://dev.service-now.com/api/now/v2/table/cmdb_ci/a1b2'), 'cmdb_ci')
+        self.assertIsNone(table_from_link('https://dev.service-now.com/'))
+
+
+    def test_invalid_path(self):
+        with self.assertRaises(ValueError):
+            ReferenceResolver(self.sn_client, ['assigned_to'])
+
+
+    def test_resolve_matches_dot_walk(self):
+        paths = ['assigned_to.name', 'assigned_to.company.name', 'cmdb_ci.name']
+        inc_table = self.sn_client.table('incident')
+        expected = inc_table.get(sysparm_fields='sys_id,' + ','.join(paths), sysparm_query='ORDERBYsys_id')
+
+        resolver = ReferenceResolver(self.sn_client, paths)
+        result = inc_table.get(
+            sysparm_fields='sys_id', sysparm_query='ORDERBYsys_id', page_size=25, resolve=resolver
+        )
+
+        self.assertEqual(result, expected)
+
+
+    def test_cache_is_shared(self):
+        events = []
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd', hooks=[events.append])
+        resolver = ReferenceResolver(sn_client, ['assigned_to.name'])
+        inc_table = sn_client.table('incident')
+        inc_table.get(sysparm_fields='number', resolve=resolver)
+        misses = resolver.misses
+
+        del events[:]
+        inc_table.get(sysparm_fields='number', resolve=resolver)
+        self.assertEqual(resolver.misses, misses)
+        self.assertFalse([e for e in events if e.kind == 'request' and '/sys_user' in e.url])
+
+        resolver.clear()
+        inc_table.get(sysparm_fields='number', resolve=resolver)
+        self.assertEqual(resolver.misses, misses * 2)
+
+
+    def test_missing_reference(self):
+        records = [
+            {'assigned_to': ''},
+            {'assigned_to': {'link': f'{self.mock_instance_url}/api/now/table/sys_user/{"f" * 32}', 'value': 'f' * 32}}
+        ]
+        resolver = ReferenceResolver(self.sn_client, ['assigned_to.name'])
+        resolver.resolve(records)
+        self.assertEqual([r['assigned_to.name'] for r in records], ['', ''])
+
+
+    def test_resolve_with_stream(self):
+        inc_table = self.sn_client.table('incident')
+        with self.assertRaises(ValueError):
+            list(inc_table.iter_records(stream=True, resolve=['assigned_to.name']))
@@ -0,0 +1,149 @@
+import io
+import threading
+import time
+import unittest
+
+import requests
+
+from servicenowpy import Client, MemoryTransport, RequestScheduler, StatusCodeError
+from servicenowpy.scheduler import retry_after
+from servicenowpy.transport import Response
+
+
+def make_response(status, headers=None):
+    response = requests.models.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b'{}'
+    response.raw = io.BytesIO(b'{}')
+    return response
+
+
+class FakeServer:
+    """Returns the given responses, in order, counting the calls."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+
+class TestRequestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = RequestScheduler(backoff_factor=0.001, max_backoff=0.01)
+
+
+    def test_success(self):
+        server = FakeServer(make_response(200))
+        response = self.scheduler.send(server, 'GET')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.scheduler.retries, 0)
+
+
+    def test_retries_throttled_requests(self):
+        server = FakeServer(make_response(429, {'Retry-After': '0'}), make_response(201))
+        response = self.scheduler.send(server, 'POST')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(server.calls, 2)
+        self.assertEqual(self.scheduler.throttled, 1)
+
+
+    def test_retries_server_errors_of_idempotent_methods(self):
+        server = FakeServer(make_response(503), make_response(200))
+        self.assertEqual(self.scheduler.send(server, 'GET').status_code, 200)
+
+        server = FakeServer(make_response(503), make_response(201))
+        self.assertEqual(self.scheduler.send(server, 'POST').status_code, 503)
+
+
+    def test_retries_connection_errors(self):
+        server = FakeServer(requests.ConnectionError(), make_response(200))
+        self.assertEqual(self.scheduler.send(server, 'DELETE').status_code, 200)
+
+        server = FakeServer(requests.ConnectionError())
+        with self.assertRaises(requests.ConnectionError):
+            self.scheduler.send(server, 'PATCH')
+
+
+    def test_other_errors_free_the_slot(self):
+        scheduler = RequestScheduler(min_concurrency=1, max_concurrency=1)
+        for error in (requests.exceptions.ChunkedEncodingError('Connection broken'), KeyboardInterrupt()):
+            with self.assertRaises(type(error)):
+                scheduler.send(FakeServer(error), 'GET')
+            self.assertEqual(scheduler.in_flight, 0)
+        self.assertEqual(scheduler.send(FakeServer(make_response(200)), 'GET').status_code, 200)
+
+
+    def test_max_retries(self):
+        scheduler = RequestScheduler(max_retries=2, backoff_factor=0.001)
+        server = FakeServer(*[make_response(502) for _ in range(3)])
+        self.assertEqual(scheduler.send(server, 'GET').status_code, 502)
+        self.assertEqual(server.calls, 3)
+
+
+    def test_additive_increase(self):
+        scheduler = RequestScheduler(initial_concurrency=2, max_concurrency=4)
+        for _ in range(20):
+            scheduler.acquire()
+            scheduler.release()
+        self.assertEqual(scheduler.concurrency, 4)
+
+
+    def test_multiplicative_decrease(self):
+        scheduler = RequestScheduler(initial_concurrency=16)
+        scheduler.acquire()
+        scheduler.release(congested=True)
+        self.assertEqual(scheduler.concurrency, 8)
+
+
+    def test_concurrency_limit(self):
+        scheduler = RequestScheduler(min_concurrency=2, max_concurrency=2)
+        lock = threading.Lock()
+        peak = in_flight = 0
+
+        def send():
+            nonlocal peak, in_flight
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return make_response(200)
+
+        threads = [threading.Thread(target=scheduler.send, args=(send, 'GET')) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak, 2)
+
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after(make_response(429, {'Retry-After': '3'})), 3.0)
+        self.assertEqual(retry_after(make_response(429, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})), 0.0)
+        self.assertIsNone(retry_after(make_response(429)))
+
+
+    def test_client_scheduler(self):
+        scheduler = RequestScheduler()
+        sn_client = Client('instance_url', 'user', 'pwd', scheduler=scheduler)
+        self.assertIs(sn_client.scheduler, scheduler)
+
+
+    def test_retries_exhausted_on_html_error(self):
+        transport = MemoryTransport(handler=lambda *args: Response(502, {'Content-Type': 'text/html'}, b'<h1>Bad Gateway</h1>'))
+        scheduler = RequestScheduler(max_retries=1, backoff_factor=0.001)
+        sn_client = Client('instance_url', 'user', 'pwd', scheduler=scheduler, transport=transport)
+        with self.assertRaises(StatusCodeError) as cm:
+            sn_client.table('incident').get()
+        self.assertEqual(cm.exception.status, 502)
+        self.assertEqual(cm.exception.message, '<h1>Bad Gateway</h1>')
+        self.assertEqual(len(transport.requests), 2)
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import time
+import unittest
+
+from datetime import date, datetime, timedelta, timezone
+
+from servicenowpy import Client, SchemaCache, TableSchema
+from servicenowpy.schema import Reference
+
+
+class TestTableSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = TableSchema(
+            'incident',
+            {
+                'number': 'string', 'opened_at': 'glide_date_time', 'due': 'glide_date',
+                'business_duration': 'glide_duration', 'priority': 'integer', 'score': 'decimal',
+                'active': 'boolean', 'assigned_to': 'reference'
+            },
+            {'assigned_to': 'sys_user'}
+        )
+
+
+    def test_decode(self):
+        records = [
+            {
+                'number': 'INC0000001', 'opened_at': '2021-09-17 02:08:50', 'due': '2021-09-20',
+                'business_duration': '1970-01-02 04:00:00', 'priority': '2', 'score': '1.5', 'active': 'true',
+                'assigned_to': {'link': 'https://dev.service-now.com/api/now/table/sys_user/abc', 'value': 'abc'}
+            },
+            {
+                'number': 'INC0000002', 'opened_at': '', 'due': '', 'business_duration': '',
+                'priority': '', 'score': '', 'active': 'false', 'assigned_to': ''
+            }
+        ]
+        self.assertIs(self.schema.decode(records), records)
+        self.assertEqual(records[0], {
+            'number': 'INC0000001',
+            'opened_at': datetime(2021, 9, 17, 2, 8, 50, tzinfo=timezone.utc),
+            'due': date(2021, 9, 20),
+            'business_duration': timedelta(days=1, hours=4),
+            'priority': 2,
+            'score': 1.5,
+            'active': True,
+            'assigned_to': Reference('sys_user', 'abc')
+        })
+        self.assertEqual(records[1], {
+            'number': 'INC0000002', 'opened_at': None, 'due': None, 'business_duration': None,
+            'priority': None, 'score': None, 'active': False, 'assigned_to': None
+        })
+
+
+    def test_decode_uneven_records(self):
+        records = [{'priority': '1', 'u_custom': 'x'}, {'number': 'INC0000001'}]
+        self.schema.decode(records)
+        self.assertEqual(records, [{'priority': 1, 'u_custom': 'x'}, {'number': 'INC0000001'}])
+
+
+    def test_projection(self):
+        self.assertEqual(self.schema.projection(['number', 'priority', 'number']), 'number,priority')
+        self.assertEqual(self.schema.projection('number,assigned_to.name'), 'number,assigned_to.name')
+        with self.assertRaises(ValueError):
+            self.schema.projection('number,u_missing')
+        with self.assertRaises(ValueError):
+            self.schema.projection('priority.name')
+
+
+class TestSchemaCache(unittest.TestCase):
+
+    def test_disk_cache(self):
+        schema = TableSchema('incident', {'priority': 'integer'})
+        with tempfile.TemporaryDirectory() as path:
+            SchemaCache(path).store('https://dev.service-now.com/api/now/', schema)
+
+            cached = SchemaCache(path).lookup('https://dev.service-now.com/api/now/', 'incident')
+            self.assertEqual(cached.fields, {'priority': 'integer'})
+            self.assertTrue(os.path.exists(os.path.join(path, 'dev.service-now.com', 'incident.json')))
+            self.assertIsNone(SchemaCache(path).lookup('https://other.service-now.com/api/now/', 'incident'))
+
+            cache = SchemaCache(path)
+            cache.clear()
+            self.assertIsNone(cache.lookup('https://dev.service-now.com/api/now/', 'incident'))
+
+
+    def test_ttl(self):
+        cache = SchemaCache(ttl=60)
+        cache.store('instance', TableSchema('incident', {}, fetched=time.time() - 61))
+        self.assertIsNone(cache.lookup('instance', 'incident'))
+        cache.store('instance', TableSchema('incident', {}))
+        self.assertIsNotNone(cache.lookup('instance', 'incident'))
+
+
+class TestSchemaDiscovery(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+
+
+    def test_discover(self):
+        events = []
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd', hooks=[events.append])
+        schema = sn_client.schema('incident')
+
+        # Fields inherited from task
+        self.assertEqual(schema.fields['opened_at'], 'glide_date_time')
+        self.assertEqual(schema.fields['priority'], 'integer')
+        self.assertEqual(schema.references['assigned_to'], 'sys_user')
+        self.assertNotIn('', schema.fields)
+
+        del events[:]
+        self.assertIs(sn_client.table('incident').schema(), schema)
+        self.assertEqual(events, [])
+        self.assertIsNot(sn_client.schema('incident', refresh=True), schema)
+
+
+    def test_unknown_table(self):
+        sn_client = Client(self.mock_instance_url, 'user', 'pwd')
+        with self.assertRaises(ValueError):
+            sn_client.schema('u_missing_table')
@@ -2,6 +2,8 @@ import json
 import os
 import unittest
 
+from unittest.mock import patch
+
 import requests
 
 from servicenowpy import Client, Table, StatusCodeError
@@ -37,6 +39,31 @@ class TestClient(unittest.TestCase):
         self.assertIsInstance(inc_table, Table)
 
 
+    def test_make_api_url_with_api_path(self):
+        api_url = self.sn_client.make_api_url('https://mock.service-now.com/api/now/')
+        expected = 'https://mock.service-now.com/api/now/'
+        self.assertEqual(api_url, expected)
+
+
+    def test_tables_share_session(self):
+        inc_table = self.sn_client.table('incident')
+        ritm_table = self.sn_client.table('sc_req_item')
+        self.assertIs(inc_table.client.session, ritm_table.client.session)
+
+
+    def test_pool_options(self):
+        sn_client = Client('instance_url', 'user', 'pwd', pool_maxsize=4, pool_block=True, timeout=(3, 30))
+        adapter = sn_client.session.get_adapter('https://instance_url')
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(sn_client.timeout, (3, 30))
+
+
+    def test_context_manager(self):
+        with Client('instance_url', 'user', 'pwd') as sn_client:
+            self.assertIsInstance(sn_client.session, requests.Session)
+
+
 class TestTable(unittest.TestCase):
 
     @classmethod
@@ -63,6 +90,82 @@ class TestTable(unittest.TestCase):
         )
 
 
+    def test_iter_pages(self):
+        inc_table = self.sn_client.table('incident')
+        pages = inc_table.iter_pages(page_size=10)
+        self.assertNotIsInstance(pages, list)
+        for page in pages:
+            self.assertIsInstance(page, list)
+
+
+    def test_iter_records(self):
+        inc_table = self.sn_client.table('incident')
+        records = list(inc_table.iter_records(sysparm_fields='number'))
+        self.assertEqual(records, inc_table.get(sysparm_fields='number'))
+
+
+    def test_iter_records_stream(self):
+        inc_table = self.sn_client.table('incident')
+        records = list(inc_table.iter_records(stream=True))
+        self.assertEqual(records, inc_table.get())
+
+
+    def test_get_parallel(self):
+        inc_table = self.sn_client.table('incident')
+        fields = 'number,sys_id'
+        result = inc_table.get(workers=4, page_size=10, sysparm_fields=fields)
+        self.assertEqual(result, inc_table.get(sysparm_query='ORDERBYsys_id', sysparm_fields=fields))
+
+
+    def test_get_keyset(self):
+        inc_table = self.sn_client.table('incident')
+        expected = inc_table.get(sysparm_query='active=true^ORDERBYsys_id', sysparm_fields='number')
+        pages = list(inc_table.iter_pages(
+            page_size=10, pagination='keyset', sysparm_query='active=true', sysparm_fields='number'
+        ))
+        self.assertTrue(all(len(page) <= 10 for page in pages))
+        self.assertEqual([record for page in pages for record in page], expected)
+
+
+    def test_get_keyset_start_after(self):
+        inc_table = self.sn_client.table('incident')
+        records = inc_table.get(sysparm_query='ORDERBYsys_id', sysparm_fields='sys_id')
+        cursor = records[9]['sys_id']
+        result = inc_table.get(page_size=10, pagination='keyset', start_after=cursor, sysparm_fields='sys_id')
+        self.assertEqual(result, records[10:])
+
+
+    def test_get_keyset_parallel(self):
+        inc_table = self.sn_client.table('incident')
+        records = inc_table.get(sysparm_query='ORDERBYsys_id', sysparm_fields='sys_id')
+        result = inc_table.get(workers=4, page_size=10, pagination='keyset', sysparm_fields='sys_id')
+        self.assertEqual(sorted(r['sys_id'] for r in result), [r['sys_id'] for r in records])
+
+
+    def test_invalid_pagination(self):
+        inc_table = self.sn_client.table('incident')
+        with self.assertRaises(ValueError):
+            inc_table.get(pagination='cursor')
+        with self.assertRaises(ValueError):
+            inc_table.get(workers=4, pagination='keyset', key='number')
+
+
+    def test_get_next_link(self):
+        inc_table = self.sn_client.table('incident')
+        response = requests.models.Response()
+        response.headers['Link'] = (
+            '<https://mock/api/now/table/incident?sysparm_offset=0>;rel="first",'
+            '<https://mock/api/now/table/incident?sysparm_offset=10>;rel="next",'
+            '<https://mock/api/now/table/incident?sysparm_offset=90>;rel="last"'
+        )
+        self.assertEqual(
+            inc_table.get_next_link(response),
+            'https://mock/api/now/table/incident?sysparm_offset=10'
+        )
+        del response.headers['Link']
+        self.assertIsNone(inc_table.get_next_link(response))
+
+
     def test_get_record(self):
         sys_id = '1c741bd70b2322007518478d83673af3'
         inc_table = self.sn_client.table('incident')
@@ -79,6 +182,76 @@ class TestTable(unittest.TestCase):
         self.assertEqual(result[0]['number'], number)
 
 
+    def test_get_records(self):
+        inc_table = self.sn_client.table('incident')
+        records = inc_table.get(sysparm_fields='sys_id,number')
+        sys_ids = [r['sys_id'] for r in records] + [records[0]['sys_id'], 'f' * 32]
+
+        events = []
+        lookup_table = Client(self.mock_instance_url, 'user', 'pwd', hooks=[events.append]).table('incident')
+        with patch('servicenowpy.servicenow.MAX_URL_LENGTH', 400):
+            result = lookup_table.get_records(sys_ids, sysparm_fields='number')
+
+        requests_sent = [e for e in events if e.kind == 'request']
+        self.assertGreater(len(requests_sent), 1)
+        self.assertTrue(all(len(e.url) <= 400 for e in requests_sent))
+        self.assertEqual(list(result), list(dict.fromkeys(sys_ids)))
+        self.assertIsNone(result['f' * 32])
+        self.assertEqual([result[r['sys_id']] for r in records], [{'number': r['number']} for r in records])
+
+
+    def test_get_records_by_number(self):
+        inc_table = self.sn_client.table('incident')
+        result = inc_table.get_records_by_number(['INC0000001', 'INC0000002', 'INC9999999'])
+        self.assertEqual(result['INC0000001']['number'], 'INC0000001')
+        self.assertEqual(result['INC0000002']['number'], 'INC0000002')
+        self.assertIsNone(result['INC9999999'])
+        self.assertEqual(inc_table.get_records([]), {})
+
+
+    def test_get_typed(self):
+        inc_table = self.sn_client.table('incident')
+        fields = ['number', 'opened_at', 'active', 'priority', 'assigned_to']
+        raw = inc_table.get(sysparm_fields=','.join(fields), sysparm_query='ORDERBYnumber')
+        typed = inc_table.get(sysparm_fields=fields, sysparm_query='ORDERBYnumber', page_size=40, typed=True)
+
+        self.assertEqual(len(typed), len(raw))
+        self.assertEqual(list(typed[0]), fields)
+        for raw_record, record in zip(raw, typed):
+            self.assertEqual(record['priority'], int(raw_record['priority']))
+            self.assertEqual(record['active'], raw_record['active'] == 'true')
+            self.assertEqual(record['opened_at'].strftime('%Y-%m-%d %H:%M:%S'), raw_record['opened_at'])
+            if raw_record['assigned_to']:
+                self.assertEqual(record['assigned_to'].sys_id, raw_record['assigned_to']['value'])
+            else:
+                self.assertIsNone(record['assigned_to'])
+
+        streamed = list(inc_table.iter_records(sysparm_fields=fields, sysparm_query='ORDERBYnumber', stream=True, typed=True))
+        self.assertEqual(streamed, typed)
+
+
+    def test_get_typed_invalid_fields(self):
+        inc_table = self.sn_client.table('incident')
+        with self.assertRaises(ValueError):
+            inc_table.get(sysparm_fields='number,u_not_a_field', typed=True)
+        with self.assertRaises(ValueError):
+            inc_table.get(sysparm_display_value='true', typed=True)
+
+
+    def test_count(self):
+        inc_table = self.sn_client.table('incident')
+        query = 'active=true^priority<3'
+        self.assertEqual(inc_table.count(query), len(inc_table.get(sysparm_query=query, sysparm_fields='sys_id')))
+
+
+    def test_aggregate(self):
+        inc_table = self.sn_client.table('incident')
+        result = inc_table.aggregate(group_by='state', avg='priority', max=['sys_updated_on'])
+        self.assertEqual(sum(group['count'] for group in result.values()), inc_table.count())
+        self.assertIsInstance(result['1']['avg']['priority'], float)
+        self.assertIsInstance(result['1']['max']['sys_updated_on'], str)
+
+
     def test_patch(self):
         sys_id = '1c741bd70b2322007518478d83673af3'
         data = { "assignment_group": "287ebd7da9fe198100f92cc8d1d2154e" }
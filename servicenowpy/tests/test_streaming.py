@@ -0,0 +1,50 @@
+import json
+import unittest
+
+from servicenowpy.streaming import iter_array_items
+
+
+def split(body, size):
+    data = body.encode()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestIterArrayItems(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [
+            {"number": "INC0000060", "short_description": "Não consigo acessar o e-mail"},
+            {"number": "INC0000009", "assigned_to": {"link": "https://mock/sys_user/1", "value": "1"}},
+            {"number": "INC0009005", "short_description": 'Brackets ] and [ in "text"'}
+        ]
+        self.body = json.dumps({"result": self.records}, ensure_ascii=False, indent=2)
+
+
+    def test_single_chunk(self):
+        self.assertEqual(list(iter_array_items([self.body.encode()])), self.records)
+
+
+    def test_small_chunks(self):
+        for size in (1, 2, 7, 64):
+            self.assertEqual(list(iter_array_items(split(self.body, size))), self.records)
+
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_array_items([b'{"result": [ ]}'])), [])
+
+
+    def test_is_lazy(self):
+        chunks = iter(split(self.body, 16))
+        items = iter_array_items(chunks)
+        self.assertEqual(next(items), self.records[0])
+        self.assertIsNotNone(next(chunks, None))
+
+
+    def test_missing_key(self):
+        with self.assertRaises(ValueError):
+            list(iter_array_items([b'{"error": {"message": "Invalid table"}}']))
+
+
+    def test_truncated_body(self):
+        with self.assertRaises(ValueError):
+            list(iter_array_items(split(self.body[:-20], 8)))
@@ -0,0 +1,170 @@
+import os
+import unittest
+
+from unittest import skipIf
+from urllib.parse import unquote
+
+import requests
+
+from servicenowpy import Client, HTTPXTransport, MemoryTransport, RequestsTransport, StatusCodeError
+from servicenowpy.aio import httpx
+from servicenowpy.transport import Response
+
+
+class TestMemoryTransport(unittest.TestCase):
+
+    def setUp(self):
+        records = [
+            {'sys_id': f'{i:032x}', 'number': f'INC{i:07d}', 'priority': str(i % 3 + 1)}
+            for i in range(25)
+        ]
+        self.transport = MemoryTransport({'incident': records})
+        self.sn_client = Client('instance_url', 'user', 'pwd', transport=self.transport)
+        self.inc_table = self.sn_client.table('incident')
+
+
+    def test_get(self):
+        records = self.inc_table.get(sysparm_query='priority=1^ORDERBYDESCnumber', sysparm_fields='number')
+        self.assertEqual(len(records), 9)
+        self.assertEqual(records[0], {'number': 'INC0000024'})
+        self.assertEqual(self.inc_table.count('priority=1^NQpriority=2'), 17)
+        self.assertEqual(self.inc_table.aggregate(group_by='priority'), {'1': {'count': 9}, '2': {'count': 8}, '3': {'count': 8}})
+        self.assertIsNone(self.sn_client.session)
+
+
+    def test_operators(self):
+        records = self.inc_table.get(sysparm_query='numberININC0000001,INC0000002', sysparm_fields='number')
+        self.assertEqual(records, [{'number': 'INC0000001'}, {'number': 'INC0000002'}])
+        self.assertEqual(self.inc_table.count('numberNOT ININC0000001,INC0000002'), 23)
+        self.assertEqual(self.inc_table.count('numberSTARTSWITHINC000001'), 10)
+
+        records = self.inc_table.get_records_by_number(['INC0000003', 'INC0000004', 'INC0000999'])
+        self.assertEqual(records['INC0000004']['sys_id'], f'{4:032x}')
+        self.assertIsNone(records['INC0000999'])
+
+
+    def test_unsupported_condition(self):
+        for query in ('numberLIKEINC', 'priority=1^ORpriority=2', 'numberENDSWITH1'):
+            with self.assertRaises(StatusCodeError) as cm:
+                self.inc_table.get(sysparm_query=query)
+            self.assertEqual(cm.exception.status, 400)
+            self.assertIn('Unsupported condition', cm.exception.message)
+
+        with self.assertRaises(StatusCodeError) as cm:
+            self.inc_table.count('numberLIKEINC')
+        self.assertEqual(cm.exception.status, 400)
+
+
+    def test_compressed_request(self):
+        sn_client = Client('instance_url', 'user', 'pwd', transport=self.transport, compress_requests=0)
+        created = sn_client.table('incident').post({'number': 'INC0000100'})
+        self.assertEqual(self.inc_table.get_record(created['sys_id'])['number'], 'INC0000100')
+
+        response = self.transport.request(
+            'POST', f'{sn_client.api_url}table/incident', {'Content-Encoding': 'br'}, b'{}'
+        )
+        self.assertEqual(response.status_code, 415)
+
+
+    def test_pagination(self):
+        pages = list(self.inc_table.iter_pages(page_size=10))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+
+        pages = list(self.inc_table.iter_pages(page_size=10, pagination='keyset'))
+        records = [r for page in pages for r in page]
+        self.assertEqual([r['sys_id'] for r in records], sorted(r['sys_id'] for r in records))
+        self.assertEqual(len(records), 25)
+
+
+    def test_parallel_pages_order(self):
+        transport = MemoryTransport({'incident': reversed(list(self.transport.tables['incident'].values()))})
+        inc_table = Client('instance_url', 'user', 'pwd', transport=transport).table('incident')
+        records = inc_table.get(workers=4, page_size=10, sysparm_query='priority!=3')
+        self.assertEqual([r['sys_id'] for r in records], sorted(r['sys_id'] for r in records))
+        self.assertEqual(len(records), 17)
+        self.assertTrue(all('ORDERBYsys_id' in unquote(url) for method, url in transport.requests))
+
+        records = inc_table.get(workers=4, page_size=10, sysparm_query='ORDERBYDESCnumber')
+        self.assertEqual(records[0]['number'], 'INC0000024')
+
+
+    def test_writes(self):
+        created = self.inc_table.post({'number': 'INC0000100', 'priority': '1'})
+        self.assertEqual(self.inc_table.get_record(created['sys_id'])['number'], 'INC0000100')
+
+        updated = self.inc_table.patch(created['sys_id'], {'priority': '2'})
+        self.assertEqual(updated['priority'], '2')
+
+        self.inc_table.delete(created['sys_id'])
+        with self.assertRaises(StatusCodeError) as cm:
+            self.inc_table.get_record(created['sys_id'])
+        self.assertEqual(cm.exception.status, 404)
+        self.assertEqual(cm.exception.message, 'No Record found')
+        self.assertEqual([method for method, url in self.transport.requests].count('DELETE'), 1)
+
+
+    def test_handler(self):
+        def handler(method, url, headers, data):
+            if '/stats/' in url:
+                return Response(200, {'Content-Type': 'application/json'}, b'{"result": {"stats": {}}}')
+            return None
+
+        self.transport.handler = handler
+        response = self.sn_client._send('GET', f'{self.sn_client.api_url}stats/incident')
+        self.assertEqual(response.json(), {'result': {'stats': {}}})
+        self.assertEqual(len(next(self.inc_table.iter_pages(page_size=5))), 5)
+
+
+class TestRequestsTransport(unittest.TestCase):
+
+    def test_default(self):
+        sn_client = Client('instance_url', 'user', 'pwd')
+        self.assertIsInstance(sn_client.transport, RequestsTransport)
+        self.assertIsInstance(sn_client.session, requests.Session)
+
+
+@skipIf(httpx is None, 'httpx is not installed.')
+class TestHTTPXTransport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_instance_url = os.environ['SERVICENOWPY_MOCK_API_URL']
+
+
+    def setUp(self):
+        self.sn_client = Client(self.mock_instance_url, 'user', 'pwd', transport=HTTPXTransport(http2=True))
+        self.expected = Client(self.mock_instance_url, 'user', 'pwd').table('incident')
+
+
+    def tearDown(self):
+        self.sn_client.close()
+
+
+    def test_get(self):
+        inc_table = self.sn_client.table('incident')
+        records = inc_table.get(sysparm_fields='number,sys_id')
+        self.assertEqual(records, self.expected.get(sysparm_fields='number,sys_id'))
+        self.assertEqual(inc_table.get_record(records[0]['sys_id'])['number'], records[0]['number'])
+
+        with self.assertRaises(StatusCodeError) as cm:
+            inc_table.get_record('f' * 32)
+        self.assertEqual(cm.exception.status, 404)
+
+
+    def test_concurrent_pages(self):
+        inc_table = self.sn_client.table('incident')
+        pages = list(inc_table.iter_pages(page_size=10, workers=4, sysparm_fields='sys_id'))
+        self.assertEqual(sum(len(page) for page in pages), self.expected.count())
+
+
+    def test_stream(self):
+        inc_table = self.sn_client.table('incident')
+        records = list(inc_table.iter_records(stream=True, sysparm_fields='number'))
+        self.assertEqual(records, self.expected.get(sysparm_fields='number'))
+
+
+    def test_connection_error(self):
+        sn_client = Client('http://127.0.0.1:9', 'user', 'pwd', transport=HTTPXTransport())
+        with self.assertRaises(requests.ConnectionError):
+            sn_client.table('incident').get()
+        sn_client.close()